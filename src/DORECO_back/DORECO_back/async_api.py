@@ -0,0 +1,43 @@
+import functools
+
+from django.http import Http404, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def api_response(data, status=status.HTTP_200_OK):
+    """JsonResponse con el mismo formato que JSONRenderer de DRF"""
+    return JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def async_api_view(view):
+    """
+    Decorador para vistas async de solo lectura fuera de DRF: responde 405 a
+    métodos que no sean GET/HEAD y traduce APIException y Http404 a las mismas
+    respuestas JSON que genera el manejador de excepciones de DRF.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return api_response(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+        try:
+            return await view(request, *args, **kwargs)
+        except Http404 as exc:
+            return api_response({'detail': str(exc) or 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = api_response(data, status=exc.status_code)
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                response['WWW-Authenticate'] = 'Bearer realm="api"'
+            return response
+    return wrapper
@@ -0,0 +1,83 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlushBuffer:
+    """
+    Buffer en memoria, compartido entre hilos, que agrupa escrituras por llave
+    y las vacía en lote cada `interval` segundos desde un hilo en segundo plano.
+
+    Las subclases definen `merge` (cómo combinar dos valores de la misma llave)
+    y `write` (cómo persistir el lote). Con `interval <= 0` se escribe de
+    inmediato, útil para pruebas y comandos de administración.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        atexit.register(self.flush)
+
+    def merge(self, current, value):
+        raise NotImplementedError
+
+    def write(self, items):
+        raise NotImplementedError
+
+    def add(self, key, value):
+        """Acumula un valor para la llave; se persistirá en el siguiente vaciado"""
+        with self._lock:
+            self._pending[key] = self.merge(self._pending.get(key), value)
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def pending(self, key, default=None):
+        """Valor aún no persistido para la llave"""
+        with self._lock:
+            return self._pending.get(key, default)
+
+    def flush(self):
+        """Escribe todo lo pendiente; si falla, lo devuelve al buffer"""
+        with self._lock:
+            items, self._pending = self._pending, {}
+        if not items:
+            return 0
+        try:
+            self.write(items)
+        except Exception:
+            logger.exception(f"Error flushing {self.__class__.__name__} ({len(items)} items)")
+            with self._lock:
+                for key, value in items.items():
+                    self._pending[key] = self.merge(self._pending.get(key), value)
+            return 0
+        return len(items)
+
+    def _ensure_thread(self):
+        # Tras un fork (p. ej. gunicorn --preload) el hilo no existe en el hijo
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.__class__.__name__}-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            close_old_connections()
+            self.flush()
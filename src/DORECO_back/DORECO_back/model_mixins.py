@@ -0,0 +1,20 @@
+class LoadedValuesMixin:
+    """
+    Guarda los valores de los campos tal como se cargaron de la base de datos,
+    para que las señales detecten qué cambió (p. ej. estado o categoría
+    anteriores) sin volver a consultar.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
+    def get_loaded_value(self, attname, default=None):
+        """Valor del campo al cargarse de la base de datos (default si la instancia es nueva)"""
+        return getattr(self, '_loaded_values', {}).get(attname, default)
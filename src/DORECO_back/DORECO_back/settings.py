@@ -59,12 +59,20 @@ INSTALLED_APPS = [
     'publications',
     'categories',
     'reports',
+    'analytics',
+    'performance',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        # JWTAuthentication con el usuario (y su rol) cacheado por AUTH_USER_CACHE_TIMEOUT
+        'users.authentication.CachedJWTAuthentication',
+    ),
+    # Solo limitan las acciones configuradas en TOKEN_BUCKET_THROTTLE
+    'DEFAULT_THROTTLE_CLASSES': (
+        'DORECO_back.throttling.UserTokenBucketThrottle',
+        'DORECO_back.throttling.IPTokenBucketThrottle',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -73,10 +81,119 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': False,
+    # Consulta el filtro de Bloom de la lista negra antes de la tabla
+    'TOKEN_REFRESH_SERIALIZER': 'users.blacklist.BloomTokenRefreshSerializer',
+}
+
+# Búsqueda de usuarios por trigramas: fracción mínima de trigramas de la consulta que deben coincidir
+USER_SEARCH_MIN_SIMILARITY = 0.5
+
+# Importación de padrones: procesos para hashear contraseñas (None = número de CPUs)
+ROSTER_IMPORT_WORKERS = None
+# Límites del endpoint (se procesa dentro de la petición y sin pool de procesos);
+# los padrones más grandes se importan con `manage.py import_roster`
+ROSTER_IMPORT_MAX_ROWS = 500
+ROSTER_IMPORT_MAX_PASSWORDS = 20  # filas con contraseña: cada hash cuesta cientos de ms
+
+# Avatares: tamaños en px generados en WebP y hilos que los procesan (0 = en línea)
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_QUALITY = 80
+AVATAR_WORKERS = 2
+
+# Filtro de Bloom de tokens en lista negra (users.blacklist)
+TOKEN_BLACKLIST_BLOOM = {
+    'ENABLED': True,
+    'CAPACITY': 100000,  # tokens antes de reconstruir con más espacio
+    'ERROR_RATE': 0.001,  # falsos positivos (se resuelven con una consulta)
+    'REFRESH_INTERVAL': 5,  # segundos entre lecturas de tokens agregados por otros procesos
+    'SYNC_MARGIN': 60,  # segundos que se releen en cada lectura (ids confirmados fuera de orden)
+    'REBUILD_INTERVAL': 3600,  # segundos entre reconstrucciones completas
+}
+
+# Detección de casi duplicados con MinHash/LSH (ver publications.dedup).
+# Al cambiar NUM_PERM o BANDS hay que reconstruir: manage.py index_publication_signatures
+PUBLICATION_DEDUP = {
+    'NUM_PERM': 64,  # valores por firma
+    'BANDS': 16,  # bandas LSH de NUM_PERM / BANDS valores (umbral efectivo ~0.5)
+    'THRESHOLD': 0.6,  # similitud estimada mínima para reportar un duplicado
+    'MAX_CANDIDATES': 10,
+}
+
+# Cola de moderación de reportes (ver reports.moderation)
+MODERATION = {
+    # Peso de cada reporte pendiente según la razón
+    'REASON_WEIGHTS': {
+        'inappropriate': 3.0,
+        'fake': 2.0,
+        'spam': 1.0,
+        'duplicate': 1.0,
+        'other': 1.0,
+    },
+    'AGE_WEIGHT_PER_HOUR': 0.1,  # prioridad que gana un reporte por cada hora en espera
+    'AUTO_HIDE_WEIGHT': 10.0,  # peso pendiente con el que la publicación se oculta automáticamente
+}
+
+# Disponibilidad de email/username para el registro (/auth/availability/)
+USER_AVAILABILITY = {
+    'CACHE_TIMEOUT': 60,  # segundos que se cachea cada respuesta (se invalida al guardar usuarios)
+    'BLOOM_ENABLED': True,  # filtro de Bloom en memoria: "disponible" sin consultar la base de datos
+    'BLOOM_CAPACITY': 100000,
+    'BLOOM_ERROR_RATE': 0.01,
+    'REFRESH_INTERVAL': 5,  # segundos entre lecturas de usuarios creados o modificados por otros procesos
+    'SYNC_MARGIN': 60,  # segundos de updated_at que se releen en cada lectura (cambios e ids fuera de orden)
+    'REBUILD_INTERVAL': 3600,  # segundos entre reconstrucciones completas
+}
+
+# Segundos que se cachea el catálogo de categorías activas (se invalida al cambiar categorías o contadores)
+CATEGORY_CATALOG_CACHE_TIMEOUT = 300
+
+# Segundos que se cachea el usuario autenticado por JWT (se invalida al guardar/eliminar).
+# La invalidación solo alcanza a la caché 'default' del proceso que hizo el cambio: con
+# LocMem los demás workers pueden servir el usuario anterior (rol, desactivación, cambio
+# de contraseña) hasta este tiempo. Mantenerlo corto o usar una caché compartida.
+AUTH_USER_CACHE_TIMEOUT = 30
+
+# Último acceso y última actividad: se acumulan en memoria y se escriben en lote (users.last_login)
+LAST_LOGIN_FLUSH_INTERVAL = 30  # segundos entre escrituras
+LAST_LOGIN_BATCH_SIZE = 500  # usuarios por bulk_update
+LAST_LOGIN_CACHE_TIMEOUT = 24 * 60 * 60  # segundos que el valor pendiente es visible en caché
+LAST_ACTIVITY_RESOLUTION = 5 * 60  # segundos mínimos entre registros de actividad de un usuario
+
+# Instrumentación de consultas por petición (ver performance.instrumentation)
+QUERY_INSTRUMENTATION = {
+    'ENABLED': True,
+    'HEADERS': DEBUG,  # encabezados X-DB-* en las respuestas
+    'LOG_ALL': False,  # registrar el resumen de todas las peticiones, no solo las que superan el presupuesto
+    'SIMILAR_THRESHOLD': 5,  # repeticiones de una misma consulta con distintos parámetros para avisar de un N+1
+    'TOP_QUERIES': 5,
+    'DEFAULT_BUDGET': {'queries': 50, 'db_time_ms': 500},
+    # Por endpoint ("ViewSet.acción"); se combinan con DEFAULT_BUDGET
+    'BUDGETS': {
+        'PublicationViewSet.list': {'queries': 5},
+        'PublicationViewSet.retrieve': {'queries': 5},
+        'CategoryViewSet.active': {'queries': 2},
+        'ReportViewSet.list': {'queries': 5},
+        'ReportViewSet.pending': {'queries': 5},
+    },
+}
+
+# Perfilador de CPU por muestreo (ver performance.profiler): administradores con
+# el encabezado X-Profile: 1 o una fracción SAMPLE_RATE de las peticiones.
+# Perfiles en /api/performance/profiles/ (formato folded para flamegraphs)
+REQUEST_PROFILER = {
+    'ENABLED': True,
+    'HEADER': 'X-Profile',
+    'SAMPLE_RATE': 0.0,  # fracción de peticiones perfiladas sin encabezado (p. ej. 0.001)
+    'INTERVAL_MS': 5,  # milisegundos entre muestras de la pila
+    'MAX_CONCURRENT': 2,  # perfiles simultáneos como máximo
+    'MAX_PROFILES': 200,  # se conservan los más recientes
+    'DIRECTORY': os.path.join(BASE_DIR, 'profiles'),
 }
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    'performance.middleware.RequestProfilerMiddleware',
+    'performance.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -146,6 +263,22 @@ DATABASES = {
 AUTH_USER_MODEL = "users.CustomUser"
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# LocMem es por proceso; en producción usar Redis/Memcached para compartir entre workers
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'doreco-default',
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'doreco-throttle',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -217,4 +350,34 @@ QR_CODE_URL_PROTECTION = {
 
 # Frontend settings para password reset
 FRONTEND_DOMAIN = 'localhost:3000'  # Cambiar en producción
-FRONTEND_PROTOCOL = 'http'  # Cambiar a 'https' en producción
\ No newline at end of file
+FRONTEND_PROTOCOL = 'http'  # Cambiar a 'https' en producción
+
+# Contador de vistas de publicaciones (buffer en memoria con vaciado por lotes)
+PUBLICATION_VIEWS_FLUSH_INTERVAL = 10  # segundos entre escrituras a la base de datos
+PUBLICATION_VIEWS_BATCH_SIZE = 500  # publicaciones por UPDATE ... CASE
+PUBLICATION_VIEWS_DEDUPE_WINDOW = 30 * 60  # segundos en que un visitante cuenta una sola vez
+
+# Stream SSE de cambios del catálogo (/api/publications/events/)
+CATALOG_EVENTS_KEEPALIVE = 25  # segundos entre comentarios keepalive
+CATALOG_EVENTS_QUEUE_SIZE = 100  # eventos en cola por conexión antes de pedir resync
+
+# Throttling con cubeta de tokens (DORECO_back.throttling)
+# Límites por acción: 'N/periodo' = capacidad N que se rellena a N por periodo
+TOKEN_BUCKET_THROTTLE = {
+    'STORE': 'DORECO_back.throttling.TokenBucketStore',
+    'CACHE_ALIAS': 'throttle',
+    'USER_RATES': {
+        'login': '10/min',
+        'password_reset_request': '3/hour',
+        'send_message': '20/hour',
+        'generate_qr': '30/min',
+        'availability': '60/min',
+    },
+    'IP_RATES': {
+        'login': '30/min',
+        'password_reset_request': '10/hour',
+        'send_message': '60/hour',
+        'generate_qr': '120/min',
+        'availability': '120/min',
+    },
+}
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .throttling import TokenBucketStore
+
+THROTTLE = {
+    'STORE': 'DORECO_back.throttling.TokenBucketStore',
+    'CACHE_ALIAS': 'throttle',
+    'USER_RATES': {'login': '2/min'},
+    'IP_RATES': {'login': '4/min'},
+}
+
+
+class TokenBucketStoreTests(TestCase):
+    """Cubeta de tokens: recarga y consumo atómico bajo concurrencia"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.store = TokenBucketStore('throttle')
+
+    def test_refill(self):
+        for _ in range(2):
+            self.assertTrue(self.store.consume('k', 2, 1.0, now=100)[0])
+        allowed, wait = self.store.consume('k', 2, 1.0, now=100)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1.0)
+
+        self.assertTrue(self.store.consume('k', 2, 1.0, now=101)[0])
+        self.assertFalse(self.store.consume('k', 2, 1.0, now=101)[0])
+
+    def test_concurrent_consume_respects_capacity(self):
+        # Dos instancias con la misma caché simulan dos workers
+        stores = [self.store, TokenBucketStore('throttle')]
+        for store in stores:
+            store.cache = caches.create_connection('throttle')
+            get = store.cache.get
+
+            def slow_get(*args, get=get, **kwargs):
+                # Simula el viaje de ida y vuelta a una caché remota
+                value = get(*args, **kwargs)
+                time.sleep(0.001)
+                return value
+
+            store.cache.get = slow_get
+
+        results = []
+        barrier = threading.Barrier(50)
+
+        def consume(store):
+            barrier.wait()
+            results.append(store.consume('k', 10, 0.001)[0])
+
+        threads = [threading.Thread(target=consume, args=(stores[i % 2],)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 10)
+
+
+@override_settings(TOKEN_BUCKET_THROTTLE=THROTTLE)
+class LoginThrottleTests(TestCase):
+    """Límites de login por cuenta y por IP, compartidos con /api/token/"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+
+    def login(self, email, ip='10.0.0.1', url='/auth/login/'):
+        return self.client.post(url, {'email': email, 'password': 'incorrecta'}, REMOTE_ADDR=ip)
+
+    def test_retry_after_header(self):
+        for _ in range(2):
+            self.assertEqual(self.login('user@example.com').status_code, 400)
+        response = self.login('user@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_token_endpoint_shares_login_limit(self):
+        for _ in range(2):
+            self.login('user@example.com')
+        self.assertEqual(self.login('user@example.com', url='/api/token/').status_code, 429)
+
+    def test_user_and_ip_limits_are_separate(self):
+        for _ in range(2):
+            self.login('user@example.com')
+        self.assertEqual(self.login('user@example.com').status_code, 429)
+        # Otra cuenta desde la misma IP sigue teniendo su propia cubeta
+        self.assertEqual(self.login('admin@example.com').status_code, 400)
+        # La IP ya agotó sus 4 intentos, sin importar la cuenta
+        self.assertEqual(self.login('otro@example.com').status_code, 429)
+        self.assertEqual(self.login('otro@example.com', ip='10.0.0.2').status_code, 400)
@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (capacidad, tokens por segundo)"""
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def get_throttle_config():
+    return getattr(settings, 'TOKEN_BUCKET_THROTTLE', {})
+
+
+class TokenBucketStore:
+    """
+    Cubetas de tokens guardadas en un backend de caché de Django. Cada llave
+    guarda (tokens disponibles, último acceso) y se rellena de forma continua.
+    Con LocMem el estado es por proceso; en producción conviene una caché
+    compartida (Redis/Memcached) para que el límite aplique entre workers.
+
+    La lectura y escritura de cada cubeta es atómica: un candado por llave
+    dentro del proceso y, entre procesos, un candado en la propia caché con
+    cache.add (atómico en LocMem, Redis y Memcached). Si el candado no se
+    obtiene en LOCK_WAIT segundos la petición se rechaza en lugar de
+    permitirse sin contar.
+    """
+    LOCK_STRIPES = 64
+    LOCK_TIMEOUT = 1
+    LOCK_WAIT = 0.1
+
+    def __init__(self, cache_alias='default'):
+        self.cache = caches[cache_alias]
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def _acquire(self, lock_key, owner):
+        deadline = time.monotonic() + self.LOCK_WAIT
+        while not self.cache.add(lock_key, owner, self.LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.002)
+        return True
+
+    def consume(self, key, capacity, refill_rate, tokens=1, now=None):
+        """Consume tokens de la cubeta; devuelve (permitido, segundos de espera)"""
+        lock_key, owner = f"{key}:lock", uuid.uuid4().hex
+        with self._locks[hash(key) % self.LOCK_STRIPES]:
+            if not self._acquire(lock_key, owner):
+                return False, 1 / refill_rate
+            try:
+                return self._consume(key, capacity, refill_rate, tokens, now)
+            finally:
+                if self.cache.get(lock_key) == owner:
+                    self.cache.delete(lock_key)
+
+    def _consume(self, key, capacity, refill_rate, tokens, now):
+        now = time.time() if now is None else now
+        state = self.cache.get(key)
+        if state is None:
+            available, last = capacity, now
+        else:
+            available, last = state
+        available = min(capacity, available + max(0, now - last) * refill_rate)
+        if available >= tokens:
+            available -= tokens
+            allowed, wait = True, 0
+        else:
+            allowed, wait = False, (tokens - available) / refill_rate
+        # La llave caduca cuando la cubeta ya estaría llena de nuevo
+        self.cache.set(key, (available, now), int(capacity / refill_rate) + 1)
+        return allowed, wait
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        config = get_throttle_config()
+        store_class = import_string(config.get('STORE', 'DORECO_back.throttling.TokenBucketStore'))
+        _store = store_class(config.get('CACHE_ALIAS', 'default'))
+    return _store
+
+
+@receiver(setting_changed)
+def reset_store(setting, **kwargs):
+    # Permite cambiar el backend en pruebas con override_settings
+    global _store
+    if setting in ('TOKEN_BUCKET_THROTTLE', 'CACHES'):
+        _store = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle de DRF con cubeta de tokens. El límite se toma de la configuración
+    por acción (view.throttle_scope o view.action); sin límite no se restringe,
+    por lo que puede registrarse en DEFAULT_THROTTLE_CLASSES.
+    DRF agrega el header Retry-After a partir de wait().
+    """
+    rates_setting = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None) or getattr(view, 'action', None)
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        rate = get_throttle_config().get(self.rates_setting, {}).get(scope)
+        if not rate:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+        capacity, refill_rate = parse_rate(rate)
+        key = f"throttle:{self.rates_setting.lower()}:{scope}:{ident}"
+        allowed, self.wait_seconds = get_store().consume(key, capacity, refill_rate)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Límite por usuario; en acciones anónimas (login, reset) por cuenta solicitada"""
+    rates_setting = 'USER_RATES'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"id:{request.user.pk}"
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if email:
+            return "email:" + hashlib.sha1(str(email).strip().lower().encode()).hexdigest()
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Límite por dirección IP"""
+    rates_setting = 'IP_RATES'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
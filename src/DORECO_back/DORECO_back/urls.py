@@ -18,17 +18,15 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
+from users.views import ThrottledTokenObtainPairView
 
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
     
     # JWT Authentication (URLs adicionales para tokens)
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
     # Apps URLs
@@ -36,6 +34,8 @@ urlpatterns = [
     path('', include('categories.urls')),
     path('', include('publications.urls')),
     path('', include('reports.urls')),
+    path('', include('analytics.urls')),
+    path('', include('performance.urls')),
 ]
 
 # Servir archivos estáticos y media en desarrollo
@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analytics'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from django.dispatch import receiver
+
+        @receiver(post_migrate)
+        def initialize_counters(sender, **kwargs):
+            # En una base existente los contadores se calculan una sola vez desde las tablas
+            if sender.name != 'analytics':
+                return
+            from .counters import reconcile_counters
+            from .models import Counter
+            if not Counter.objects.exists():
+                reconcile_counters()
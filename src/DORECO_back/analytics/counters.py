@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+USERS_TOTAL = 'users.total'
+PUBLICATIONS_ACTIVE = 'publications.active'
+REPORTS_TOTAL = 'reports.total'
+
+
+def publication_type_key(publication_type):
+    return f'publications.type.{publication_type}'
+
+
+def report_status_key(status):
+    return f'reports.status.{status}'
+
+
+def report_reason_key(reason):
+    return f'reports.reason.{reason}'
+
+
+def publication_keys(is_active, publication_type):
+    """Contadores en los que cuenta una publicación con esos valores"""
+    keys = {publication_type_key(publication_type)}
+    if is_active:
+        keys.add(PUBLICATIONS_ACTIVE)
+    return keys
+
+
+def report_keys(status, reason):
+    return {REPORTS_TOTAL, report_status_key(status), report_reason_key(reason)}
+
+
+def diff_keys(old_keys, new_keys):
+    """Incrementos para pasar de contar en old_keys a contar en new_keys"""
+    deltas = {key: 1 for key in new_keys - old_keys}
+    deltas.update({key: -1 for key in old_keys - new_keys})
+    return deltas
+
+
+def adjust_counters(deltas):
+    """
+    Aplica {clave: incremento} en un solo UPDATE value = value + CASE ...;
+    crea las filas que aún no existan. Punto de entrada también para las
+    operaciones masivas que no disparan señales (bulk_create, update()).
+    """
+    from .models import Counter
+
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    increment = Case(
+        *[When(key=key, then=Value(delta)) for key, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    with transaction.atomic():
+        updated = Counter.objects.filter(key__in=deltas).update(value=F('value') + increment)
+        if updated < len(deltas):
+            existing = set(Counter.objects.filter(key__in=deltas).values_list('key', flat=True))
+            for key in sorted(set(deltas) - existing):
+                _, created = Counter.objects.get_or_create(key=key, defaults={'value': deltas[key]})
+                if not created:
+                    # Otra transacción la creó entre la consulta y el INSERT
+                    Counter.objects.filter(key=key).update(value=F('value') + deltas[key])
+
+
+def get_counters(keys):
+    """Valores de los contadores pedidos en una sola consulta (0 si no existen)"""
+    from .models import Counter
+
+    values = dict(Counter.objects.filter(key__in=keys).values_list('key', 'value'))
+    return {key: values.get(key, 0) for key in keys}
+
+
+def compute_counters():
+    """Valores reales de todos los contadores, calculados desde las tablas"""
+    from publications.models import Publication
+    from reports.models import Report
+    from users.models import CustomUser
+
+    values = {USERS_TOTAL: CustomUser.objects.count()}
+
+    values[PUBLICATIONS_ACTIVE] = Publication.objects.filter(is_active=True).count()
+    values.update({publication_type_key(code): 0 for code, _ in Publication.TYPE_CHOICES})
+    for row in Publication.objects.order_by().values('publication_type').annotate(total=Count('pk')):
+        values[publication_type_key(row['publication_type'])] = row['total']
+
+    values.update({report_status_key(code): 0 for code, _ in Report.STATUS_CHOICES})
+    values.update({report_reason_key(code): 0 for code, _ in Report.REASON_CHOICES})
+    rows = list(Report.objects.order_by().values('status', 'reason').annotate(total=Count('pk')))
+    values[REPORTS_TOTAL] = sum(row['total'] for row in rows)
+    for row in rows:
+        for key in (report_status_key(row['status']), report_reason_key(row['reason'])):
+            values[key] = values.get(key, 0) + row['total']
+    return values
+
+
+def reconcile_counters():
+    """
+    Corrige los contadores que se desviaron (escrituras fuera del ORM, fallos
+    entre el guardado y la señal). Devuelve {clave: (anterior, correcto)}.
+    """
+    from .models import Counter
+
+    with transaction.atomic():
+        expected = compute_counters()
+        current = dict(Counter.objects.select_for_update().values_list('key', 'value'))
+        corrections = {}
+        for key, value in expected.items():
+            if current.get(key) != value:
+                Counter.objects.update_or_create(key=key, defaults={'value': value})
+                corrections[key] = (current.get(key), value)
+    return corrections
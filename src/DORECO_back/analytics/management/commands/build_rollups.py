@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import METRICS, build_rollups, mark_all_days
+
+
+class Command(BaseCommand):
+    help = "Actualiza las rollups diarias de los días con cambios desde la última ejecución"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recalcular todos los días desde el primer registro")
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        if options['full']:
+            for metric in METRICS:
+                self.stdout.write(f"{metric}: {mark_all_days(metric)} días marcados")
+        processed = build_rollups(batch_size=options['batch_size'])
+        for metric, days in processed.items():
+            self.stdout.write(f"{metric}: {days} días recalculados")
+        self.stdout.write(self.style.SUCCESS("Rollups actualizadas"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from analytics.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores del dashboard desde las tablas y corrige las desviaciones"
+
+    def handle(self, *args, **options):
+        corrections = reconcile_counters()
+        for key, (previous, value) in sorted(corrections.items()):
+            self.stdout.write(f"{key}: {previous} -> {value}")
+        self.stdout.write(self.style.SUCCESS(f"{len(corrections)} contadores corregidos"))
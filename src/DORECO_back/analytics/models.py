@@ -0,0 +1,175 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from categories.models import Category
+from publications.models import Publication
+from reports.models import Report
+from users.models import CustomUser
+
+
+class Counter(models.Model):
+    """Contadores del dashboard mantenidos por señales (ver analytics.counters)"""
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "analytics_counter"
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class PublicationDailyRollup(models.Model):
+    """Publicaciones creadas por día, categoría y tipo"""
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    publication_type = models.CharField(max_length=20, choices=Publication.TYPE_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "analytics_publication_daily"
+        unique_together = ['day', 'category', 'publication_type']
+
+
+class ReportDailyRollup(models.Model):
+    """Reportes creados por día y razón"""
+    day = models.DateField()
+    reason = models.CharField(max_length=20, choices=Report.REASON_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "analytics_report_daily"
+        unique_together = ['day', 'reason']
+
+
+class UserDailyRollup(models.Model):
+    """Usuarios registrados por día"""
+    day = models.DateField(unique=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "analytics_user_daily"
+
+
+class DirtyDay(models.Model):
+    """Días con cambios pendientes de recalcular en las rollups (ver build_rollups)"""
+    METRIC_CHOICES = [
+        ('publications', 'Publicaciones'),
+        ('reports', 'Reportes'),
+        ('users', 'Usuarios'),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    day = models.DateField()
+
+    class Meta:
+        db_table = "analytics_dirty_day"
+        unique_together = ['metric', 'day']
+
+
+@receiver(post_save, sender=CustomUser)
+def count_user_created(sender, instance, created, **kwargs):
+    from .counters import USERS_TOTAL, adjust_counters
+    if created:
+        adjust_counters({USERS_TOTAL: 1})
+
+
+@receiver(post_delete, sender=CustomUser)
+def count_user_deleted(sender, instance, **kwargs):
+    from .counters import USERS_TOTAL, adjust_counters
+    adjust_counters({USERS_TOTAL: -1})
+
+
+@receiver(post_save, sender=Publication)
+def count_publication_saved(sender, instance, created, **kwargs):
+    from .counters import adjust_counters, diff_keys, publication_keys
+    new_keys = publication_keys(instance.is_active, instance.publication_type)
+    if created:
+        adjust_counters(diff_keys(set(), new_keys))
+    elif instance.get_loaded_value('publication_type') is not None:
+        old_keys = publication_keys(
+            instance.get_loaded_value('is_active'), instance.get_loaded_value('publication_type')
+        )
+        adjust_counters(diff_keys(old_keys, new_keys))
+
+
+@receiver(post_delete, sender=Publication)
+def count_publication_deleted(sender, instance, **kwargs):
+    from .counters import adjust_counters, diff_keys, publication_keys
+    old_keys = publication_keys(
+        instance.get_loaded_value('is_active', instance.is_active),
+        instance.get_loaded_value('publication_type', instance.publication_type),
+    )
+    adjust_counters(diff_keys(old_keys, set()))
+
+
+@receiver(pre_save, sender=Report)
+@receiver(pre_delete, sender=Report)
+def load_stored_report(sender, instance, **kwargs):
+    # bulk_resolve cambia el estado con update(): los valores cargados en memoria pueden estar desactualizados
+    instance._stored_report = (
+        Report.objects.filter(pk=instance.pk).values_list('status', 'reason').first()
+        if instance.pk is not None else None
+    )
+
+
+@receiver(post_save, sender=Report)
+def count_report_saved(sender, instance, created, **kwargs):
+    from .counters import adjust_counters, diff_keys, report_keys
+    new_keys = report_keys(instance.status, instance.reason)
+    if created:
+        adjust_counters(diff_keys(set(), new_keys))
+    elif instance._stored_report is not None:
+        adjust_counters(diff_keys(report_keys(*instance._stored_report), new_keys))
+
+
+@receiver(post_delete, sender=Report)
+def count_report_deleted(sender, instance, **kwargs):
+    from .counters import adjust_counters, diff_keys, report_keys
+    if instance._stored_report is not None:
+        adjust_counters(diff_keys(report_keys(*instance._stored_report), set()))
+
+
+@receiver(post_save, sender=CustomUser)
+def mark_user_day(sender, instance, created, **kwargs):
+    from .rollups import mark_dirty
+    if created:
+        mark_dirty('users', instance.created_at)
+
+
+@receiver(post_delete, sender=CustomUser)
+def mark_user_day_deleted(sender, instance, **kwargs):
+    from .rollups import mark_dirty
+    mark_dirty('users', instance.created_at)
+
+
+@receiver(post_save, sender=Publication)
+def mark_publication_day(sender, instance, created, **kwargs):
+    from .rollups import mark_dirty
+    changed = any(
+        instance.get_loaded_value(attname, getattr(instance, attname)) != getattr(instance, attname)
+        for attname in ('category_id', 'publication_type')
+    )
+    if created or changed:
+        mark_dirty('publications', instance.created_at)
+
+
+@receiver(post_delete, sender=Publication)
+def mark_publication_day_deleted(sender, instance, **kwargs):
+    from .rollups import mark_dirty
+    mark_dirty('publications', instance.created_at)
+
+
+@receiver(post_save, sender=Report)
+def mark_report_day(sender, instance, created, **kwargs):
+    from .rollups import mark_dirty
+    if created or instance.get_loaded_value('reason', instance.reason) != instance.reason:
+        mark_dirty('reports', instance.created_at)
+
+
+@receiver(post_delete, sender=Report)
+def mark_report_day_deleted(sender, instance, **kwargs):
+    from .rollups import mark_dirty
+    mark_dirty('reports', instance.created_at)
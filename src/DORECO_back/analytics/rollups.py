@@ -0,0 +1,99 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+METRICS = ('publications', 'reports', 'users')
+
+
+def _as_day(value):
+    if isinstance(value, datetime.datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def mark_dirty(metric, *values):
+    """Marca días para recalcular; un solo INSERT que ignora los ya marcados"""
+    from .models import DirtyDay
+
+    days = {_as_day(value) for value in values if value is not None}
+    if days:
+        DirtyDay.objects.bulk_create(
+            [DirtyDay(metric=metric, day=day) for day in days], ignore_conflicts=True
+        )
+
+
+def day_bounds(day):
+    """Inicio y fin del día en la zona horaria del proyecto (rango semiabierto sobre created_at)"""
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, timezone.make_aware(datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min))
+
+
+def _source(metric):
+    """(modelo de origen, modelo de rollup, campos de agrupación)"""
+    from publications.models import Publication
+    from reports.models import Report
+    from users.models import CustomUser
+    from .models import PublicationDailyRollup, ReportDailyRollup, UserDailyRollup
+
+    return {
+        'publications': (Publication, PublicationDailyRollup, ['category_id', 'publication_type']),
+        'reports': (Report, ReportDailyRollup, ['reason']),
+        'users': (CustomUser, UserDailyRollup, []),
+    }[metric]
+
+
+def rebuild_day(metric, day):
+    """Recalcula las filas de rollup de un día desde la tabla de origen"""
+    model, rollup, group_fields = _source(metric)
+    start, end = day_bounds(day)
+    rows = model.objects.filter(created_at__gte=start, created_at__lt=end).order_by()
+    if group_fields:
+        rows = rows.values(*group_fields).annotate(total=Count('pk'))
+    else:
+        rows = [{'total': rows.count()}]
+    rollup.objects.filter(day=day).delete()
+    rollup.objects.bulk_create([
+        rollup(day=day, count=row.pop('total'), **row) for row in rows if row['total']
+    ])
+
+
+def build_rollups(batch_size=100):
+    """
+    Procesa solo los días marcados desde la última ejecución. Cada lote borra
+    sus marcas antes de recalcular, en la misma transacción: un cambio
+    concurrente vuelve a marcar el día y se procesa después.
+    Devuelve {métrica: días procesados}.
+    """
+    from .models import DirtyDay
+
+    processed = {metric: 0 for metric in METRICS}
+    last_id = 0
+    while True:
+        batch = list(DirtyDay.objects.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        with transaction.atomic():
+            DirtyDay.objects.filter(id__in=[dirty.id for dirty in batch]).delete()
+            for dirty in batch:
+                rebuild_day(dirty.metric, dirty.day)
+                processed[dirty.metric] += 1
+    return processed
+
+
+def mark_all_days(metric):
+    """Marca todos los días desde el primer registro (carga inicial o reconstrucción completa)"""
+    model, _, _ = _source(metric)
+    first = model.objects.aggregate(first=Min('created_at'))['first']
+    if first is None:
+        return 0
+    day, today = _as_day(first), timezone.localdate()
+    days = []
+    while day <= today:
+        days.append(day)
+        day += datetime.timedelta(days=1)
+    for start in range(0, len(days), 1000):
+        mark_dirty(metric, *days[start:start + 1000])
+    return len(days)
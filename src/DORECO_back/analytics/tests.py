@@ -0,0 +1,198 @@
+import datetime
+from collections import Counter as Tally
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from publications.models import Publication
+from reports.models import Report
+from reports.moderation import bulk_resolve
+from users.models import CustomUser
+from .counters import reconcile_counters
+from .models import DirtyDay
+from .rollups import build_rollups, mark_dirty
+
+
+class CounterStatisticsTests(TestCase):
+    """Las estadísticas desde contadores coinciden con los COUNT sobre las tablas"""
+
+    def setUp(self):
+        reconcile_counters()
+        self.admin = CustomUser.objects.get(email='admin@example.com')
+        self.owner = CustomUser.objects.get(email='user@example.com')
+        self.category = Category.objects.create(name='Libros')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def publish(self, publication_type, **fields):
+        return Publication.objects.create(
+            title='Libro', description='d', category=self.category, condition='new', keywords='libro',
+            image1='x.png', publication_type=publication_type, owner=self.owner, **fields
+        )
+
+    def report(self, publication, reason, reporter):
+        return Report.objects.create(publication=publication, reported_by=reporter, reason=reason, description='d')
+
+    def expected(self):
+        """Consultas COUNT que hacían los endpoints antes de los contadores"""
+        users = {
+            "total_users": CustomUser.objects.count(),
+            "total_active_publications": Publication.objects.filter(is_active=True).count(),
+            "total_sold": Publication.objects.filter(publication_type='sale').count(),
+            "total_loaned": Publication.objects.filter(publication_type='loan').count(),
+            "total_donated": Publication.objects.filter(publication_type='donation').count(),
+            "pending_reports": Report.objects.filter(status='pending').count(),
+        }
+        reports = {'total_reports': Report.objects.count()}
+        for code in ['pending', 'reviewed', 'resolved', 'dismissed']:
+            reports[f'{code}_reports'] = Report.objects.filter(status=code).count()
+        reports['reports_by_reason'] = {
+            name: Report.objects.filter(reason=code).count() for code, name in Report.REASON_CHOICES
+        }
+        return users, reports
+
+    def assertStatisticsMatch(self):
+        users, reports = self.expected()
+        self.assertEqual(self.client.get('/api/users/statistics/').data, users)
+        self.assertEqual(self.client.get('/api/reports/statistics/').data, reports)
+
+    def test_statistics_follow_writes(self):
+        sale = self.publish('sale', price=100)
+        loan = self.publish('loan')
+        donation = self.publish('donation', is_active=False)
+        user = CustomUser.objects.create(
+            email='nuevo@utez.edu.mx', username='nuevo', name='Nuevo', surnames='Usuario', role_id=2
+        )
+        reports = [
+            self.report(sale, 'spam', self.admin), self.report(sale, 'fake', user), self.report(loan, 'spam', self.admin)
+        ]
+        self.assertStatisticsMatch()
+
+        loan.publication_type = 'donation'
+        loan.is_active = False
+        loan.save()
+        donation.is_active = True
+        donation.save()
+        reports[0].status = 'reviewed'
+        reports[0].save()
+        reports[1].reason = 'duplicate'
+        reports[1].save()
+        self.assertStatisticsMatch()
+
+        bulk_resolve(self.admin, 'resolved', ids=[report.pk for report in reports], publication_status='hidden')
+        self.assertStatisticsMatch()
+
+        reports[2].delete()
+        sale.delete()
+        user.delete()
+        self.assertStatisticsMatch()
+        self.assertEqual(reconcile_counters(), {})
+
+
+class RollupTests(TestCase):
+    """Rollups diarias: días marcados, recálculo y totales por día/semana/mes frente a las tablas"""
+
+    START, END = datetime.date(2025, 1, 27), datetime.date(2025, 2, 16)
+    MOMENTS = [
+        (2025, 1, 27, 0, 30), (2025, 1, 31, 23, 45), (2025, 2, 1, 0, 15),
+        (2025, 2, 1, 12, 0), (2025, 2, 3, 9, 0), (2025, 2, 16, 23, 59),
+    ]
+
+    def setUp(self):
+        self.admin = CustomUser.objects.get(email='admin@example.com')
+        self.owner = CustomUser.objects.get(email='user@example.com')
+        self.books = Category.objects.create(name='Libros')
+        self.tools = Category.objects.create(name='Herramientas')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.publications = []
+        for index, moment in enumerate(self.MOMENTS):
+            publication = Publication.objects.create(
+                title='Libro', description='d', category=self.books if index % 2 else self.tools,
+                condition='new', keywords='libro', image1='x.png', owner=self.owner,
+                publication_type='loan' if index % 3 else 'donation',
+            )
+            self.backdate(publication, moment)
+            self.publications.append(publication)
+        for index, publication in enumerate(self.publications[:3]):
+            report = Report.objects.create(
+                publication=publication, reported_by=self.admin, description='d',
+                reason='spam' if index else 'fake',
+            )
+            self.backdate(report, self.MOMENTS[index])
+        build_rollups()
+
+    def backdate(self, instance, moment):
+        # update() no dispara señales: se marca el día a mano, como las operaciones masivas
+        created_at = timezone.make_aware(datetime.datetime(*moment))
+        type(instance).objects.filter(pk=instance.pk).update(created_at=created_at)
+        instance.created_at = created_at
+        metric = 'publications' if isinstance(instance, Publication) else 'reports'
+        mark_dirty(metric, created_at)
+
+    def period(self, day, bucket):
+        if bucket == 'week':
+            return day - datetime.timedelta(days=day.weekday())
+        if bucket == 'month':
+            return day.replace(day=1)
+        return day
+
+    def expected(self, queryset, bucket, field=None):
+        """Totales calculados directamente desde la tabla de origen"""
+        tally = Tally()
+        for row in queryset.values('created_at', *([field] if field else [])):
+            day = timezone.localdate(row['created_at'])
+            if self.START <= day <= self.END:
+                tally[(self.period(day, bucket), row[field] if field else None)] += 1
+        return tally
+
+    def fetch(self, metric, bucket, group_by=None):
+        params = {'metric': metric, 'bucket': bucket, 'start': self.START, 'end': self.END}
+        if group_by:
+            params['group_by'] = group_by
+        response = self.client.get('/api/analytics/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return Tally({
+            (datetime.date.fromisoformat(row['period'][:10]), row.get(group_by)): row['count']
+            for row in response.data['results']
+        })
+
+    def assertRollupsMatch(self):
+        for bucket in ('day', 'week', 'month'):
+            with self.subTest(bucket=bucket):
+                self.assertEqual(
+                    self.fetch('publications', bucket, 'category'),
+                    self.expected(Publication.objects.all(), bucket, 'category_id'),
+                )
+                self.assertEqual(
+                    self.fetch('publications', bucket, 'type'),
+                    self.expected(Publication.objects.all(), bucket, 'publication_type'),
+                )
+                self.assertEqual(
+                    self.fetch('reports', bucket, 'reason'), self.expected(Report.objects.all(), bucket, 'reason')
+                )
+
+    def test_buckets_match_source_tables(self):
+        self.assertFalse(DirtyDay.objects.exists())
+        self.assertRollupsMatch()
+        # Los bordes del día siguen la zona horaria del proyecto
+        self.assertEqual(self.fetch('publications', 'day')[(datetime.date(2025, 1, 31), None)], 1)
+        self.assertEqual(self.fetch('publications', 'month')[(datetime.date(2025, 2, 1), None)], 4)
+
+    def test_changes_mark_days_and_rebuild(self):
+        moved, removed = self.publications[1], self.publications[4]
+        moved.category = self.tools
+        moved.publication_type = 'sale'
+        moved.price = 50
+        moved.save()
+        removed.delete()
+        self.assertEqual(
+            set(DirtyDay.objects.values_list('metric', 'day')),
+            {('publications', datetime.date(2025, 1, 31)), ('publications', datetime.date(2025, 2, 3))},
+        )
+
+        self.assertEqual(build_rollups(), {'publications': 2, 'reports': 0, 'users': 0})
+        self.assertFalse(DirtyDay.objects.exists())
+        self.assertRollupsMatch()
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import AnalyticsViewSet
+
+urlpatterns = [
+    path('api/analytics/', AnalyticsViewSet.as_view({'get': 'list'}), name='analytics'),
+]
@@ -0,0 +1,83 @@
+import datetime
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework import permissions, status, viewsets
+from rest_framework.response import Response
+
+from users.permissions import IsAdmin
+from .models import PublicationDailyRollup, ReportDailyRollup, UserDailyRollup
+
+METRICS = {
+    # métrica: (rollup, agrupaciones permitidas -> campo)
+    'publications': (PublicationDailyRollup, {'category': 'category_id', 'type': 'publication_type'}),
+    'reports': (ReportDailyRollup, {'reason': 'reason'}),
+    'users': (UserDailyRollup, {}),
+}
+
+BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+MAX_RANGE_DAYS = 3 * 366
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Series de tiempo para el dashboard, leídas solo de las rollups diarias"""
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def list(self, request):
+        """
+        GET /api/analytics/?metric=publications&bucket=week&start=2025-01-01&end=2025-03-31&group_by=category
+        Por defecto: últimos 30 días agrupados por día.
+        """
+        metric = request.query_params.get('metric', 'publications')
+        bucket = request.query_params.get('bucket', 'day')
+        group_by = request.query_params.get('group_by')
+        if metric not in METRICS:
+            return Response({"error": f"Métrica inválida. Opciones: {', '.join(METRICS)}"},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if bucket not in BUCKETS:
+            return Response({"error": f"Agrupación temporal inválida. Opciones: {', '.join(BUCKETS)}"},
+                          status=status.HTTP_400_BAD_REQUEST)
+        rollup, groups = METRICS[metric]
+        if group_by and group_by not in groups:
+            return Response({"error": f"group_by inválido para {metric}. Opciones: {', '.join(groups) or 'ninguna'}"},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end = datetime.date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else timezone.localdate()
+            start = datetime.date.fromisoformat(request.query_params['start']) if 'start' in request.query_params else end - datetime.timedelta(days=29)
+        except ValueError:
+            return Response({"error": "Las fechas deben tener el formato YYYY-MM-DD"},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if start > end or (end - start).days > MAX_RANGE_DAYS:
+            return Response({"error": f"Rango de fechas inválido (máximo {MAX_RANGE_DAYS} días)"},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        fields = ['period'] + ([groups[group_by]] if group_by else [])
+        rows = (
+            rollup.objects.filter(day__gte=start, day__lte=end)
+            .annotate(period=BUCKETS[bucket]('day'))
+            .values(*fields)
+            .annotate(total=Sum('count'))
+            .order_by(*fields)
+        )
+        results = []
+        for row in rows:
+            item = {'period': row['period'].isoformat(), 'count': row['total']}
+            if group_by:
+                item[group_by] = row[groups[group_by]]
+            results.append(item)
+
+        return Response({
+            'metric': metric,
+            'bucket': bucket,
+            'group_by': group_by,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'results': results,
+        })
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class CategoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'categories'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from django.dispatch import receiver
+
+        @receiver(post_migrate)
+        def reconcile_publication_counts(sender, **kwargs):
+            # Rutas y contadores al día tras agregar las columnas (una consulta agrupada)
+            if sender.name != 'categories':
+                return
+            from .catalog import reconcile_category_counts
+            from .tree import rebuild_paths
+            rebuild_paths()
+            reconcile_category_counts()
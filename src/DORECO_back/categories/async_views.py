@@ -0,0 +1,14 @@
+from rest_framework.exceptions import NotAuthenticated
+
+from DORECO_back.async_api import api_response, async_api_view
+from users.authentication import aget_request_user
+from .catalog import aget_active_catalog
+
+
+@async_api_view
+async def active_categories(request):
+    """Versión async de GET /api/categories/active/ (requiere autenticación, como la síncrona)"""
+    request.user = await aget_request_user(request)
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+    return api_response(await aget_active_catalog())
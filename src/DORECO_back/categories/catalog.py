@@ -0,0 +1,145 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+
+from .tree import ancestor_ids, build_path
+
+ACTIVE_CATALOG_CACHE_KEY = "categories:active-catalog"
+
+
+def invalidate_catalog():
+    """Descarta el catálogo cacheado al confirmar la transacción (en el acto si no hay una abierta)"""
+    transaction.on_commit(lambda: cache.delete(ACTIVE_CATALOG_CACHE_KEY))
+
+
+def publication_count_deltas(old, new):
+    """
+    Incrementos por categoría para pasar de (category_id, is_active) `old` a
+    `new`; None en cualquiera de los dos indica que la publicación no existía.
+    Devuelve {category_id: (total, activas)}.
+    """
+    deltas = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        category_id, is_active = state
+        total, active = deltas.get(category_id, (0, 0))
+        deltas[category_id] = (total + sign, active + (sign if is_active else 0))
+    return {category_id: delta for category_id, delta in deltas.items() if delta != (0, 0)}
+
+
+def _increment(deltas, index):
+    return Case(
+        *[When(pk=category_id, then=Value(delta[index])) for category_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _apply_counts(direct, subtree):
+    from .models import Category
+
+    fields = {}
+    if direct:
+        fields['publications_count'] = F('publications_count') + _increment(direct, 0)
+        fields['active_publications_count'] = F('active_publications_count') + _increment(direct, 1)
+    if subtree:
+        fields['subtree_publications_count'] = F('subtree_publications_count') + _increment(subtree, 0)
+        fields['subtree_active_publications_count'] = F('subtree_active_publications_count') + _increment(subtree, 1)
+    if not fields:
+        return
+    Category.objects.filter(pk__in=set(direct) | set(subtree)).update(**fields)
+    invalidate_catalog()
+
+
+def adjust_subtree_counts(deltas):
+    """Aplica {category_id: (total, activas)} solo a los contadores de subárbol"""
+    _apply_counts({}, {category_id: delta for category_id, delta in deltas.items() if delta != (0, 0)})
+
+
+def adjust_category_counts(deltas):
+    """
+    Aplica {category_id: (total, activas)} a la categoría y, por su ruta, a los
+    contadores de subárbol de todos sus ancestros, en un solo UPDATE con CASE.
+    Punto de entrada también para las operaciones masivas que no disparan señales.
+    """
+    from .models import Category
+
+    deltas = {category_id: delta for category_id, delta in deltas.items() if delta != (0, 0)}
+    if not deltas:
+        return
+    paths = dict(Category.objects.filter(pk__in=deltas).values_list('pk', 'path'))
+    subtree = {}
+    for category_id, (total, active) in deltas.items():
+        for ancestor_id in ancestor_ids(paths.get(category_id) or build_path('', category_id)):
+            previous = subtree.get(ancestor_id, (0, 0))
+            subtree[ancestor_id] = (previous[0] + total, previous[1] + active)
+    _apply_counts(deltas, subtree)
+
+
+def build_active_catalog():
+    from .models import Category
+    from .serializers import CategoryListSerializer
+
+    categories = Category.objects.filter(is_active=True).order_by('name')
+    return CategoryListSerializer(categories, many=True).data
+
+
+def get_active_catalog():
+    """
+    Categorías activas ya serializadas, en una sola entrada de caché; se
+    invalida al cambiar una categoría o sus contadores.
+    """
+    catalog = cache.get(ACTIVE_CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = build_active_catalog()
+        cache.set(ACTIVE_CATALOG_CACHE_KEY, catalog, getattr(settings, 'CATEGORY_CATALOG_CACHE_TIMEOUT', 300))
+    return catalog
+
+
+async def aget_active_catalog():
+    catalog = await cache.aget(ACTIVE_CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = await sync_to_async(get_active_catalog)()
+    return catalog
+
+
+def reconcile_category_counts():
+    """
+    Recalcula los contadores (propios y de subárbol) desde publicaciones.
+    Devuelve {category_id: (anteriores, correctos)}.
+    """
+    from publications.models import Publication
+    from .models import Category
+
+    direct = {
+        row['category_id']: (row['total'], row['active'])
+        for row in Publication.objects.order_by().values('category_id').annotate(
+            total=Count('pk'), active=Count('pk', filter=Q(is_active=True))
+        )
+    }
+    corrections = {}
+    with transaction.atomic():
+        current = list(Category.objects.select_for_update().values_list(
+            'pk', 'path', 'publications_count', 'active_publications_count',
+            'subtree_publications_count', 'subtree_active_publications_count',
+        ))
+        subtree = {}
+        for category_id, path, *_ in current:
+            total, active = direct.get(category_id, (0, 0))
+            for ancestor_id in ancestor_ids(path or build_path('', category_id)):
+                previous = subtree.get(ancestor_id, (0, 0))
+                subtree[ancestor_id] = (previous[0] + total, previous[1] + active)
+        for category_id, path, *counts in current:
+            value = direct.get(category_id, (0, 0)) + subtree.get(category_id, (0, 0))
+            if tuple(counts) != value:
+                Category.objects.filter(pk=category_id).update(
+                    publications_count=value[0], active_publications_count=value[1],
+                    subtree_publications_count=value[2], subtree_active_publications_count=value[3],
+                )
+                corrections[category_id] = (tuple(counts), value)
+    if corrections:
+        invalidate_catalog()
+    return corrections
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from categories.catalog import reconcile_category_counts
+from categories.tree import rebuild_paths
+
+
+class Command(BaseCommand):
+    help = "Recalcula las rutas y los contadores de publicaciones por categoría y corrige las desviaciones"
+
+    def handle(self, *args, **options):
+        paths = rebuild_paths()
+        if paths:
+            self.stdout.write(f"{paths} rutas corregidas")
+        corrections = reconcile_category_counts()
+        for category_id, (previous, value) in sorted(corrections.items()):
+            self.stdout.write(f"categoría {category_id}: {previous} -> {value}")
+        self.stdout.write(self.style.SUCCESS(f"{len(corrections)} categorías corregidas"))
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.utils import timezone
+
+MERGE_MODES = ('delete', 'deactivate')
+
+
+class MergeError(ValueError):
+    pass
+
+
+def _move_chunk(target_id, source_ids, chunk_size):
+    """
+    Reasigna hasta chunk_size publicaciones de las categorías origen al destino
+    en una transacción corta (solo se bloquean esas filas). Devuelve cuántas movió.
+    """
+    from analytics.rollups import mark_dirty
+    from publications.models import Publication
+    from .catalog import adjust_category_counts, publication_count_deltas
+
+    with transaction.atomic():
+        rows = list(
+            Publication.objects.select_for_update().filter(category_id__in=source_ids)
+            .order_by('pk').values_list('pk', 'category_id', 'is_active', 'created_at')[:chunk_size]
+        )
+        if not rows:
+            return 0
+        Publication.objects.filter(pk__in=[row[0] for row in rows]).update(
+            category_id=target_id, updated_at=timezone.now()
+        )
+        # update() no dispara señales: contadores por categoría y rollups se ajustan aquí
+        deltas = {}
+        for _, category_id, is_active, _ in rows:
+            for changed_id, (total, active) in publication_count_deltas(
+                (category_id, is_active), (target_id, is_active)
+            ).items():
+                previous = deltas.get(changed_id, (0, 0))
+                deltas[changed_id] = (previous[0] + total, previous[1] + active)
+        adjust_category_counts(deltas)
+        mark_dirty('publications', *[row[3] for row in rows])
+    return len(rows)
+
+
+def merge_categories(target, source_ids, mode='delete', chunk_size=1000):
+    """
+    Fusiona las categorías origen en `target`. Las publicaciones se mueven en
+    UPDATE por bloques que no bloquean la tabla completa; al final, en una sola
+    transacción, se mueven las publicaciones creadas durante la fusión, las
+    subcategorías pasan al destino y los orígenes se eliminan o se marcan como
+    rechazados (is_active = None). Devuelve un resumen.
+    """
+    from publications.models import Publication
+    from .models import Category
+
+    if mode not in MERGE_MODES:
+        raise MergeError(f"Modo inválido. Opciones: {', '.join(MERGE_MODES)}")
+    try:
+        source_ids = sorted({int(source_id) for source_id in source_ids} - {target.pk})
+    except (TypeError, ValueError):
+        raise MergeError("Los ids de las categorías deben ser números enteros.")
+    if not source_ids:
+        raise MergeError("Debes indicar al menos una categoría origen distinta del destino.")
+    sources = list(Category.objects.filter(pk__in=source_ids))
+    missing = set(source_ids) - {source.pk for source in sources}
+    if missing:
+        raise MergeError(f"No existen las categorías: {', '.join(str(pk) for pk in sorted(missing))}")
+    if any(target.path.startswith(source.path) for source in sources):
+        raise MergeError("El destino no puede ser subcategoría de una categoría origen.")
+
+    moved = 0
+    while True:
+        count = _move_chunk(target.pk, source_ids, chunk_size)
+        if not count:
+            break
+        moved += count
+
+    with transaction.atomic():
+        list(Category.objects.select_for_update().filter(pk__in=source_ids))
+        while Publication.objects.filter(category_id__in=source_ids).exists():
+            moved += _move_chunk(target.pk, source_ids, chunk_size)
+        for child in Category.objects.filter(parent_id__in=source_ids).order_by('path'):
+            child.parent = target
+            child.save()
+        # Se vuelven a leer: mover subcategorías pudo cambiar sus rutas
+        for source in Category.objects.filter(pk__in=source_ids).order_by('pk'):
+            if mode == 'delete':
+                source.delete()
+            else:
+                source.is_active = None
+                source.save()
+
+    return {
+        'target': target.pk,
+        'sources': source_ids,
+        'publications_moved': moved,
+        'mode': mode,
+    }
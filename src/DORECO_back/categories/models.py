@@ -1,5 +1,14 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+# Se mantienen con UPDATE ... F() (categories.catalog y categories.tree): save() no los sobrescribe
+MAINTAINED_FIELDS = (
+    'path', 'publications_count', 'active_publications_count',
+    'subtree_publications_count', 'subtree_active_publications_count',
+)
 
 
 class Category(models.Model):
@@ -8,9 +17,68 @@ class Category(models.Model):
     is_active = models.BooleanField(default=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Jerarquía: ruta materializada "id/id/.../" (ver categories.tree)
+    parent = models.ForeignKey('self', on_delete=models.PROTECT, null=True, blank=True, related_name='children')
+    path = models.CharField(max_length=255, default='', editable=False, db_index=True)
+    
+    # Contadores mantenidos por señales de Publication (ver categories.catalog)
+    publications_count = models.PositiveIntegerField(default=0, editable=False)
+    active_publications_count = models.PositiveIntegerField(default=0, editable=False)
+    # Incluyen las publicaciones de todas las subcategorías
+    subtree_publications_count = models.PositiveIntegerField(default=0, editable=False)
+    subtree_active_publications_count = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        from .tree import build_path, move_subtree
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Los valores en memoria pueden estar desactualizados frente a los de la base
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in MAINTAINED_FIELDS
+            ]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            current_path = Category.objects.filter(pk=self.pk).values_list('path', flat=True).get()
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() if self.parent_id else ''
+            path = build_path(parent_path, self.pk)
+            if path != current_path:
+                if current_path:
+                    move_subtree(self, current_path, path)
+                else:
+                    Category.objects.filter(pk=self.pk).update(path=path)
+            self.path = path
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_on_change(sender, instance, **kwargs):
+    from .catalog import invalidate_catalog
+    invalidate_catalog()
+
+
+@receiver(post_save, sender='publications.Publication')
+def count_publication_saved(sender, instance, created, **kwargs):
+    from .catalog import adjust_category_counts, publication_count_deltas
+    new = (instance.category_id, instance.is_active)
+    if created:
+        adjust_category_counts(publication_count_deltas(None, new))
+    elif instance.get_loaded_value('category_id') is not None:
+        old = (instance.get_loaded_value('category_id'), instance.get_loaded_value('is_active'))
+        adjust_category_counts(publication_count_deltas(old, new))
+
+
+@receiver(post_delete, sender='publications.Publication')
+def count_publication_deleted(sender, instance, **kwargs):
+    from .catalog import adjust_category_counts, publication_count_deltas
+    old = (
+        instance.get_loaded_value('category_id', instance.category_id),
+        instance.get_loaded_value('is_active', instance.is_active),
+    )
+    adjust_category_counts(publication_count_deltas(old, None))
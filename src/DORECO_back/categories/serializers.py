@@ -1,15 +1,40 @@
 from rest_framework import serializers
+from users.permissions import get_capabilities
 from .models import Category
 
 
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer para el modelo Category"""
-    publications_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'is_active', 'created_at', 'publications_count']
-        read_only_fields = ['id', 'created_at', 'publications_count']
+        fields = [
+            'id', 'name', 'description', 'is_active', 'created_at', 'parent', 'path',
+            'publications_count', 'active_publications_count',
+            'subtree_publications_count', 'subtree_active_publications_count',
+        ]
+        read_only_fields = [
+            'id', 'created_at', 'path', 'publications_count', 'active_publications_count',
+            'subtree_publications_count', 'subtree_active_publications_count',
+        ]
+
+    def validate_parent(self, value):
+        if not value or not self.instance:
+            return value
+        if self.instance.path:
+            cyclic = value.path.startswith(self.instance.path)
+        else:
+            # Fila aún sin ruta (antes de rebuild_paths): se recorre la cadena de padres
+            cyclic, node, seen = False, value, set()
+            while node is not None and node.pk not in seen:
+                cyclic = node.pk == self.instance.pk
+                if cyclic:
+                    break
+                seen.add(node.pk)
+                node = node.parent
+        if cyclic:
+            raise serializers.ValidationError("Una categoría no puede ser subcategoría de sí misma ni de sus subcategorías.")
+        return value
 
     def validate_name(self, value):
         if self.instance and self.instance.name == value:
@@ -21,16 +46,19 @@ class CategorySerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Los usuarios normales crean categorías como sugerencias (inactivas)
         request = self.context.get('request')
-        if request and not (request.user.is_staff or request.user.is_admin):
+        if request and not get_capabilities(request).is_admin:
             validated_data['is_active'] = False
         return super().create(validated_data)
 
 
 class CategoryListSerializer(serializers.ModelSerializer):
     """Serializer simplificado para listar categorías"""
-    publications_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'is_active', 'publications_count']
-        read_only_fields = ['id', 'publications_count'] 
\ No newline at end of file
+        fields = [
+            'id', 'name', 'description', 'is_active', 'parent', 'path',
+            'publications_count', 'active_publications_count',
+            'subtree_publications_count', 'subtree_active_publications_count',
+        ]
+        read_only_fields = fields
@@ -1,3 +1,83 @@
 from django.test import TestCase
 
-# Create your tests here.
+from publications.models import Publication
+from users.models import CustomUser
+from .catalog import reconcile_category_counts
+from .models import Category
+from .serializers import CategorySerializer
+
+
+class CategoryCountsTests(TestCase):
+    """Contadores propios y de subárbol frente a altas, cambios y movimientos en la jerarquía"""
+
+    def setUp(self):
+        self.owner = CustomUser.objects.get(email='user@example.com')
+        self.root_a = Category.objects.create(name='Raíz A')
+        self.root_b = Category.objects.create(name='Raíz B')
+        self.child = Category.objects.create(name='Hija', parent=self.root_a)
+        self.grandchild = Category.objects.create(name='Nieta', parent=self.child)
+
+    def publish(self, category, **fields):
+        return Publication.objects.create(
+            title='Calculadora', description='d', category=category, condition='new',
+            keywords='calculadora', image1='x.png', publication_type='donation', owner=self.owner, **fields
+        )
+
+    def counts(self, category):
+        category.refresh_from_db()
+        return (
+            category.publications_count, category.active_publications_count,
+            category.subtree_publications_count, category.subtree_active_publications_count,
+        )
+
+    def test_create_rolls_up_to_ancestors(self):
+        self.publish(self.grandchild)
+        self.publish(self.child, is_active=False)
+
+        self.assertEqual(self.counts(self.grandchild), (1, 1, 1, 1))
+        self.assertEqual(self.counts(self.child), (1, 0, 2, 1))
+        self.assertEqual(self.counts(self.root_a), (0, 0, 2, 1))
+        self.assertEqual(reconcile_category_counts(), {})
+
+    def test_move_and_delete_publication(self):
+        publication = self.publish(self.grandchild)
+        publication.category = self.root_b
+        publication.is_active = False
+        publication.save()
+
+        self.assertEqual(self.counts(self.root_a), (0, 0, 0, 0))
+        self.assertEqual(self.counts(self.root_b), (1, 0, 1, 0))
+        self.assertEqual(reconcile_category_counts(), {})
+
+        publication.delete()
+        self.assertEqual(self.counts(self.root_b), (0, 0, 0, 0))
+        self.assertEqual(reconcile_category_counts(), {})
+
+    def test_reparent_subtree_moves_paths_and_counts(self):
+        self.publish(self.child)
+        self.publish(self.grandchild)
+
+        self.child.parent = self.root_b
+        self.child.save()
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f"{self.root_b.pk}/{self.child.pk}/{self.grandchild.pk}/")
+        self.assertEqual(self.counts(self.root_a), (0, 0, 0, 0))
+        self.assertEqual(self.counts(self.root_b), (0, 0, 2, 2))
+        self.assertEqual(self.counts(self.child), (1, 1, 2, 2))
+        self.assertEqual(reconcile_category_counts(), {})
+
+        self.child.parent = None
+        self.child.save()
+        self.assertEqual(self.counts(self.root_b), (0, 0, 0, 0))
+        self.assertEqual(reconcile_category_counts(), {})
+
+    def test_validate_parent_without_path(self):
+        Category.objects.filter(pk__in=[self.child.pk, self.grandchild.pk]).update(path='')
+        self.child.refresh_from_db()
+        self.grandchild.refresh_from_db()
+
+        serializer = CategorySerializer(self.child, data={'parent': self.root_b.pk}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer = CategorySerializer(self.child, data={'parent': self.grandchild.pk}, partial=True)
+        self.assertFalse(serializer.is_valid())
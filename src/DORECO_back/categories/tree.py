@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Concat, Substr
+
+# Ruta materializada: ids de los ancestros y de la propia categoría, p. ej. "3/12/40/".
+# El subárbol de una categoría son las rutas que empiezan con la suya (LIKE 'ruta%' sobre el índice).
+
+
+def build_path(parent_path, pk):
+    return f"{parent_path or ''}{pk}/"
+
+
+def ancestor_ids(path, include_self=True):
+    """Ids de la ruta, de la raíz a la categoría"""
+    ids = [int(segment) for segment in (path or '').split('/') if segment]
+    return ids if include_self else ids[:-1]
+
+
+def subtree_filter(category_id, prefix='category__'):
+    """
+    Filtro del subárbol completo de una categoría en un solo predicado de
+    prefijo. La ruta se resuelve en una subconsulta para que el queryset
+    siga siendo perezoso (se comparte con las vistas async).
+    """
+    from .models import Category
+
+    path = Subquery(Category.objects.filter(pk=category_id).values('path')[:1])
+    return Q(**{f'{prefix}path__startswith': path})
+
+
+def move_subtree(category, old_path, new_path):
+    """Reescribe las rutas del subárbol y traslada sus contadores de los ancestros anteriores a los nuevos"""
+    from .catalog import adjust_subtree_counts
+    from .models import Category
+
+    with transaction.atomic():
+        Category.objects.filter(path__startswith=old_path).update(
+            path=Concat(Value(new_path), Substr('path', len(old_path) + 1))
+        )
+        total, active = Category.objects.filter(pk=category.pk).values_list(
+            'subtree_publications_count', 'subtree_active_publications_count'
+        ).get()
+        deltas = {}
+        for ancestor_id in ancestor_ids(old_path, include_self=False):
+            deltas[ancestor_id] = (-total, -active)
+        for ancestor_id in ancestor_ids(new_path, include_self=False):
+            previous = deltas.get(ancestor_id, (0, 0))
+            deltas[ancestor_id] = (previous[0] + total, previous[1] + active)
+        adjust_subtree_counts(deltas)
+
+
+def rebuild_paths():
+    """Recalcula las rutas desde parent (categorías existentes, reparaciones); devuelve cuántas cambiaron"""
+    from .models import Category
+
+    rows = {pk: (parent_id, path) for pk, parent_id, path in Category.objects.values_list('pk', 'parent_id', 'path')}
+    paths = {}
+    for pk in rows:
+        chain = []
+        current = pk
+        while current is not None and current not in paths and len(chain) <= len(rows):
+            chain.append(current)
+            current = rows[current][0]
+        parent_path = paths.get(current, '')
+        for node in reversed(chain):
+            parent_path = paths[node] = build_path(parent_path, node)
+
+    changed = [pk for pk, path in paths.items() if rows[pk][1] != path]
+    with transaction.atomic():
+        for pk in changed:
+            Category.objects.filter(pk=pk).update(path=paths[pk])
+    return len(changed)
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import CategoryViewSet
+from .async_views import active_categories
 
 # Crear router para las APIs REST
 router = DefaultRouter()
@@ -14,4 +15,7 @@ urlpatterns = [
     path('api/categories/active/', CategoryViewSet.as_view({'get': 'active'}), name='categories-active'),
     path('api/categories/suggested/', CategoryViewSet.as_view({'get': 'suggested'}), name='categories-suggested'),
     path('api/categories/<int:pk>/toggle-status/', CategoryViewSet.as_view({'post': 'toggle_status'}), name='categories-toggle-status'),
+    
+    # Versión async (ASGI nativa) del listado de categorías activas
+    path('api/async/categories/active/', active_categories, name='categories-async-active'),
 ]
@@ -1,8 +1,11 @@
 from django.shortcuts import render
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Q
+from users.permissions import IsAdmin, get_capabilities
+from .catalog import get_active_catalog
+from .merge import MergeError, merge_categories
 from .models import Category
 from .serializers import CategorySerializer, CategoryListSerializer
 
@@ -20,19 +23,18 @@ class CategoryViewSet(viewsets.ModelViewSet):
             self.permission_classes = [permissions.AllowAny]
         elif self.action == 'create':
             self.permission_classes = [permissions.IsAuthenticated]
+        elif self.action in ['update', 'partial_update', 'destroy']:
+            self.permission_classes = [permissions.IsAuthenticated, IsAdmin]
         else:
             self.permission_classes = [permissions.IsAuthenticated]
         return super().get_permissions()
     
     def get_queryset(self):
         """Filtrar categorías según parámetros"""
-        queryset = Category.objects.annotate(
-            publications_count=Count('publication')
-        )
+        queryset = Category.objects.all()
         
         # Filtrar solo activas si no es admin
-        if not (self.request.user.is_authenticated and 
-                (self.request.user.is_staff or self.request.user.is_admin)):
+        if not get_capabilities(self.request).is_admin:
             queryset = queryset.filter(is_active=True)
         
         # Filtro por búsqueda
@@ -42,6 +44,11 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 Q(name__icontains=search) | Q(description__icontains=search)
             )
         
+        # Filtro por categoría padre ("null" para las raíces)
+        parent = self.request.query_params.get('parent', None)
+        if parent is not None:
+            queryset = queryset.filter(parent__isnull=True) if parent in ('', 'null') else queryset.filter(parent_id=parent)
+        
         # Filtro por estado activo
         is_active = self.request.query_params.get('is_active', None)
         if is_active is not None:
@@ -62,9 +69,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer.save()
     
     def perform_update(self, serializer):
-        """Solo administradores pueden actualizar categorías"""
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden actualizar categorías.")
+        """Solo administradores pueden actualizar categorías (ver get_permissions)"""
         # Permitir poner is_active en None (rechazo)
         instance = serializer.save()
         if 'is_active' in self.request.data and self.request.data['is_active'] in [None, '', 'null', 'None']:
@@ -72,10 +77,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
             instance.save()
     
     def perform_destroy(self, instance):
-        """Solo administradores pueden eliminar categorías"""
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden eliminar categorías.")
-        
+        """Solo administradores pueden eliminar categorías (ver get_permissions)"""
         # Verificar que no tenga publicaciones asociadas
         publications_count = instance.publication_set.count()
         if publications_count > 0:
@@ -84,22 +86,22 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 f"No se puede eliminar una categoría que tiene {publications_count} publicaciones asociadas."
             )
         
+        # Ni subcategorías (parent es PROTECT)
+        if instance.children.exists():
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError("No se puede eliminar una categoría que tiene subcategorías.")
+        
         instance.delete()
     
     @action(detail=False, methods=['get'])
     def active(self, request):
-        """Obtener solo categorías activas"""
-        active_categories = Category.objects.filter(is_active=True).annotate(
-            publications_count=Count('publication')
-        ).order_by('name')
-        
-        serializer = CategoryListSerializer(active_categories, many=True)
-        return Response(serializer.data)
+        """Obtener solo categorías activas (catálogo cacheado)"""
+        return Response(get_active_catalog())
     
     @action(detail=True, methods=['post'])
     def toggle_status(self, request, pk=None):
         """Activar/desactivar categoría (solo admins)"""
-        if not (request.user.is_staff or request.user.is_admin):
+        if not get_capabilities(request).is_admin:
             return Response({"error": "No tienes permisos para realizar esta acción"}, 
                           status=403)
         
@@ -110,16 +112,36 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer = CategorySerializer(category)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        """Fusionar categorías (p. ej. sugerencias duplicadas) en esta (solo admins)"""
+        if not get_capabilities(request).is_admin:
+            return Response({"error": "No tienes permisos para fusionar categorías"}, 
+                          status=status.HTTP_403_FORBIDDEN)
+        
+        target = self.get_object()
+        sources = request.data.get('sources')
+        if not isinstance(sources, list):
+            return Response({"error": "Se requiere la lista 'sources' con los ids a fusionar"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = merge_categories(target, sources, mode=request.data.get('mode', 'delete'))
+        except MergeError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        target.refresh_from_db()
+        result['category'] = CategorySerializer(target).data
+        return Response(result)
+    
     @action(detail=False, methods=['get'])
     def suggested(self, request):
         """Obtener categorías sugeridas (inactivas) para revisión de admins"""
-        if not (request.user.is_staff or request.user.is_admin):
+        if not get_capabilities(request).is_admin:
             return Response({"error": "No tienes permisos para ver categorías sugeridas"}, 
                           status=403)
         
-        suggested_categories = Category.objects.filter(is_active=False).annotate(
-            publications_count=Count('publication')
-        ).order_by('-created_at')
+        suggested_categories = Category.objects.filter(is_active=False).order_by('-created_at')
         
         serializer = CategorySerializer(suggested_categories, many=True)
         return Response(serializer.data)
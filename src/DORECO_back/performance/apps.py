@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class PerformanceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'performance'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .instrumentation import install_query_hook
+
+        # Cada conexión (una por hilo) recibe el hook; sin petición instrumentada no hace nada
+        connection_created.connect(install_query_hook, dispatch_uid='performance.install_query_hook')
@@ -0,0 +1,178 @@
+import datetime
+import math
+import platform
+import random
+import time
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# (nombre, ruta, usuario): la ruta puede usar {publication_id} y {category_id}
+ENDPOINTS = [
+    ('publications_list', '/api/publications/', 'user'),
+    ('publications_search', '/api/publications/?search=calculadora', 'user'),
+    ('publications_category', '/api/publications/?category={category_id}', 'anonymous'),
+    ('publication_detail', '/api/publications/{publication_id}/', 'user'),
+    ('favorites', '/api/favorites/', 'user'),
+    ('categories_active', '/api/categories/active/', 'user'),
+    ('reports_pending', '/api/reports/pending/', 'admin'),
+    ('reports_statistics', '/api/reports/statistics/', 'admin'),
+    ('users_statistics', '/api/users/statistics/', 'admin'),
+]
+
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano sobre valores ordenados"""
+    if not values:
+        return None
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[index]
+
+
+class QueryCounter:
+    """execute_wrapper que solo cuenta: no guarda el SQL ni altera la latencia medida"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _server_name():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and host != '*' and not host.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+class BenchmarkRunner:
+    """
+    Ejecuta los endpoints principales dentro del proceso (pila completa de
+    middleware y vistas, sin red) y mide latencia y consultas por petición.
+    """
+
+    def __init__(self, iterations=50, warmup=5, seed=42, only=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.random = random.Random(seed)
+        self.endpoints = [endpoint for endpoint in ENDPOINTS if not only or endpoint[0] in only]
+
+    def _clients(self):
+        from users.models import CustomUser
+        from publications.models import Favorite
+
+        admin = CustomUser.objects.filter(is_admin=True, is_active=True).order_by('pk').first()
+        user_id = Favorite.objects.order_by('user_id').values_list('user_id', flat=True).first()
+        user = CustomUser.objects.filter(pk=user_id).first() if user_id else None
+        user = user or CustomUser.objects.filter(is_admin=False, is_staff=False, is_active=True).order_by('pk').first()
+        clients = {'anonymous': Client(SERVER_NAME=_server_name())}
+        for kind, account in (('user', user), ('admin', admin)):
+            if account is None:
+                continue
+            token = RefreshToken.for_user(account).access_token
+            clients[kind] = Client(SERVER_NAME=_server_name(), HTTP_AUTHORIZATION=f"Bearer {token}")
+        return clients
+
+    def _samples(self):
+        from categories.models import Category
+        from publications.models import Publication
+
+        publication_ids = list(
+            Publication.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)[:1000]
+        )
+        category_ids = list(Category.objects.filter(is_active=True, parent__isnull=True).values_list('pk', flat=True))
+        return publication_ids, category_ids
+
+    def _path(self, template, publication_ids, category_ids):
+        return template.format(
+            publication_id=self.random.choice(publication_ids) if publication_ids else '',
+            category_id=self.random.choice(category_ids) if category_ids else '',
+        )
+
+    def run_endpoint(self, client, name, template, publication_ids, category_ids):
+        latencies = []
+        queries = []
+        statuses = {}
+        for iteration in range(self.warmup + self.iterations):
+            path = self._path(template, publication_ids, category_ids)
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = client.get(path)
+                elapsed = time.perf_counter() - start
+            if iteration < self.warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(counter.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        latencies.sort()
+        return {
+            'endpoint': name,
+            'path': template,
+            'iterations': self.iterations,
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+        }
+
+    def dataset_size(self):
+        from publications.models import Favorite, Publication
+        from reports.models import Report
+        from users.models import CustomUser
+
+        return {
+            'users': CustomUser.objects.count(),
+            'publications': Publication.objects.count(),
+            'favorites': Favorite.objects.count(),
+            'reports': Report.objects.count(),
+        }
+
+    def run(self, progress=None):
+        clients = self._clients()
+        publication_ids, category_ids = self._samples()
+        results = []
+        for name, template, kind in self.endpoints:
+            if kind not in clients:
+                results.append({'endpoint': name, 'path': template, 'skipped': f"sin usuario '{kind}'"})
+                continue
+            result = self.run_endpoint(clients[kind], name, template, publication_ids, category_ids)
+            results.append(result)
+            if progress:
+                progress(result)
+        return {
+            'meta': {
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'debug': settings.DEBUG,
+                'iterations': self.iterations,
+                'warmup': self.warmup,
+                'dataset': self.dataset_size(),
+            },
+            'results': results,
+        }
+
+
+def compare(report, baseline):
+    """Agrega a cada resultado la variación porcentual de p50/p95 y consultas frente a una corrida anterior"""
+    previous = {result['endpoint']: result for result in baseline.get('results', []) if 'skipped' not in result}
+    for result in report['results']:
+        before = previous.get(result['endpoint'])
+        if before is None or 'skipped' in result:
+            continue
+        result['baseline'] = {
+            metric: before[metric] for metric in ('p50_ms', 'p95_ms', 'queries_per_request')
+        }
+        result['change_pct'] = {
+            metric: round((result[metric] - before[metric]) / before[metric] * 100, 1) if before[metric] else None
+            for metric in ('p50_ms', 'p95_ms', 'queries_per_request')
+        }
+    return report
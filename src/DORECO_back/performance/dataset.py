@@ -0,0 +1,228 @@
+import datetime
+import io
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+EMAIL_DOMAIN = "utez.edu.mx"
+
+NAMES = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Miguel', 'Sofía', 'Diego', 'Valeria', 'Andrés']
+SURNAMES = ['García', 'Hernández', 'López', 'Martínez', 'González', 'Pérez', 'Sánchez', 'Ramírez', 'Flores', 'Torres']
+CATEGORY_TREE = {
+    'Libros': ['Textos universitarios', 'Novelas', 'Manuales técnicos'],
+    'Electrónica': ['Calculadoras', 'Computadoras', 'Accesorios'],
+    'Papelería': ['Cuadernos', 'Material de dibujo'],
+    'Ropa': ['Uniformes', 'Batas de laboratorio'],
+    'Deportes': ['Bicicletas', 'Balones'],
+    'Hogar': ['Muebles', 'Electrodomésticos'],
+    'Laboratorio': ['Instrumentos', 'Kits de práctica'],
+    'Música': ['Instrumentos musicales'],
+}
+ITEMS = [
+    'calculadora científica', 'libro de cálculo', 'laptop', 'mochila', 'bicicleta', 'bata de laboratorio',
+    'juego de escuadras', 'cuaderno profesional', 'audífonos', 'monitor', 'teclado', 'silla de escritorio',
+    'guitarra', 'balón de fútbol', 'kit de electrónica', 'multímetro', 'novela', 'diccionario de inglés',
+]
+ADJECTIVES = ['usado', 'como nuevo', 'en buen estado', 'poco uso', 'seminuevo', 'con detalles', 'original']
+SENTENCES = [
+    'Lo entrego en la explanada de la universidad.',
+    'Incluye estuche y manual.',
+    'Ideal para estudiantes de primer cuatrimestre.',
+    'Funciona perfectamente, solo tiene detalles estéticos.',
+    'Se puede revisar antes de la entrega.',
+    'Precio a tratar con alumnos de la UTEZ.',
+    'Lo uso poco porque ya terminé la materia.',
+]
+IMAGE_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+
+
+class DatasetGenerator:
+    """
+    Genera un conjunto de datos sintético y reproducible (misma semilla, mismos
+    datos) con bulk_create por bloques. Las señales no se disparan: los datos
+    derivados (contadores, índices, rollups, cola de moderación) se
+    reconstruyen después con los comandos de cada app.
+    """
+
+    def __init__(self, prefix='seed', seed=42, batch_size=5000, days=180, progress=None):
+        self.prefix = prefix
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.progress = progress or (lambda message: None)
+        self.now = timezone.now()
+
+    def _uuid(self):
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def _spread_created_at(self, queryset, index, batches):
+        """Reparte los bloques en la ventana de `days` días (los primeros, los más antiguos)"""
+        age = self.days * (1 - index / max(batches, 1))
+        moment = self.now - datetime.timedelta(days=age, seconds=self.random.randrange(86400))
+        queryset.update(created_at=moment)
+
+    def _batches(self, total):
+        count = (total + self.batch_size - 1) // self.batch_size
+        for index in range(count):
+            yield index, count, min(self.batch_size, total - index * self.batch_size)
+
+    def email(self, number):
+        return f"{self.prefix}-{number}@{EMAIL_DOMAIN}"
+
+    def create_images(self, count=8):
+        """Imágenes de relleno compartidas por las publicaciones (se guardan una sola vez)"""
+        names = []
+        for index in range(count):
+            buffer = io.BytesIO()
+            Image.new('RGB', (800, 600), IMAGE_COLORS[index % len(IMAGE_COLORS)]).save(buffer, format='JPEG', quality=70)
+            name = f"publications/{self.prefix}-{index}.jpg"
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            names.append(name)
+        return names
+
+    def create_categories(self, count):
+        from categories.models import Category
+
+        category_ids = []
+        for root_name, children in CATEGORY_TREE.items():
+            if len(category_ids) >= count:
+                break
+            root, _ = Category.objects.get_or_create(name=root_name, defaults={'is_active': True})
+            category_ids.append(root.pk)
+            for child_name in children:
+                if len(category_ids) >= count:
+                    break
+                child, _ = Category.objects.get_or_create(name=child_name, defaults={'is_active': True, 'parent': root})
+                category_ids.append(child.pk)
+        return category_ids
+
+    def create_users(self, total, admin_password):
+        """
+        Usuarios con contraseña inutilizable (los benchmarks se autentican con
+        tokens emitidos directamente) y un administrador con `admin_password`
+        """
+        from users.models import CustomUser
+        from users.provisioning import DEFAULT_ROLE_ID
+
+        password = make_password(None)
+        for index, batches, size in self._batches(total):
+            start = index * self.batch_size
+            users = [
+                CustomUser(
+                    name=self.random.choice(NAMES),
+                    surnames=f"{self.random.choice(SURNAMES)} {self.random.choice(SURNAMES)}",
+                    email=self.email(number),
+                    username=f"{self.prefix}{number}",
+                    password=password,
+                    role_id=DEFAULT_ROLE_ID,
+                )
+                for number in range(start, start + size)
+            ]
+            with transaction.atomic():
+                CustomUser.objects.bulk_create(users)
+                self._spread_created_at(CustomUser.objects.filter(email__in=[user.email for user in users]), index, batches)
+            self.progress(f"usuarios: {start + size}/{total}")
+
+        admin, _ = CustomUser.objects.get_or_create(
+            email=f"{self.prefix}-admin@{EMAIL_DOMAIN}",
+            defaults={
+                'name': 'Administrador', 'surnames': 'Benchmark', 'username': f"{self.prefix}admin",
+                'password': make_password(admin_password), 'role_id': DEFAULT_ROLE_ID,
+                'is_admin': True, 'is_staff': True,
+            },
+        )
+        # bulk_create no devuelve llaves primarias en MySQL: se recuperan por email
+        user_ids = list(
+            CustomUser.objects.filter(email__startswith=f"{self.prefix}-").exclude(pk=admin.pk)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        return user_ids, admin
+
+    def create_publications(self, total, user_ids, category_ids, images):
+        from publications.models import Publication
+
+        types = [choice for choice, _ in Publication.TYPE_CHOICES]
+        conditions = [choice for choice, _ in Publication.CONDITION_CHOICES]
+        statuses = ['available'] * 8 + ['reserved', 'completed']
+        owners = {}
+        for index, batches, size in self._batches(total):
+            publications = []
+            for _ in range(size):
+                item = self.random.choice(ITEMS)
+                publication_type = self.random.choice(types)
+                publication = Publication(
+                    id=self._uuid(),
+                    title=f"{item.capitalize()} {self.random.choice(ADJECTIVES)}",
+                    description=' '.join(self.random.sample(SENTENCES, 3)),
+                    category_id=self.random.choice(category_ids),
+                    condition=self.random.choice(conditions),
+                    publication_type=publication_type,
+                    price=self.random.randrange(50, 5000) if publication_type == 'sale' else None,
+                    keywords=', '.join(item.split()[:2] + [self.random.choice(ADJECTIVES)]),
+                    owner_id=self.random.choice(user_ids),
+                    image1=self.random.choice(images),
+                    status=self.random.choice(statuses),
+                    is_active=self.random.random() > 0.05,
+                    views_count=int(self.random.paretovariate(1.5) * 10),
+                )
+                owners[publication.pk] = publication.owner_id
+                publications.append(publication)
+            with transaction.atomic():
+                Publication.objects.bulk_create(publications)
+                self._spread_created_at(
+                    Publication.objects.filter(pk__in=[publication.pk for publication in publications]), index, batches
+                )
+            self.progress(f"publicaciones: {index * self.batch_size + size}/{total}")
+        return owners
+
+    def _pairs(self, size, user_ids, publication_ids, owners):
+        """Pares (usuario, publicación) únicos en el bloque y sin publicaciones propias"""
+        pairs = set()
+        attempts = size * 20  # tope para conjuntos pequeños con pocos pares posibles
+        while len(pairs) < size and attempts:
+            attempts -= 1
+            user_id = self.random.choice(user_ids)
+            publication_id = self.random.choice(publication_ids)
+            if owners[publication_id] != user_id:
+                pairs.add((user_id, publication_id))
+        return sorted(pairs, key=lambda pair: (pair[0], str(pair[1])))
+
+    def create_favorites(self, total, user_ids, owners):
+        from publications.models import Favorite
+
+        publication_ids = list(owners)
+        for index, _, size in self._batches(total):
+            # ignore_conflicts: un par repetido entre bloques se descarta (unique_together)
+            Favorite.objects.bulk_create(
+                [Favorite(user_id=user_id, publication_id=publication_id)
+                 for user_id, publication_id in self._pairs(size, user_ids, publication_ids, owners)],
+                ignore_conflicts=True,
+            )
+            self.progress(f"favoritos: {index * self.batch_size + size}/{total}")
+
+    def create_reports(self, total, user_ids, owners):
+        from reports.models import Report
+
+        publication_ids = list(owners)
+        reasons = [choice for choice, _ in Report.REASON_CHOICES]
+        statuses = ['pending'] * 7 + ['reviewed', 'resolved', 'dismissed']
+        for index, batches, size in self._batches(total):
+            reports = [
+                Report(
+                    publication_id=publication_id,
+                    reported_by_id=user_id,
+                    reason=self.random.choice(reasons),
+                    description=self.random.choice(SENTENCES),
+                    status=self.random.choice(statuses),
+                )
+                for user_id, publication_id in self._pairs(size, user_ids, publication_ids, owners)
+            ]
+            Report.objects.bulk_create(reports, ignore_conflicts=True)
+            self.progress(f"reportes: {index * self.batch_size + size}/{total}")
@@ -0,0 +1,155 @@
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Recolector de la petición en curso. Un ContextVar (y no un atributo del hilo)
+# para que las consultas de las vistas async, que se ejecutan en otro hilo vía
+# sync_to_async, se atribuyan a la petición correcta.
+current_recorder = ContextVar('query_recorder', default=None)
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+
+def get_instrumentation_config():
+    return getattr(settings, 'QUERY_INSTRUMENTATION', {})
+
+
+def fingerprint(sql):
+    """SQL sin valores: consultas iguales salvo parámetros o largo de IN (...) comparten huella"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Consultas de una petición: SQL, parámetros y duración"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, many, time.perf_counter() - start))
+
+    def summary(self, similar_threshold=5, top=5):
+        """
+        Totales y patrones sospechosos: consultas idénticas repetidas
+        (duplicates) y la misma consulta con distintos parámetros muchas
+        veces (similar, típico N+1).
+        """
+        exact = {}
+        by_fingerprint = {}
+        total_time = 0.0
+        for sql, params, many, duration in self.queries:
+            total_time += duration
+            key = (sql, repr(params))
+            exact[key] = exact.get(key, 0) + 1
+            fingerprint_key = fingerprint(sql)
+            count, elapsed = by_fingerprint.get(fingerprint_key, (0, 0.0))
+            by_fingerprint[fingerprint_key] = (count + 1, elapsed + duration)
+
+        duplicates = {}
+        for (sql, _), count in exact.items():
+            if count > 1:
+                fingerprint_key = fingerprint(sql)
+                duplicates[fingerprint_key] = duplicates.get(fingerprint_key, 0) + count - 1
+        similar = [
+            {'sql': sql, 'count': count, 'time_ms': round(elapsed * 1000, 2)}
+            for sql, (count, elapsed) in by_fingerprint.items() if count >= similar_threshold
+        ]
+        similar.sort(key=lambda item: -item['count'])
+        return {
+            'queries': len(self.queries),
+            'db_time_ms': round(total_time * 1000, 2),
+            'duplicate_queries': sum(duplicates.values()),
+            'duplicates': [
+                {'sql': sql, 'repeated': count}
+                for sql, count in sorted(duplicates.items(), key=lambda item: -item[1])[:top]
+            ],
+            'similar': similar[:top],
+        }
+
+
+def query_hook(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """Receptor de connection_created; execute_wrappers sobrevive a las reconexiones"""
+    if query_hook not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_hook)
+
+
+def endpoint_name(request):
+    """"PublicationViewSet.list" para ViewSets de DRF, el nombre de la vista en otro caso"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = match.func
+    view_class = getattr(view, 'cls', None) or getattr(view, 'view_class', None)
+    if view_class is None:
+        return f"{view.__module__}.{view.__name__}"
+    action = (getattr(view, 'actions', None) or {}).get(request.method.lower())
+    return f"{view_class.__name__}.{action or request.method.lower()}"
+
+
+def get_budget(endpoint):
+    """Presupuesto del endpoint: {'queries': n, 'db_time_ms': n} (DEFAULT_BUDGET si no tiene uno propio)"""
+    config = get_instrumentation_config()
+    budget = dict(config.get('DEFAULT_BUDGET', {}))
+    budget.update(config.get('BUDGETS', {}).get(endpoint, {}))
+    return budget
+
+
+def exceeded_budget(summary, budget):
+    return [
+        metric for metric in ('queries', 'db_time_ms')
+        if budget.get(metric) is not None and summary[metric] > budget[metric]
+    ]
+
+
+def report(request, response, recorder):
+    """Agrega los encabezados de depuración y registra el resumen de la petición"""
+    config = get_instrumentation_config()
+    endpoint = endpoint_name(request)
+    summary = recorder.summary(config.get('SIMILAR_THRESHOLD', 5), config.get('TOP_QUERIES', 5))
+    budget = get_budget(endpoint)
+    exceeded = exceeded_budget(summary, budget)
+    summary.update({
+        'endpoint': endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'budget_exceeded': exceeded,
+    })
+    request.query_summary = summary
+
+    if config.get('HEADERS', settings.DEBUG):
+        response['X-DB-Query-Count'] = str(summary['queries'])
+        response['X-DB-Time-Ms'] = str(summary['db_time_ms'])
+        response['X-DB-Duplicate-Queries'] = str(summary['duplicate_queries'])
+        response['X-DB-Similar-Queries'] = str(sum(item['count'] for item in summary['similar']))
+        if exceeded:
+            response['X-DB-Budget-Exceeded'] = ','.join(exceeded)
+
+    if exceeded or summary['similar']:
+        logger.warning(json.dumps(summary, ensure_ascii=False))
+    elif config.get('LOG_ALL', False):
+        logger.info(json.dumps(summary, ensure_ascii=False))
+    return summary
@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from performance.benchmarks import ENDPOINTS, BenchmarkRunner, compare
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia (p50/p95/p99) y consultas por petición de los endpoints principales "
+        "dentro del proceso y escribe el resultado en JSON para comparar entre corridas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--only', nargs='+', choices=[name for name, _, _ in ENDPOINTS], help='Solo estos endpoints')
+        parser.add_argument('--output', help='Archivo JSON de salida (por defecto, la salida estándar)')
+        parser.add_argument('--baseline', help='JSON de una corrida anterior para calcular la variación')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"No se pudo leer la línea base: {exc}")
+
+        runner = BenchmarkRunner(
+            iterations=options['iterations'], warmup=options['warmup'], seed=options['seed'], only=options['only'],
+        )
+        report = runner.run(progress=lambda result: self.stderr.write(
+            f"{result['endpoint']:<24} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+            f"p99 {result['p99_ms']:>8.2f} ms  {result['queries_per_request']:>5} consultas"
+        ))
+        if baseline is not None:
+            report = compare(report, baseline)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Resultados en {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,72 @@
+import secrets
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from performance.dataset import DatasetGenerator
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un conjunto de datos sintético y reproducible para benchmarks (usuarios, "
+        "publicaciones con imágenes, favoritos y reportes) y reconstruye los datos derivados"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--publications', type=int, default=500000)
+        parser.add_argument('--favorites', type=int, default=2000000)
+        parser.add_argument('--reports', type=int, default=100000)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplica todos los volúmenes (p. ej. 0.01 para una prueba rápida)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help='Prefijo de emails y usernames generados')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--days', type=int, default=180, help='Ventana de fechas de creación')
+        parser.add_argument('--with-signatures', action='store_true', help='Calcular también las firmas MinHash (lento)')
+        parser.add_argument('--force', action='store_true', help='Ejecutar aunque DEBUG esté desactivado')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError(
+                "seed_data crea miles de usuarios y un administrador: solo se ejecuta con DEBUG activo. "
+                "Usa --force si esta base de datos es de pruebas."
+            )
+        prefix = options['prefix']
+        if CustomUser.objects.filter(email__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Ya existen datos con el prefijo '{prefix}'. Usa otro --prefix o una base de datos vacía.")
+        scale = options['scale']
+        volumes = {
+            name: max(1, int(options[name] * scale))
+            for name in ('users', 'publications', 'favorites', 'reports')
+        }
+
+        started = time.monotonic()
+        generator = DatasetGenerator(
+            prefix=prefix, seed=options['seed'], batch_size=options['batch_size'], days=options['days'],
+            progress=lambda message: self.stdout.write(message),
+        )
+        images = generator.create_images()
+        category_ids = generator.create_categories(options['categories'])
+        admin_password = secrets.token_urlsafe(16)
+        user_ids, admin = generator.create_users(volumes['users'], admin_password)
+        owners = generator.create_publications(volumes['publications'], user_ids, category_ids, images)
+        generator.create_favorites(volumes['favorites'], user_ids, owners)
+        generator.create_reports(volumes['reports'], user_ids, owners)
+
+        # bulk_create no dispara señales: datos derivados desde las tablas
+        call_command('reconcile_counters', stdout=self.stdout)
+        call_command('reconcile_category_counts', stdout=self.stdout)
+        call_command('rebuild_moderation_queue', stdout=self.stdout)
+        call_command('build_rollups', '--full', stdout=self.stdout)
+        call_command('rebuild_user_search_index', stdout=self.stdout)
+        if options['with_signatures']:
+            call_command('index_publication_signatures', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos generados en {time.monotonic() - started:.1f} s: {volumes}. "
+            f"Administrador: {admin.email} / {admin_password}"
+        ))
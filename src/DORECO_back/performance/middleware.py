@@ -0,0 +1,157 @@
+import logging
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .instrumentation import QueryRecorder, current_recorder, endpoint_name, get_instrumentation_config, report
+from .profiler import (
+    StackSampler, acquire_slot, get_profiler_config, header_requested, release_slot, save_profile, should_sample,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Cuenta las consultas de cada petición (síncrona o async), su tiempo en
+    base de datos y las repetidas. En DEBUG las expone como encabezados
+    X-DB-*; siempre registra un aviso estructurado (performance.instrumentation)
+    si se supera el presupuesto del endpoint o se detecta un posible N+1.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not get_instrumentation_config().get('ENABLED', True):
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        report(request, response, recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not get_instrumentation_config().get('ENABLED', True):
+            return await self.get_response(request)
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        report(request, response, recorder)
+        return response
+
+
+class RequestProfilerMiddleware:
+    """
+    Perfil de CPU por muestreo de una petición: para administradores que
+    envían el encabezado REQUEST_PROFILER['HEADER'] (X-Profile: 1) o para una
+    fracción SAMPLE_RATE de todas las peticiones. Va antes de
+    QueryInstrumentationMiddleware para adjuntar su resumen de consultas.
+
+    Se muestrea el hilo que ejecuta la vista: bajo ASGI las vistas síncronas
+    (los ViewSets de DRF) corren en el hilo de sync_to_async y no en el del
+    event loop, así que process_view pasa el muestreo a ese hilo. En las
+    vistas async se muestrean ambos: el event loop y el hilo de sync_to_async
+    donde corren sus consultas al ORM.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _is_admin(self, request):
+        from rest_framework.exceptions import APIException
+        from users.authentication import CachedJWTAuthentication
+        from users.permissions import Capabilities
+
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+        return result is not None and Capabilities(result[0]).is_admin
+
+    async def _ais_admin(self, request):
+        from rest_framework.exceptions import APIException
+        from users.authentication import aget_request_user
+        from users.permissions import Capabilities
+
+        try:
+            return Capabilities(await aget_request_user(request)).is_admin
+        except APIException:
+            return False
+
+    def _start(self, request, trigger):
+        if trigger is None or not acquire_slot():
+            return None
+        interval = get_profiler_config().get('INTERVAL_MS', 5) / 1000
+        request._profiler_sampler = StackSampler(threading.get_ident(), interval).start()
+        return request._profiler_sampler
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Síncrono a propósito: en modo async Django lo ejecuta con sync_to_async en
+        # el mismo hilo (thread_sensitive) que luego ejecuta la vista síncrona
+        sampler = getattr(request, '_profiler_sampler', None)
+        if sampler is not None:
+            sampler.follow(threading.get_ident(), replace=not iscoroutinefunction(view_func))
+        return None
+
+    def _finish(self, request, response, sampler, trigger):
+        try:
+            profile_id = save_profile(request, response, sampler, endpoint_name(request), trigger)
+        except OSError:
+            logger.exception("No se pudo guardar el perfil de %s", request.path)
+            return response
+        if trigger == 'header':
+            response['X-Profile-Id'] = profile_id
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not get_profiler_config().get('ENABLED', True):
+            return self.get_response(request)
+        trigger = 'header' if header_requested(request) and self._is_admin(request) else (
+            'sample' if should_sample() else None
+        )
+        sampler = self._start(request, trigger)
+        if sampler is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+            release_slot()
+        return self._finish(request, response, sampler, trigger)
+
+    async def __acall__(self, request):
+        if not get_profiler_config().get('ENABLED', True):
+            return await self.get_response(request)
+        trigger = 'header' if header_requested(request) and await self._ais_admin(request) else (
+            'sample' if should_sample() else None
+        )
+        sampler = self._start(request, trigger)
+        if sampler is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+            release_slot()
+        return self._finish(request, response, sampler, trigger)
@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_PATTERN = r'[0-9A-Za-z-]+'
+_PROFILE_ID = re.compile(rf'^{PROFILE_ID_PATTERN}$')
+MAX_DEPTH = 128
+
+
+def get_profiler_config():
+    return getattr(settings, 'REQUEST_PROFILER', {})
+
+
+def get_profile_directory():
+    return str(get_profiler_config().get('DIRECTORY', os.path.join(settings.BASE_DIR, 'profiles')))
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}:{frame.f_lineno}"
+
+
+def fold(frame):
+    """Pila en formato "folded" (raíz primero, marcos separados por ';')"""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame).replace(';', ':').replace(' ', '_'))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Muestreador de pila: un hilo aparte lee cada INTERVAL_MS la pila de los
+    hilos observados con sys._current_frames(). No instrumenta llamadas, así
+    que el costo no depende de cuánto código ejecute la vista. follow()
+    agrega o reemplaza hilos (p. ej. el de sync_to_async que ejecuta la vista).
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_ids = frozenset([thread_id])
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = fold(frame)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                self.samples += 1
+
+    def follow(self, thread_id, replace=True):
+        # Se reasigna el conjunto completo: el hilo muestreador lo lee sin bloqueo
+        self.thread_ids = frozenset([thread_id]) if replace else self.thread_ids | {thread_id}
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+
+_slots = None
+
+
+def _get_slots():
+    # Límite de perfiles simultáneos: acota el costo si muchas peticiones se muestrean a la vez
+    global _slots
+    if _slots is None:
+        _slots = threading.BoundedSemaphore(get_profiler_config().get('MAX_CONCURRENT', 2))
+    return _slots
+
+
+def acquire_slot():
+    return _get_slots().acquire(blocking=False)
+
+
+def release_slot():
+    _get_slots().release()
+
+
+def should_sample():
+    rate = get_profiler_config().get('SAMPLE_RATE', 0.0)
+    return rate > 0 and random.random() < rate
+
+
+def header_requested(request):
+    header = get_profiler_config().get('HEADER', 'X-Profile')
+    return request.headers.get(header, '').lower() in ('1', 'true', 'yes')
+
+
+def save_profile(request, response, sampler, endpoint, trigger):
+    """Guarda <id>.folded (compatible con flamegraph.pl/speedscope) y <id>.json con el resumen"""
+    directory = get_profile_directory()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f"{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    with open(os.path.join(directory, f"{profile_id}.folded"), 'w', encoding='utf-8') as file:
+        for stack, count in sorted(sampler.stacks.items(), key=lambda item: -item[1]):
+            file.write(f"{stack} {count}\n")
+
+    summary = getattr(request, 'query_summary', None) or {}
+    metadata = {
+        'id': profile_id,
+        'created_at': timezone.now().isoformat(),
+        'endpoint': endpoint,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'trigger': trigger,
+        'duration_ms': round(sampler.duration * 1000, 2),
+        'interval_ms': round(sampler.interval * 1000, 2),
+        'samples': sampler.samples,
+        'queries': {
+            key: summary[key] for key in ('queries', 'db_time_ms', 'duplicate_queries', 'similar') if key in summary
+        },
+    }
+    with open(os.path.join(directory, f"{profile_id}.json"), 'w', encoding='utf-8') as file:
+        json.dump(metadata, file, ensure_ascii=False)
+    prune_profiles()
+    return profile_id
+
+
+def list_profiles():
+    """Resúmenes de los perfiles guardados, del más reciente al más antiguo"""
+    directory = get_profile_directory()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as file:
+                profiles.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id, extension):
+    """Ruta del archivo de un perfil; None si el id no es válido (evita salir del directorio)"""
+    if not _PROFILE_ID.match(profile_id or ''):
+        return None
+    path = os.path.join(get_profile_directory(), f"{profile_id}.{extension}")
+    return path if os.path.exists(path) else None
+
+
+def prune_profiles():
+    """Conserva solo los MAX_PROFILES más recientes"""
+    directory = get_profile_directory()
+    limit = get_profiler_config().get('MAX_PROFILES', 200)
+    ids = sorted({name.rsplit('.', 1)[0] for name in os.listdir(directory) if name.endswith(('.json', '.folded'))})
+    for profile_id in (ids[:-limit] if limit else []):
+        for extension in ('json', 'folded'):
+            try:
+                os.remove(os.path.join(directory, f"{profile_id}.{extension}"))
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logger.warning("No se pudo eliminar el perfil %s.%s", profile_id, extension)
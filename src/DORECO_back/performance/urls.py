@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ProfileViewSet
+
+router = DefaultRouter()
+router.register(r'performance/profiles', ProfileViewSet, basename='performance-profiles')
+
+urlpatterns = [
+    path('api/', include(router.urls)),
+]
@@ -0,0 +1,36 @@
+import json
+
+from django.http import FileResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from users.permissions import IsAdmin
+from .profiler import PROFILE_ID_PATTERN, list_profiles, profile_path
+
+
+class ProfileViewSet(viewsets.ViewSet):
+    """Perfiles de CPU guardados por RequestProfilerMiddleware (solo administradores)"""
+    permission_classes = [IsAdmin]
+    lookup_value_regex = PROFILE_ID_PATTERN
+    
+    def list(self, request):
+        """Resúmenes de los perfiles, del más reciente al más antiguo"""
+        return Response(list_profiles())
+    
+    def retrieve(self, request, pk=None):
+        path = profile_path(pk, 'json')
+        if path is None:
+            return Response({"error": "Perfil no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        with open(path, encoding='utf-8') as file:
+            return Response(json.load(file))
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Pilas en formato folded (flamegraph.pl, speedscope, inferno)"""
+        path = profile_path(pk, 'folded')
+        if path is None:
+            return Response({"error": "Perfil no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=f"{pk}.folded", content_type='text/plain; charset=utf-8'
+        )
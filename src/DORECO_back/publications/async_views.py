@@ -0,0 +1,118 @@
+import asyncio
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import status
+
+from DORECO_back.async_api import api_response, async_api_view
+from users.authentication import aget_request_user
+from users.permissions import get_capabilities
+from .events import broadcaster
+from .filters import PUBLIC_VISIBILITY, filter_publications
+from .models import Favorite, Publication
+from .serializers import PublicationListSerializer, PublicationSerializer
+from .view_counter import view_counter
+
+NOT_FOUND_MESSAGE = "No Publication matches the given query."
+
+
+def _publication_queryset():
+    return Publication.objects.select_related('owner', 'category').annotate(
+        favorites_count=Count('favorites')
+    )
+
+
+async def _favorite_ids(user):
+    """Ids de publicaciones favoritas del usuario en una sola consulta"""
+    if not user.is_authenticated:
+        return set()
+    favorites = Favorite.objects.filter(user=user).values_list('publication_id', flat=True)
+    return {publication_id async for publication_id in favorites.aiterator()}
+
+
+@async_api_view
+async def publication_list(request):
+    """Versión async de GET /api/publications/ (mismos filtros y respuesta)"""
+    request.user = await aget_request_user(request)
+    queryset = filter_publications(_publication_queryset(), get_capabilities(request), request.GET)
+    publications = [publication async for publication in queryset.aiterator()]
+    context = {'request': request, 'favorite_ids': await _favorite_ids(request.user)}
+    return api_response(PublicationListSerializer(publications, many=True, context=context).data)
+
+
+@async_api_view
+async def publication_detail(request, pk):
+    """Versión async de GET /api/publications/<pk>/"""
+    request.user = await aget_request_user(request)
+    queryset = filter_publications(_publication_queryset(), get_capabilities(request), request.GET)
+    try:
+        publication = await queryset.aget(pk=pk)
+    except Publication.DoesNotExist:
+        raise Http404(NOT_FOUND_MESSAGE)
+    await view_counter.arecord(publication, request)
+    favorite_ids = set()
+    if request.user.is_authenticated and await Favorite.objects.filter(user=request.user, publication=publication).aexists():
+        favorite_ids = {publication.pk}
+    context = {'request': request, 'favorite_ids': favorite_ids}
+    return api_response(PublicationSerializer(publication, context=context).data)
+
+
+@async_api_view
+async def publication_public_info(request, pk):
+    """Versión async de GET /api/publications/<pk>/public/ (ignora el header Authorization)"""
+    request.user = AnonymousUser()
+    try:
+        publication = await Publication.objects.select_related('owner', 'category').aget(
+            pk=pk, **PUBLIC_VISIBILITY
+        )
+    except Publication.DoesNotExist:
+        raise Http404(NOT_FOUND_MESSAGE)
+    await view_counter.arecord(publication, request)
+    context = {'request': request, 'favorite_ids': set()}
+    return api_response(PublicationSerializer(publication, context=context).data)
+
+
+def _parse_filter(value):
+    return {item.strip() for item in value.split(',') if item.strip()} if value else None
+
+
+async def publication_events(request):
+    """
+    Stream SSE de cambios del catálogo (creada, actualizada, cambio de estado,
+    oculta, eliminada). Solo difunde publicaciones visibles sin autenticación;
+    al salir de ese conjunto se envía un evento con solo el id.
+    Filtros opcionales: ?category=1,2&type=donation,loan. Requiere servidor ASGI.
+    """
+    categories = _parse_filter(request.GET.get('category'))
+    if categories is not None:
+        if not all(category.isdigit() for category in categories):
+            return api_response({"error": "El filtro category debe contener ids numéricos"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        categories = {int(category) for category in categories}
+    types = _parse_filter(request.GET.get('type'))
+    keepalive = getattr(settings, 'CATALOG_EVENTS_KEEPALIVE', 25)
+
+    async def stream():
+        subscription = broadcaster.subscribe(categories=categories, types=types)
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield event.encoded
+                if subscription.overflowed:
+                    # Se perdieron eventos: el cliente debe volver a consultar el listado
+                    subscription.overflowed = False
+                    yield b"event: resync\ndata: {}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,163 @@
+import hashlib
+import random
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+from users.search import normalize
+
+# Primo de Mersenne 2^61 - 1 para las permutaciones (a * h + b) mod p
+MERSENNE_PRIME = (1 << 61) - 1
+SHINGLE_SIZE = 3
+
+
+def get_dedup_config():
+    return getattr(settings, 'PUBLICATION_DEDUP', {})
+
+
+def _params():
+    config = get_dedup_config()
+    num_perm = config.get('NUM_PERM', 64)
+    bands = config.get('BANDS', 16)
+    if num_perm % bands:
+        raise ValueError("PUBLICATION_DEDUP: NUM_PERM debe ser múltiplo de BANDS")
+    return num_perm, bands
+
+
+_permutations = {}
+
+
+def _get_permutations(num_perm):
+    # Semilla fija: las firmas guardadas deben seguir siendo comparables entre procesos
+    if num_perm not in _permutations:
+        rng = random.Random(1729)
+        _permutations[num_perm] = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+    return _permutations[num_perm]
+
+
+def publication_text(title, description, keywords):
+    return ' '.join(value or '' for value in (title, description, keywords))
+
+
+def shingles(text):
+    """Conjunto de shingles de 3 palabras del texto normalizado (sin acentos, minúsculas)"""
+    words = re.findall(r'[a-z0-9]+', normalize(text))
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+def minhash(text):
+    """Firma MinHash de NUM_PERM valores; None si el texto no tiene palabras"""
+    values = [_hash(shingle) for shingle in shingles(text)]
+    if not values:
+        return None
+    num_perm, _ = _params()
+    return [
+        min((a * value + b) % MERSENNE_PRIME for value in values)
+        for a, b in _get_permutations(num_perm)
+    ]
+
+
+def band_keys(signature):
+    """Llave de cubeta LSH por banda: publicaciones que coinciden en una banda son candidatas"""
+    num_perm, bands = _params()
+    rows = num_perm // bands
+    return [
+        hashlib.blake2b(repr(signature[band * rows:(band + 1) * rows]).encode(), digest_size=8).hexdigest()
+        for band in range(bands)
+    ]
+
+
+def similarity(signature, other):
+    """Estimación de la similitud de Jaccard: fracción de valores MinHash iguales"""
+    if not signature or not other or len(signature) != len(other):
+        return 0.0
+    return sum(1 for a, b in zip(signature, other) if a == b) / len(signature)
+
+
+def index_publication(publication, signature=None):
+    """Guarda la firma de la publicación y sus cubetas LSH (reemplaza las anteriores)"""
+    from .models import PublicationLSHBucket, PublicationSignature
+
+    if signature is None:
+        signature = minhash(publication_text(publication.title, publication.description, publication.keywords))
+    with transaction.atomic():
+        PublicationLSHBucket.objects.filter(publication_id=publication.pk).delete()
+        if signature is None:
+            PublicationSignature.objects.filter(publication_id=publication.pk).delete()
+            return None
+        PublicationSignature.objects.update_or_create(
+            publication_id=publication.pk, defaults={'signature': signature}
+        )
+        PublicationLSHBucket.objects.bulk_create([
+            PublicationLSHBucket(publication_id=publication.pk, band=band, bucket=key)
+            for band, key in enumerate(band_keys(signature))
+        ])
+    return signature
+
+
+def index_publications(publications):
+    """Versión por lote de index_publication: un DELETE y dos INSERT por bloque"""
+    from .models import PublicationLSHBucket, PublicationSignature
+
+    signatures = {
+        publication.pk: minhash(publication_text(publication.title, publication.description, publication.keywords))
+        for publication in publications
+    }
+    with transaction.atomic():
+        PublicationLSHBucket.objects.filter(publication_id__in=signatures).delete()
+        PublicationSignature.objects.filter(publication_id__in=signatures).delete()
+        PublicationSignature.objects.bulk_create([
+            PublicationSignature(publication_id=publication_id, signature=signature)
+            for publication_id, signature in signatures.items() if signature is not None
+        ])
+        PublicationLSHBucket.objects.bulk_create([
+            PublicationLSHBucket(publication_id=publication_id, band=band, bucket=key)
+            for publication_id, signature in signatures.items() if signature is not None
+            for band, key in enumerate(band_keys(signature))
+        ])
+    return sum(1 for signature in signatures.values() if signature is not None)
+
+
+def find_similar(signature, exclude_id=None, threshold=None, limit=None, visible_only=False):
+    """
+    Publicaciones casi duplicadas de una firma: candidatas por cubetas LSH
+    (una consulta por índice), confirmadas con la similitud estimada.
+    visible_only descarta las inactivas u ocultas (avisos a usuarios no admin).
+    Devuelve [(publication_id, similitud)] de mayor a menor.
+    """
+    from .models import PublicationLSHBucket, PublicationSignature
+
+    if not signature:
+        return []
+    config = get_dedup_config()
+    threshold = config.get('THRESHOLD', 0.6) if threshold is None else threshold
+    limit = config.get('MAX_CANDIDATES', 10) if limit is None else limit
+
+    lookup = Q()
+    for band, key in enumerate(band_keys(signature)):
+        lookup |= Q(band=band, bucket=key)
+    candidates = PublicationLSHBucket.objects.filter(lookup)
+    if exclude_id is not None:
+        candidates = candidates.exclude(publication_id=exclude_id)
+    if visible_only:
+        candidates = candidates.filter(publication__is_active=True).exclude(publication__status='hidden')
+    # Las que comparten más bandas primero; se acota el trabajo por publicación
+    candidate_ids = list(
+        candidates.values('publication_id').annotate(bands=Count('id'))
+        .order_by('-bands').values_list('publication_id', flat=True)[:limit * 5]
+    )
+    signatures = PublicationSignature.objects.filter(publication_id__in=candidate_ids).values_list('publication_id', 'signature')
+    scored = [(publication_id, similarity(signature, other)) for publication_id, other in signatures]
+    scored = [item for item in scored if item[1] >= threshold]
+    scored.sort(key=lambda item: -item[1])
+    return scored[:limit]
@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+import json
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from .filters import is_publicly_visible
+
+PUBLICATION_CREATED = 'publication.created'
+PUBLICATION_UPDATED = 'publication.updated'
+PUBLICATION_STATUS_CHANGED = 'publication.status_changed'
+PUBLICATION_DELETED = 'publication.deleted'
+# La publicación dejó de ser visible sin autenticación (inactiva, reservada, moderada...)
+PUBLICATION_HIDDEN = 'publication.hidden'
+
+
+class CatalogEvent:
+    """Evento del catálogo, codificado una sola vez para todas las conexiones"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, event_type, data, categories, publication_type):
+        self.id = next(self._ids)
+        self.type = event_type
+        self.data = data
+        # Categorías a las que afecta (la actual, la anterior si cambió y sus ancestros); solo para filtrar
+        self.categories = categories
+        self.publication_type = publication_type
+        payload = json.dumps(data, cls=JSONEncoder)
+        self.encoded = f"id: {self.id}\nevent: {event_type}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    """Conexión SSE suscrita al broadcaster, con sus filtros"""
+
+    def __init__(self, loop, queue_size, categories=None, types=None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.categories = categories
+        self.types = types
+        self.overflowed = False
+
+    def matches(self, event):
+        # None = sin filtro; un filtro dado nunca equivale a "todas"
+        if self.types is not None and event.publication_type not in self.types:
+            return False
+        if self.categories is not None and not (self.categories & event.categories):
+            return False
+        return True
+
+    def offer(self, event):
+        # Se ejecuta en el event loop de la conexión
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: se descartan eventos y se le pide resincronizar
+            self.overflowed = True
+
+
+class CatalogBroadcaster:
+    """
+    Difunde los cambios del catálogo a todas las conexiones SSE del proceso.
+    Un único punto de publicación reemplaza el sondeo a la base de datos por
+    cliente; una conexión inactiva solo cuesta su cola y una corrutina.
+    """
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, categories=None, types=None):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size, categories, types)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        """Puede llamarse desde cualquier hilo (p. ej. señales de vistas síncronas)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.matches(event):
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, event)
+                except RuntimeError:
+                    # El loop ya se cerró; la conexión se limpiará sola
+                    pass
+
+
+def publication_event_data(publication):
+    """Datos públicos mínimos de una publicación para los eventos"""
+    return {
+        'id': publication.pk,
+        'title': publication.title,
+        'category': publication.category_id,
+        'publication_type': publication.publication_type,
+        'status': publication.status,
+        'is_active': publication.is_active,
+        'price': publication.price,
+        'updated_at': publication.updated_at,
+    }
+
+
+def _with_ancestors(publication, category_ids):
+    """
+    Las categorías y sus ancestros: quien se suscribe a una categoría recibe
+    también los eventos de sus subcategorías, como el filtro ?category= del listado
+    """
+    from categories.models import Category
+    from categories.tree import ancestor_ids
+
+    if category_ids == {publication.category_id} and type(publication).category.is_cached(publication):
+        # Sin consulta si la categoría ya viene cargada (p. ej. select_related en moderación)
+        paths = [publication.category.path] if publication.category is not None else []
+    else:
+        paths = Category.objects.filter(pk__in=category_ids).values_list('path', flat=True)
+    ids = set(category_ids)
+    for path in paths:
+        ids.update(ancestor_ids(path))
+    return ids
+
+
+def publish_publication_event(event_type, publication, previous_category=None):
+    """
+    El stream no tiene autenticación: solo se difunden publicaciones visibles
+    para anónimos (PUBLIC_VISIBILITY). Si una publicación sale de ese conjunto
+    (o se elimina siendo visible) se envía un evento con solo el id; las que
+    nunca fueron visibles no generan eventos.
+    """
+    categories = {publication.category_id}
+    if previous_category is not None and previous_category != publication.category_id:
+        categories.add(previous_category)
+
+    visible = is_publicly_visible(publication.is_active, publication.status)
+    if event_type == PUBLICATION_DELETED:
+        if not visible:
+            return
+        data = {'id': publication.pk}
+    elif visible:
+        data = publication_event_data(publication)
+        if len(categories) > 1:
+            data['previous_category'] = previous_category
+    elif is_publicly_visible(publication.get_loaded_value('is_active'), publication.get_loaded_value('status')):
+        event_type = PUBLICATION_HIDDEN
+        data = {'id': publication.pk}
+    else:
+        return
+    event = CatalogEvent(event_type, data, _with_ancestors(publication, categories), publication.publication_type)
+    transaction.on_commit(lambda: broadcaster.publish(event))
+
+
+broadcaster = CatalogBroadcaster(queue_size=getattr(settings, 'CATALOG_EVENTS_QUEUE_SIZE', 100))
@@ -0,0 +1,56 @@
+from django.db.models import Q
+
+from categories.tree import subtree_filter
+
+# Publicaciones visibles sin autenticación (listado anónimo, /public/ y eventos SSE)
+PUBLIC_VISIBILITY = {'is_active': True, 'status': 'available'}
+
+
+def is_publicly_visible(is_active, status):
+    return is_active is PUBLIC_VISIBILITY['is_active'] and status == PUBLIC_VISIBILITY['status']
+
+
+def filter_publications(queryset, capabilities, params):
+    """
+    Filtros compartidos del listado de publicaciones (vistas síncronas y async):
+    visibilidad según las capacidades del usuario (users.permissions) y
+    parámetros search, category, type, condition, status, owner y ordering
+    """
+    if not capabilities.is_authenticated:
+        queryset = queryset.filter(**PUBLIC_VISIBILITY)
+    elif not capabilities.is_admin:
+        # Usuarios autenticados ven todas las activas
+        queryset = queryset.filter(is_active=True)
+
+    search = params.get('search', None)
+    if search:
+        queryset = queryset.filter(
+            Q(title__icontains=search) |
+            Q(description__icontains=search) |
+            Q(keywords__icontains=search)
+        )
+
+    category = params.get('category', None)
+    if category:
+        # Incluye las subcategorías
+        queryset = queryset.filter(subtree_filter(category))
+
+    publication_type = params.get('type', None)
+    if publication_type:
+        queryset = queryset.filter(publication_type=publication_type)
+
+    condition = params.get('condition', None)
+    if condition:
+        queryset = queryset.filter(condition=condition)
+
+    status_filter = params.get('status', None)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    owner = params.get('owner', None)
+    if owner:
+        queryset = queryset.filter(owner_id=owner)
+
+    if params.get('ordering') == 'popular':
+        return queryset.order_by('-views_count', '-created_at')
+    return queryset.order_by('-created_at')
@@ -0,0 +1,126 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el throughput concurrente de las vistas síncronas (DRF) y async de lectura "
+        "contra un servidor en ejecución, p. ej.: uvicorn DORECO_back.asgi:application --workers 1"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--requests', type=int, default=500, help='Peticiones por endpoint')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--email', help='Usuario para los endpoints autenticados')
+        parser.add_argument('--password')
+        parser.add_argument('--json', action='store_true', help='Imprimir resultados como JSON')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['base_url'])
+        self.host, self.port = url.hostname, url.port or 80
+        headers = {}
+        if options['email']:
+            status, body = self.request('POST', '/auth/login/', {}, json.dumps({
+                'email': options['email'], 'password': options['password'],
+            }))
+            if status != 200:
+                raise CommandError(f"Login fallido ({status}): {body[:200]}")
+            headers['Authorization'] = f"Bearer {json.loads(body)['access']}"
+
+        status, body = self.request('GET', '/api/publications/', headers)
+        publications = json.loads(body) if status == 200 else []
+        if not publications:
+            raise CommandError("Se necesita al menos una publicación disponible para el benchmark.")
+        publication_id = publications[0]['id']
+
+        pairs = [
+            ('list', '/api/publications/', '/api/async/publications/'),
+            ('retrieve', f'/api/publications/{publication_id}/', f'/api/async/publications/{publication_id}/'),
+            ('public_info', f'/api/publications/{publication_id}/public/', f'/api/async/publications/{publication_id}/public/'),
+        ]
+        if headers:
+            pairs.append(('categories_active', '/api/categories/active/', '/api/async/categories/active/'))
+
+        results = []
+        for name, sync_path, async_path in pairs:
+            for kind, path in (('sync', sync_path), ('async', async_path)):
+                result = self.run_load(path, headers, options['requests'], options['concurrency'])
+                result.update({'endpoint': name, 'kind': kind, 'path': path})
+                results.append(result)
+                if not options['json']:
+                    self.stdout.write(
+                        f"{name:<18} {kind:<5} {result['requests_per_second']:>9.1f} req/s  "
+                        f"p50 {result['p50_ms']:>7.1f} ms  p95 {result['p95_ms']:>7.1f} ms  "
+                        f"errores {result['errors']}"
+                    )
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+
+    def request(self, method, path, headers, body=None, connection=None):
+        own_connection = connection is None
+        connection = connection or http.client.HTTPConnection(self.host, self.port, timeout=30)
+        request_headers = dict(headers)
+        if body is not None:
+            request_headers['Content-Type'] = 'application/json'
+        connection.request(method, path, body=body, headers=request_headers)
+        response = connection.getresponse()
+        data = response.read()
+        if own_connection:
+            connection.close()
+        return response.status, data
+
+    def run_load(self, path, headers, total, concurrency):
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        remaining = [total]
+
+        def worker():
+            nonlocal errors
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                start = time.perf_counter()
+                try:
+                    status, _ = self.request('GET', path, headers, connection=connection)
+                    ok = status == 200
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                    connection.close()
+                    connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if not ok:
+                        errors += 1
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(worker) for _ in range(concurrency)]
+            for future in futures:
+                future.result()
+        duration = time.perf_counter() - started
+
+        latencies.sort()
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'concurrency': concurrency,
+            'duration_s': round(duration, 3),
+            'requests_per_second': len(latencies) / duration if duration else 0,
+            'p50_ms': quantiles[49] * 1000,
+            'p95_ms': quantiles[94] * 1000,
+        }
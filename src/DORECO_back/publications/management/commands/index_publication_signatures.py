@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from publications.dedup import index_publications
+from publications.models import Publication, PublicationLSHBucket, PublicationSignature
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula las firmas MinHash y cubetas LSH de las publicaciones sin firma; "
+        "con --rebuild recalcula todas (necesario al cambiar PUBLICATION_DEDUP)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--rebuild', action='store_true', help='Descartar el índice y recalcular todas')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        publications = Publication.objects.only('id', 'title', 'description', 'keywords').order_by('id')
+        if options['rebuild']:
+            PublicationLSHBucket.objects.all().delete()
+            PublicationSignature.objects.all().delete()
+        else:
+            publications = publications.filter(signature__isnull=True)
+        last_id = None
+        total = indexed = 0
+        while True:
+            chunk = publications if last_id is None else publications.filter(id__gt=last_id)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            indexed += index_publications(chunk)
+            last_id = chunk[-1].id
+            total += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"{total} publicaciones procesadas, {indexed} con firma"))
@@ -1,9 +1,17 @@
 import uuid
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.conf import settings
 from categories.models import Category
+from DORECO_back.model_mixins import LoadedValuesMixin
 
-class Publication(models.Model):
+
+# Se mantienen con UPDATE ... F() (publications.view_counter): save() no los sobrescribe
+MAINTAINED_FIELDS = ('views_count',)
+
+
+class Publication(LoadedValuesMixin, models.Model):
     TYPE_CHOICES = [
         ('donation', 'Donación'),
         ('loan', 'Préstamo'),
@@ -47,8 +55,11 @@ class Publication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
     is_active = models.BooleanField(default=True)
     
+    # Métricas (se actualiza en lote desde publications.view_counter)
+    views_count = models.PositiveIntegerField(default=0, editable=False)
+    
     # Fechas
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -57,6 +68,15 @@ class Publication(models.Model):
     def __str__(self):
         return f"{self.title} - {self.get_publication_type_display()}"
     
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # El contador en memoria puede estar desactualizado frente al de la base
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     def get_keywords_list(self):
         return [keyword.strip() for keyword in self.keywords.split(',') if keyword.strip()]
 
@@ -72,3 +92,58 @@ class Favorite(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.publication.title}"
+
+
+class PublicationSignature(models.Model):
+    """Firma MinHash del texto de la publicación (ver publications.dedup)"""
+    publication = models.OneToOneField(Publication, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    signature = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "publication_signature"
+
+
+class PublicationLSHBucket(models.Model):
+    """Cubeta LSH de una banda de la firma; publicaciones en la misma cubeta son candidatas a duplicado"""
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=16)
+
+    class Meta:
+        db_table = "publication_lsh_bucket"
+        unique_together = ['publication', 'band']
+        indexes = [models.Index(fields=['band', 'bucket'])]
+
+
+@receiver(post_save, sender=Publication)
+def index_publication_text(sender, instance, created, **kwargs):
+    from .dedup import index_publication
+    text_changed = any(
+        instance.get_loaded_value(attname, getattr(instance, attname)) != getattr(instance, attname)
+        for attname in ('title', 'description', 'keywords')
+    )
+    if created or text_changed:
+        index_publication(instance)
+
+
+@receiver(post_save, sender=Publication)
+def broadcast_publication_saved(sender, instance, created, **kwargs):
+    from .events import (
+        PUBLICATION_CREATED, PUBLICATION_STATUS_CHANGED, PUBLICATION_UPDATED,
+        publish_publication_event
+    )
+    previous_status = instance.get_loaded_value('status')
+    if created:
+        event_type = PUBLICATION_CREATED
+    elif previous_status is not None and previous_status != instance.status:
+        event_type = PUBLICATION_STATUS_CHANGED
+    else:
+        event_type = PUBLICATION_UPDATED
+    publish_publication_event(event_type, instance, previous_category=instance.get_loaded_value('category_id'))
+
+
+@receiver(post_delete, sender=Publication)
+def broadcast_publication_deleted(sender, instance, **kwargs):
+    from .events import PUBLICATION_DELETED, publish_publication_event
+    publish_publication_event(PUBLICATION_DELETED, instance)
@@ -3,6 +3,8 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Publication, Favorite
 from categories.models import Category
+from users.avatars import avatar_url
+from .dedup import find_similar, minhash, publication_text
 
 User = get_user_model()
 
@@ -10,7 +12,7 @@ User = get_user_model()
 class PublicationSerializer(serializers.ModelSerializer):
     """Serializer para el modelo Publication"""
     owner_name = serializers.CharField(source='owner.username', read_only=True)
-    owner_photo = serializers.ImageField(source='owner.photo', read_only=True)
+    owner_photo = serializers.SerializerMethodField()
     category_name = serializers.CharField(source='category.name', read_only=True)
     keywords_list = serializers.ListField(
         child=serializers.CharField(max_length=100),
@@ -29,13 +31,20 @@ class PublicationSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'category', 'category_name', 'condition',
             'publication_type', 'price', 'keywords', 'keywords_list', 'duration',
             'owner', 'owner_name', 'owner_photo', 'status', 'is_active', 'created_at', 'updated_at',
-            'is_favorite', 'favorites_count',
+            'is_favorite', 'favorites_count', 'views_count',
             'image1', 'image2', 'image3',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'owner', 'owner_name', 'owner_photo', 'category_name', 'is_favorite', 'favorites_count']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'owner', 'owner_name', 'owner_photo', 'category_name', 'is_favorite', 'favorites_count', 'views_count']
+
+    def get_owner_photo(self, obj):
+        """Avatar pequeño del propietario en lugar de la foto original"""
+        return avatar_url(obj.owner, 64, self.context.get('request'))
 
     def get_is_favorite(self, obj):
         """Verificar si la publicación es favorita del usuario actual"""
+        favorite_ids = self.context.get('favorite_ids')
+        if favorite_ids is not None:
+            return obj.pk in favorite_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Favorite.objects.filter(user=request.user, publication=obj).exists()
@@ -75,7 +84,24 @@ class PublicationSerializer(serializers.ModelSerializer):
             validated_data['keywords'] = ', '.join(keywords_list)
         validated_data['owner'] = self.context['request'].user
         
-        return super().create(validated_data)
+        # Aviso de posibles duplicados antes de crear (no bloquea la publicación)
+        signature = minhash(publication_text(
+            validated_data.get('title'), validated_data.get('description'), validated_data.get('keywords')
+        ))
+        possible_duplicates = find_similar(signature, visible_only=True)
+        instance = super().create(validated_data)
+        instance._possible_duplicates = possible_duplicates
+        return instance
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        possible_duplicates = getattr(instance, '_possible_duplicates', None)
+        if possible_duplicates:
+            data['possible_duplicates'] = [
+                {'id': str(publication_id), 'similarity': round(score, 2)}
+                for publication_id, score in possible_duplicates
+            ]
+        return data
 
     def update(self, instance, validated_data):
         keywords_list = validated_data.pop('keywords_list', None)
@@ -186,12 +212,15 @@ class PublicationListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'condition', 'publication_type', 'price',
             'duration', 'keywords','is_active',
-            'owner_name', 'category_name', 'status', 'created_at', 'is_favorite',
+            'owner_name', 'category_name', 'status', 'created_at', 'is_favorite', 'views_count',
             'image1', 'image2', 'image3'
         ]
         read_only_fields = fields
 
     def get_is_favorite(self, obj):
+        favorite_ids = self.context.get('favorite_ids')
+        if favorite_ids is not None:
+            return obj.pk in favorite_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Favorite.objects.filter(user=request.user, publication=obj).exists()
@@ -240,7 +269,7 @@ class MyPublicationsSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'category_name', 'condition', 'image1',
             'publication_type', 'price', 'status', 'is_active', 
-            'created_at', 'updated_at', 'favorites_count'
+            'created_at', 'updated_at', 'favorites_count', 'views_count'
         ]
         read_only_fields = fields
 
@@ -1,3 +1,96 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from categories.models import Category
+from users.models import CustomUser
+from .events import PUBLICATION_CREATED, Subscription, broadcaster
+from .models import Publication
+from .view_counter import PublicationViewCounter
+
+
+class CatalogEventsTests(TestCase):
+    """Eventos SSE: el filtro por categoría incluye las subcategorías, como el listado"""
+
+    def setUp(self):
+        self.owner = CustomUser.objects.get(email='user@example.com')
+        self.parent = Category.objects.create(name='Electrónica')
+        self.child = Category.objects.create(name='Calculadoras', parent=self.parent)
+
+    def capture(self, action):
+        with mock.patch.object(broadcaster, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                action()
+        return [call.args[0] for call in publish.call_args_list]
+
+    def create(self):
+        return Publication.objects.create(
+            title='Calculadora', description='d', category=self.child, condition='new',
+            keywords='calculadora', image1='x.png', publication_type='sale', price=100, owner=self.owner
+        )
+
+    def test_parent_subscription_receives_child_events(self):
+        [event] = self.capture(self.create)
+
+        self.assertEqual(event.type, PUBLICATION_CREATED)
+        self.assertEqual(event.categories, {self.parent.pk, self.child.pk})
+        self.assertTrue(Subscription(None, 1, categories={self.parent.pk}).matches(event))
+
+    def test_invalid_category_filter(self):
+        response = self.client.get('/api/publications/events/', {'category': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+        [event] = self.capture(self.create)
+        # Un filtro dado pero vacío no equivale a "sin filtro"
+        self.assertFalse(Subscription(None, 1, categories=set()).matches(event))
+        self.assertTrue(Subscription(None, 1).matches(event))
+
+
+class ViewCounterTests(TestCase):
+    """Contador de vistas: acumulación en memoria, deduplicación y vaciado sin pisar el conteo"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.get(email='user@example.com')
+        self.viewer = CustomUser.objects.get(email='admin@example.com')
+        self.publication = Publication.objects.create(
+            title='Calculadora', description='d', category=Category.objects.create(name='Electrónica'),
+            condition='new', keywords='calculadora', image1='x.png', publication_type='donation', owner=self.owner
+        )
+        self.counter = PublicationViewCounter(interval=3600, batch_size=1, dedupe_window=60)
+
+    def request(self, user=None, ip='10.0.0.1'):
+        request = RequestFactory().get('/', REMOTE_ADDR=ip, HTTP_USER_AGENT='pruebas')
+        request.user = user or AnonymousUser()
+        return request
+
+    def views_count(self):
+        return Publication.objects.values_list('views_count', flat=True).get(pk=self.publication.pk)
+
+    def test_buffer_dedupe_and_flush(self):
+        self.assertTrue(self.counter.record(self.publication, self.request()))
+        self.assertFalse(self.counter.record(self.publication, self.request()))
+        self.assertTrue(self.counter.record(self.publication, self.request(ip='10.0.0.2')))
+        self.assertTrue(self.counter.record(self.publication, self.request(self.viewer)))
+        # La vista del propietario no cuenta
+        self.assertFalse(self.counter.record(self.publication, self.request(self.owner)))
+
+        self.assertEqual(self.counter.pending(self.publication.pk), 3)
+        self.assertEqual(self.views_count(), 0)
+
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.views_count(), 3)
+        self.assertIsNone(self.counter.pending(self.publication.pk))
+
+    def test_save_keeps_flushed_count(self):
+        stale = Publication.objects.get(pk=self.publication.pk)
+        self.counter.record(self.publication, self.request())
+        self.counter.flush()
+
+        stale.status = 'reserved'
+        stale.save()
+
+        self.assertEqual(self.views_count(), 1)
+        self.assertEqual(Publication.objects.get(pk=self.publication.pk).status, 'reserved')
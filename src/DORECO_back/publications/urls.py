@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import PublicationViewSet, FavoriteViewSet
+from .async_views import (
+    publication_events, publication_list, publication_detail, publication_public_info
+)
 
 # Crear router para las APIs REST
 router = DefaultRouter()
@@ -8,6 +11,9 @@ router.register(r'publications', PublicationViewSet, basename='publications')
 router.register(r'favorites', FavoriteViewSet, basename='favorites')
 
 urlpatterns = [
+    # Stream SSE de cambios del catálogo (antes del router para no confundirse con un <pk>)
+    path('api/publications/events/', publication_events, name='publications-events'),
+    
     # URLs del router (incluye todas las acciones CRUD automáticamente)
     path('api/', include(router.urls)),
     
@@ -18,6 +24,11 @@ urlpatterns = [
     path('api/publications/<uuid:pk>/public/', PublicationViewSet.as_view({'get': 'public_info'}), name='publications-public-info'),
     path('api/publications/<uuid:pk>/send-message/', PublicationViewSet.as_view({'post': 'send_message'}), name='publications-send-message'),
     
+    # Versiones async (ASGI nativas) de las lecturas de publicaciones
+    path('api/async/publications/', publication_list, name='publications-async-list'),
+    path('api/async/publications/<uuid:pk>/', publication_detail, name='publications-async-detail'),
+    path('api/async/publications/<uuid:pk>/public/', publication_public_info, name='publications-async-public-info'),
+    
     # URLs adicionales para favoritos
     path('api/favorites/add/', FavoriteViewSet.as_view({'post': 'add_favorite'}), name='favorites-add'),
     path('api/favorites/remove/', FavoriteViewSet.as_view({'delete': 'remove_favorite'}), name='favorites-remove'),
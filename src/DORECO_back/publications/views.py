@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django.http import HttpResponse
 from django.conf import settings
@@ -11,7 +11,11 @@ from django.utils.html import strip_tags
 import qrcode
 import io
 import base64
-from .models import Publication, Favorite
+from users.permissions import IsOwnerOrAdmin, get_capabilities
+from .models import Publication, Favorite, PublicationSignature
+from .dedup import find_similar, minhash, publication_text
+from .view_counter import view_counter
+from .filters import PUBLIC_VISIBILITY, filter_publications
 from .serializers import (
     PublicationSerializer, PublicationListSerializer, FavoriteSerializer,
     MyPublicationsSerializer, PublicationUpdateSerializer, SendMessageSerializer
@@ -24,9 +28,11 @@ class PublicationViewSet(viewsets.ModelViewSet):
     serializer_class = PublicationSerializer
     
     def get_permissions(self):
-        """Permisos: lectura para todos, escritura solo para autenticados"""
+        """Permisos: lectura para todos, escritura solo para autenticados, edición solo propietario o admin"""
         if self.action in ['list', 'retrieve', 'public_info']:
             self.permission_classes = [permissions.AllowAny]
+        elif self.action in ['update', 'partial_update', 'destroy']:
+            self.permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
         else:
             self.permission_classes = [permissions.IsAuthenticated]
         return super().get_permissions()
@@ -36,42 +42,7 @@ class PublicationViewSet(viewsets.ModelViewSet):
         queryset = Publication.objects.select_related('owner', 'category').annotate(
             favorites_count=Count('favorites')
         )
-        
-        if not self.request.user.is_authenticated:
-            queryset = queryset.filter(is_active=True, status='available')
-        elif not (self.request.user.is_staff or self.request.user.is_admin):
-            # Usuarios autenticados ven todas las activas
-            queryset = queryset.filter(is_active=True)
-        
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(keywords__icontains=search)
-            )
-        
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category_id=category)
-        
-        publication_type = self.request.query_params.get('type', None)
-        if publication_type:
-            queryset = queryset.filter(publication_type=publication_type)
-        
-        condition = self.request.query_params.get('condition', None)
-        if condition:
-            queryset = queryset.filter(condition=condition)
-        
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        owner = self.request.query_params.get('owner', None)
-        if owner:
-            queryset = queryset.filter(owner_id=owner)
-        
-        return queryset.order_by('-created_at')
+        return filter_publications(queryset, get_capabilities(self.request), self.request.query_params)
     
     def get_serializer_class(self):
         """Usar diferentes serializers según la acción"""
@@ -83,20 +54,22 @@ class PublicationViewSet(viewsets.ModelViewSet):
             return PublicationUpdateSerializer
         return PublicationSerializer
     
-    def perform_update(self, serializer):
-        """Solo el propietario o admin pueden actualizar"""
-        publication = self.get_object()
-        if not (self.request.user == publication.owner or 
-                self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo puedes actualizar tus propias publicaciones.")
-        serializer.save()
+    def get_serializer_context(self):
+        """En el listado, los favoritos del usuario en una sola consulta (evita una por publicación)"""
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            user = self.request.user
+            context['favorite_ids'] = set(
+                Favorite.objects.filter(user=user).values_list('publication_id', flat=True)
+            ) if user.is_authenticated else set()
+        return context
     
-    def perform_destroy(self, instance):
-        """Solo el propietario o admin pueden eliminar"""
-        if not (self.request.user == instance.owner or 
-                self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo puedes eliminar tus propias publicaciones.")
-        instance.delete()
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle de la publicación; registra la vista en el contador en memoria"""
+        instance = self.get_object()
+        view_counter.record(instance, request)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def my_publications(self, request):
@@ -139,8 +112,7 @@ class PublicationViewSet(viewsets.ModelViewSet):
         """Cambiar estado de la publicación"""
         publication = self.get_object()
         
-        if not (request.user == publication.owner or 
-                request.user.is_staff or request.user.is_admin):
+        if not get_capabilities(request).can_manage(publication):
             return Response({"error": "No tienes permisos para cambiar el estado"}, 
                           status=status.HTTP_403_FORBIDDEN)
         
@@ -155,6 +127,32 @@ class PublicationViewSet(viewsets.ModelViewSet):
         serializer = PublicationSerializer(publication, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def duplicates(self, request, pk=None):
+        """Publicaciones casi duplicadas (MinHash/LSH) para revisión de administradores"""
+        if not get_capabilities(request).is_admin:
+            return Response({"error": "Solo los administradores pueden consultar duplicados"}, 
+                          status=status.HTTP_403_FORBIDDEN)
+        
+        publication = get_object_or_404(Publication, pk=pk)
+        signature = getattr(PublicationSignature.objects.filter(publication=publication).first(), 'signature', None)
+        if signature is None:
+            # Solo en memoria: guardar la firma es tarea de la señal o de index_publication_signatures
+            signature = minhash(publication_text(publication.title, publication.description, publication.keywords))
+        matches = dict(find_similar(signature, exclude_id=publication.pk))
+        candidates = Publication.objects.filter(pk__in=matches).select_related('owner')
+        
+        results = sorted([
+            {
+                "id": str(candidate.id),
+                "title": candidate.title,
+                "owner": candidate.owner.username,
+                "similarity": round(matches[candidate.pk], 2),
+            }
+            for candidate in candidates
+        ], key=lambda item: -item["similarity"])
+        return Response({"publication_id": str(publication.id), "results": results})
+    
     @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
     def generate_qr(self, request, pk=None):
         """Generar código QR para una publicación específica"""
@@ -212,7 +210,8 @@ class PublicationViewSet(viewsets.ModelViewSet):
     def public_info(self, request, pk=None):
         """Obtener información pública de una publicación por UUID, sin autenticación real (ignora header Authorization)"""
         try:
-            publication = get_object_or_404(Publication, pk=pk, is_active=True, status='available')
+            publication = get_object_or_404(Publication, pk=pk, **PUBLIC_VISIBILITY)
+            view_counter.record(publication, request)
             serializer = PublicationSerializer(publication, context={'request': request})
             return Response(serializer.data)
         except Publication.DoesNotExist:
@@ -285,7 +284,8 @@ class PublicationViewSet(viewsets.ModelViewSet):
 class FavoriteViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar favoritos"""
     serializer_class = FavoriteSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+    owner_field = 'user_id'
     
     def get_queryset(self):
         """Solo favoritos del usuario autenticado"""
@@ -293,11 +293,14 @@ class FavoriteViewSet(viewsets.ModelViewSet):
             'publication', 'publication__owner', 'publication__category'
         ).order_by('-created_at')
     
-    def perform_destroy(self, instance):
-        """Solo el propietario puede eliminar el favorito"""
-        if instance.user != self.request.user:
-            raise PermissionError("Solo puedes eliminar tus propios favoritos.")
-        instance.delete()
+    def get_serializer_context(self):
+        """Todas las publicaciones listadas son favoritas: is_favorite sin una consulta por fila"""
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            context['favorite_ids'] = set(
+                Favorite.objects.filter(user=self.request.user).values_list('publication_id', flat=True)
+            )
+        return context
     
     @action(detail=False, methods=['post'])
     def add_favorite(self, request):
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from reports.models import PublicationReportAggregate, Report
+from reports.moderation import refresh_aggregate
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la cola de moderación desde los reportes pendientes"
+
+    def handle(self, *args, **options):
+        publication_ids = set(
+            Report.objects.filter(status='pending').values_list('publication_id', flat=True).distinct()
+        )
+        # Quitar publicaciones que ya no tienen reportes pendientes
+        stale = PublicationReportAggregate.objects.exclude(publication_id__in=publication_ids)
+        removed = stale.count()
+        stale.delete()
+        for publication_id in publication_ids:
+            refresh_aggregate(publication_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(publication_ids)} publicaciones en la cola, {removed} eliminadas"
+        ))
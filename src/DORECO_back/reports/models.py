@@ -1,8 +1,11 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.conf import settings
 from publications.models import Publication
+from DORECO_back.model_mixins import LoadedValuesMixin
 
-class Report(models.Model):
+class Report(LoadedValuesMixin, models.Model):
     REASON_CHOICES = [
         ('inappropriate', 'Contenido inapropiado'),
         ('spam', 'Spam'),
@@ -35,10 +38,49 @@ class Report(models.Model):
     admin_comment = models.TextField(blank=True, null=True)
     
     # Fechas
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
     class Meta:
         unique_together = ['publication', 'reported_by']
     
     def __str__(self):
-        return f"Reporte: {self.publication.title} por {self.reported_by.username}"
\ No newline at end of file
+        return f"Reporte: {self.publication.title} por {self.reported_by.username}"
+
+
+class PublicationReportAggregate(models.Model):
+    """
+    Reportes pendientes agregados por publicación: la cola de moderación.
+    Solo existen filas para publicaciones con reportes pendientes.
+    """
+    publication = models.OneToOneField(
+        Publication, on_delete=models.CASCADE, primary_key=True, related_name='report_aggregate'
+    )
+    pending_count = models.PositiveIntegerField(default=0)
+    weight_sum = models.FloatField(default=0)
+    reason_counts = models.JSONField(default=dict)
+    first_reported_at = models.DateTimeField()
+    last_reported_at = models.DateTimeField()
+    # weight_sum - AGE_WEIGHT * t0: ordena igual que la prioridad en cualquier instante (ver reports.moderation)
+    priority_key = models.FloatField(db_index=True)
+    auto_hidden_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "report_publication_aggregate"
+
+    def __str__(self):
+        return f"{self.publication_id}: {self.pending_count} reportes pendientes"
+
+
+@receiver(post_save, sender=Report)
+def update_report_aggregate(sender, instance, created, **kwargs):
+    from .moderation import refresh_aggregate
+    if created or instance.get_loaded_value('status', instance.status) != instance.status \
+            or instance.get_loaded_value('reason', instance.reason) != instance.reason:
+        refresh_aggregate(instance.publication_id)
+
+
+@receiver(post_delete, sender=Report)
+def update_report_aggregate_on_delete(sender, instance, **kwargs):
+    from .moderation import refresh_aggregate
+    if instance.get_loaded_value('status', instance.status) == 'pending':
+        refresh_aggregate(instance.publication_id)
@@ -0,0 +1,195 @@
+import base64
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+DEFAULT_REASON_WEIGHTS = {
+    'inappropriate': 3.0,
+    'fake': 2.0,
+    'spam': 1.0,
+    'duplicate': 1.0,
+    'other': 1.0,
+}
+
+
+def get_moderation_config():
+    return getattr(settings, 'MODERATION', {})
+
+
+def reason_weight(reason):
+    weights = get_moderation_config().get('REASON_WEIGHTS', DEFAULT_REASON_WEIGHTS)
+    return float(weights.get(reason, 1.0))
+
+
+def _hours(moment):
+    return moment.timestamp() / 3600
+
+
+def priority_key(weight_sum, first_reported_at):
+    """
+    La prioridad en el instante t es weight_sum + AGE_WEIGHT * (t - t0), con
+    t0 el primer reporte pendiente. Para un mismo t, ordenar por ella equivale
+    a ordenar por weight_sum - AGE_WEIGHT * t0, que no cambia con el tiempo y
+    se puede indexar.
+    """
+    return weight_sum - get_moderation_config().get('AGE_WEIGHT_PER_HOUR', 0.1) * _hours(first_reported_at)
+
+
+def priority_score(aggregate, now=None):
+    """Prioridad actual (la que se muestra); mismo orden que priority_key"""
+    age_weight = get_moderation_config().get('AGE_WEIGHT_PER_HOUR', 0.1)
+    return aggregate.weight_sum + age_weight * (_hours(now or timezone.now()) - _hours(aggregate.first_reported_at))
+
+
+def refresh_aggregate(publication_id):
+    """
+    Recalcula el agregado de reportes pendientes de una publicación (bloquea
+    su fila para serializar reportes concurrentes) y la oculta al cruzar
+    AUTO_HIDE_WEIGHT. Sin reportes pendientes, sale de la cola.
+    """
+    from publications.models import Publication
+    from .models import PublicationReportAggregate, Report
+
+    with transaction.atomic():
+        current = PublicationReportAggregate.objects.select_for_update().filter(publication_id=publication_id).first()
+        rows = list(
+            Report.objects.filter(publication_id=publication_id, status='pending').order_by()
+            .values('reason').annotate(total=Count('pk'), first=Min('created_at'), last=Max('created_at'))
+        )
+        if not rows:
+            if current is not None:
+                current.delete()
+            return None
+
+        weight_sum = sum(reason_weight(row['reason']) * row['total'] for row in rows)
+        first_reported_at = min(row['first'] for row in rows)
+        aggregate, _ = PublicationReportAggregate.objects.update_or_create(
+            publication_id=publication_id,
+            defaults={
+                'pending_count': sum(row['total'] for row in rows),
+                'weight_sum': weight_sum,
+                'reason_counts': {row['reason']: row['total'] for row in rows},
+                'first_reported_at': first_reported_at,
+                'last_reported_at': max(row['last'] for row in rows),
+                'priority_key': priority_key(weight_sum, first_reported_at),
+            },
+        )
+
+        threshold = get_moderation_config().get('AUTO_HIDE_WEIGHT')
+        previous_weight = current.weight_sum if current is not None else 0
+        if threshold is not None and previous_weight < threshold <= weight_sum:
+            publication = Publication.objects.get(pk=publication_id)
+            if publication.status != 'hidden':
+                publication.status = 'hidden'
+                publication.save(update_fields=['status', 'updated_at'])
+                aggregate.auto_hidden_at = timezone.now()
+                aggregate.save(update_fields=['auto_hidden_at'])
+    return aggregate
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key, publication_id):
+    return base64.urlsafe_b64encode(f"{key!r}|{publication_id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        key, publication_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return float(key), publication_id
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Cursor inválido")
+
+
+def moderation_queue(limit=20, cursor=None, reason=None):
+    """
+    Página de la cola de moderación ordenada por prioridad, con paginación
+    por keyset (priority_key, publication_id) sobre el índice de priority_key.
+    Devuelve (agregados con publicación y propietario, cursor siguiente o None).
+    """
+    from .models import PublicationReportAggregate
+
+    queryset = PublicationReportAggregate.objects.select_related('publication', 'publication__owner')
+    if reason:
+        queryset = queryset.filter(reason_counts__has_key=reason)
+    if cursor:
+        key, publication_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(priority_key__lt=key) | Q(priority_key=key, publication_id__gt=publication_id)
+        )
+    page = list(queryset.order_by('-priority_key', 'publication_id')[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].priority_key, page[-1].publication_id)
+    return page, next_cursor
+
+
+RESOLUTION_STATUSES = ['reviewed', 'resolved', 'dismissed']
+PUBLICATION_STATUSES = ['available', 'reserved', 'completed', 'hidden']
+
+
+def bulk_resolve(reviewer, new_status, admin_comment='', ids=None, filters=None,
+                 publication_status=None, chunk_size=1000):
+    """
+    Resuelve varios reportes en una transacción con UPDATE por conjuntos
+    (status, admin_comment, reviewed_by). Los reportes se eligen por ids o por
+    filtros (publication, reason, status). Ajusta los contadores y la cola de
+    moderación y, opcionalmente, cambia el estado de las publicaciones
+    afectadas. Devuelve el resultado por id.
+    """
+    from analytics.counters import adjust_counters, report_status_key
+    from publications.events import PUBLICATION_STATUS_CHANGED, publish_publication_event
+    from publications.models import Publication
+    from .models import Report
+
+    with transaction.atomic():
+        queryset = Report.objects.select_for_update().order_by('id')
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        else:
+            queryset = queryset.filter(**filters)
+        rows = list(queryset.values_list('id', 'publication_id', 'status'))
+
+        found = {row_id for row_id, _, _ in rows}
+        results = [{'id': row_id, 'outcome': 'not_found'} for row_id in (ids or []) if row_id not in found]
+        to_update = [(row_id, publication_id, status) for row_id, publication_id, status in rows if status != new_status]
+        results += [{'id': row_id, 'outcome': 'unchanged'} for row_id, _, status in rows if status == new_status]
+        results += [{'id': row_id, 'outcome': 'updated'} for row_id, _, _ in to_update]
+
+        update_ids = [row_id for row_id, _, _ in to_update]
+        for start in range(0, len(update_ids), chunk_size):
+            Report.objects.filter(id__in=update_ids[start:start + chunk_size]).update(
+                status=new_status, admin_comment=admin_comment, reviewed_by=reviewer
+            )
+
+        # update() no dispara señales: contadores y cola de moderación se ajustan aquí
+        deltas = {}
+        for _, _, status in to_update:
+            deltas[report_status_key(status)] = deltas.get(report_status_key(status), 0) - 1
+        deltas[report_status_key(new_status)] = deltas.get(report_status_key(new_status), 0) + len(to_update)
+        adjust_counters(deltas)
+        for publication_id in sorted({publication_id for _, publication_id, status in to_update if status == 'pending'}):
+            refresh_aggregate(publication_id)
+
+        publications_updated = []
+        if publication_status:
+            publication_ids = {publication_id for _, publication_id, _ in rows}
+            publications = list(
+                Publication.objects.select_for_update().select_related('category')
+                .filter(pk__in=publication_ids).exclude(status=publication_status)
+            )
+            Publication.objects.filter(pk__in=[publication.pk for publication in publications]).update(
+                status=publication_status, updated_at=timezone.now()
+            )
+            for publication in publications:
+                publication.status = publication_status
+                publish_publication_event(PUBLICATION_STATUS_CHANGED, publication)
+                publications_updated.append(str(publication.pk))
+
+    results.sort(key=lambda result: result['id'])
+    return {'updated': len(to_update), 'results': results, 'publications_updated': publications_updated}
@@ -1,12 +1,48 @@
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from django.contrib.auth import get_user_model
-from .models import Report
+from django.db import IntegrityError, transaction
+from .models import PublicationReportAggregate, Report
+from .moderation import priority_score
 from publications.models import Publication
 
 User = get_user_model()
 
 
-class ReportSerializer(serializers.ModelSerializer):
+class DuplicateReport(APIException):
+    """El usuario ya reportó la publicación (restricción única publication/reported_by)"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Ya has reportado esta publicación."
+    default_code = 'duplicate_report'
+
+
+class ReportCreateMixin:
+    """
+    Alta de reportes apoyada en la restricción única de la base de datos en
+    lugar de un exists() previo: un duplicado, incluso concurrente, responde
+    409 en vez de un IntegrityError (500).
+    """
+
+    def validate(self, attrs):
+        # owner_id evita cargar al propietario
+        if 'publication' in attrs and attrs['publication'].owner_id == self.context['request'].user.pk:
+            raise serializers.ValidationError("No puedes reportar tu propia publicación.")
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['reported_by'] = self.context['request'].user
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if Report.objects.filter(
+                publication=validated_data['publication'], reported_by=validated_data['reported_by']
+            ).exists():
+                raise DuplicateReport()
+            raise
+
+
+class ReportSerializer(ReportCreateMixin, serializers.ModelSerializer):
     """Serializer para el modelo Report"""
     reported_by_username = serializers.CharField(source='reported_by.username', read_only=True)
     publication_title = serializers.CharField(source='publication.title', read_only=True)
@@ -26,48 +62,14 @@ class ReportSerializer(serializers.ModelSerializer):
             'publication_owner', 'reviewed_by', 'reviewed_by_username', 'created_at'
         ]
 
-    def create(self, validated_data):
-        validated_data['reported_by'] = self.context['request'].user
-        return super().create(validated_data)
-
-    def validate(self, attrs):
-        user = self.context['request'].user
-        publication = attrs['publication']
-        
-        # Verificar que el usuario no reporte su propia publicación
-        if publication.owner == user:
-            raise serializers.ValidationError("No puedes reportar tu propia publicación.")
-        
-        # Verificar que no haya reportado ya esta publicación
-        if Report.objects.filter(reported_by=user, publication=publication).exists():
-            raise serializers.ValidationError("Ya has reportado esta publicación.")
-        
-        return attrs
-
 
-class CreateReportSerializer(serializers.ModelSerializer):
+class CreateReportSerializer(ReportCreateMixin, serializers.ModelSerializer):
     """Serializer simplificado para crear reportes"""
     
     class Meta:
         model = Report
         fields = ['publication', 'reason', 'description']
 
-    def create(self, validated_data):
-        validated_data['reported_by'] = self.context['request'].user
-        return super().create(validated_data)
-
-    def validate(self, attrs):
-        user = self.context['request'].user
-        publication = attrs['publication']
-        
-        if publication.owner == user:
-            raise serializers.ValidationError("No puedes reportar tu propia publicación.")
-        
-        if Report.objects.filter(reported_by=user, publication=publication).exists():
-            raise serializers.ValidationError("Ya has reportado esta publicación.")
-        
-        return attrs
-
 
 class AdminReportSerializer(serializers.ModelSerializer):
     """Serializer para administradores para gestionar reportes"""
@@ -106,4 +108,24 @@ class ReportListSerializer(serializers.ModelSerializer):
             'id', 'publication_title', 'reported_by_username', 'publication_id','reason',
             'status', 'created_at', 'description'
         ]
-        read_only_fields = fields 
\ No newline at end of file
+        read_only_fields = fields 
+
+
+class ModerationQueueSerializer(serializers.ModelSerializer):
+    """Publicación en la cola de moderación con sus reportes pendientes agregados"""
+    publication_title = serializers.CharField(source='publication.title', read_only=True)
+    publication_status = serializers.CharField(source='publication.status', read_only=True)
+    publication_owner = serializers.CharField(source='publication.owner.username', read_only=True)
+    priority = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PublicationReportAggregate
+        fields = [
+            'publication', 'publication_title', 'publication_status', 'publication_owner',
+            'pending_count', 'reason_counts', 'weight_sum', 'priority',
+            'first_reported_at', 'last_reported_at', 'auto_hidden_at'
+        ]
+        read_only_fields = fields
+
+    def get_priority(self, obj):
+        return round(priority_score(obj, self.context.get('now')), 2)
@@ -1,3 +1,77 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from publications.models import Publication
+from users.models import CustomUser, Role
+from .models import Report
+
+
+class ConcurrentReportCreationTests(TransactionTestCase):
+    """Reportes simultáneos: la restricción única decide, sin errores 500"""
+
+    workers = 8
+
+    def setUp(self):
+        role, _ = Role.objects.get_or_create(name='USER')
+        self.owner = CustomUser.objects.create_user(
+            email='owner@utez.edu.mx', password='Secreta123', name='Dueno',
+            surnames='Prueba', username='owner', role=role
+        )
+        self.reporters = [
+            CustomUser.objects.create_user(
+                email=f'reporter{i}@utez.edu.mx', password='Secreta123', name='Reportero',
+                surnames='Prueba', username=f'reporter{i}', role=role
+            )
+            for i in range(self.workers)
+        ]
+        category = Category.objects.create(name='Libros', description='Libros', is_active=True)
+        self.publication = Publication.objects.create(
+            title='Libro', description='Libro de prueba', category=category, condition='good',
+            publication_type='donation', keywords='libro', owner=self.owner, image1='publications/libro.png'
+        )
+
+    def fire(self, users):
+        """Envía un reporte por usuario, todos a la vez; devuelve los códigos de respuesta"""
+        barrier = threading.Barrier(len(users))
+
+        def submit(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+            try:
+                return client.post('/api/reports/', {
+                    'publication': str(self.publication.pk),
+                    'reason': 'spam',
+                    'description': 'Reporte concurrente',
+                }, format='json').status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            return list(executor.map(submit, users))
+
+    def test_parallel_duplicates_insert_exactly_one(self):
+        codes = self.fire([self.reporters[0]] * self.workers)
+        self.assertNotIn(500, codes)
+        self.assertEqual(codes.count(201), 1)
+        self.assertEqual(codes.count(409), self.workers - 1)
+        self.assertEqual(Report.objects.filter(publication=self.publication).count(), 1)
+
+    def test_parallel_distinct_reporters_all_succeed(self):
+        codes = self.fire(self.reporters)
+        self.assertEqual(codes, [201] * self.workers)
+        self.assertEqual(Report.objects.filter(publication=self.publication).count(), self.workers)
+
+    def test_owner_cannot_report_own_publication(self):
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        response = client.post('/api/reports/', {
+            'publication': str(self.publication.pk), 'reason': 'spam', 'description': 'Propio',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Report.objects.exists())
@@ -2,11 +2,16 @@ from django.shortcuts import render
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import Q
+from django.utils import timezone
+from analytics.counters import REPORTS_TOTAL, get_counters, report_reason_key, report_status_key
+from users.permissions import IsAdmin, get_capabilities
 from .models import Report
+from .moderation import PUBLICATION_STATUSES, RESOLUTION_STATUSES, bulk_resolve, moderation_queue
 from .serializers import (
     ReportSerializer, CreateReportSerializer, AdminReportSerializer,
-    ReportListSerializer
+    ReportListSerializer, ModerationQueueSerializer
 )
 
 
@@ -18,15 +23,15 @@ class ReportViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filtrar reportes según el usuario"""
-        if self.request.user.is_staff or self.request.user.is_admin:
+        if get_capabilities(self.request).is_admin:
             # Admins ven todos los reportes
             queryset = Report.objects.select_related(
-                'publication', 'reported_by', 'reviewed_by'
+                'publication__owner', 'reported_by', 'reviewed_by'
             ).order_by('-created_at')
         else:
             # Usuarios normales solo ven sus reportes
             queryset = Report.objects.filter(reported_by=self.request.user).select_related(
-                'publication', 'reviewed_by'
+                'publication__owner', 'reported_by', 'reviewed_by'
             ).order_by('-created_at')
         
         # Filtros
@@ -40,7 +45,7 @@ class ReportViewSet(viewsets.ModelViewSet):
         
         # Filtro por publicación (solo para admins)
         publication_id = self.request.query_params.get('publication', None)
-        if publication_id and (self.request.user.is_staff or self.request.user.is_admin):
+        if publication_id and get_capabilities(self.request).is_admin:
             queryset = queryset.filter(publication_id=publication_id)
         
         return queryset
@@ -51,7 +56,7 @@ class ReportViewSet(viewsets.ModelViewSet):
             return CreateReportSerializer
         elif self.action == 'list':
             return ReportListSerializer
-        elif self.request.user.is_staff or self.request.user.is_admin:
+        elif get_capabilities(self.request).is_admin:
             return AdminReportSerializer
         return ReportSerializer
     
@@ -59,27 +64,14 @@ class ReportViewSet(viewsets.ModelViewSet):
         """Permisos específicos por acción"""
         if self.action in ['update', 'partial_update', 'destroy']:
             # Solo admins pueden actualizar/eliminar reportes
-            if not (self.request.user.is_staff or self.request.user.is_admin):
-                self.permission_classes = [permissions.IsAuthenticated]
+            self.permission_classes = [permissions.IsAuthenticated, IsAdmin]
         return super().get_permissions()
     
-    def perform_update(self, serializer):
-        """Solo admins pueden actualizar reportes"""
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden actualizar reportes.")
-        serializer.save()
-    
-    def perform_destroy(self, instance):
-        """Solo admins pueden eliminar reportes"""
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden eliminar reportes.")
-        instance.delete()
-    
     @action(detail=False, methods=['get'])
     def my_reports(self, request):
         """Obtener reportes del usuario autenticado"""
         reports = Report.objects.filter(reported_by=request.user).select_related(
-            'publication', 'reviewed_by'
+            'publication', 'reported_by', 'reviewed_by'
         ).order_by('-created_at')
         
         serializer = ReportListSerializer(reports, many=True)
@@ -87,22 +79,27 @@ class ReportViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
-        """Obtener reportes pendientes (solo admins)"""
-        if not (request.user.is_staff or request.user.is_admin):
+        """Cola de moderación: publicaciones con reportes pendientes por prioridad (solo admins)"""
+        if not get_capabilities(request).is_admin:
             return Response({"error": "No tienes permisos para ver reportes pendientes"}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        pending_reports = Report.objects.filter(status='pending').select_related(
-            'publication', 'reported_by'
-        ).order_by('-created_at')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            queue, next_cursor = moderation_queue(
+                limit, request.query_params.get('cursor'), request.query_params.get('reason')
+            )
+        except ValueError:
+            return Response({"error": "Parámetros de paginación inválidos"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = AdminReportSerializer(pending_reports, many=True, context={'request': request})
-        return Response(serializer.data)
+        serializer = ModerationQueueSerializer(queue, many=True, context={'request': request, 'now': timezone.now()})
+        return Response({"results": serializer.data, "next_cursor": next_cursor})
     
     @action(detail=True, methods=['patch'])
     def resolve(self, request, pk=None):
         """Resolver un reporte (solo admins)"""
-        if not (request.user.is_staff or request.user.is_admin):
+        if not get_capabilities(request).is_admin:
             return Response({"error": "No tienes permisos para resolver reportes"}, 
                           status=status.HTTP_403_FORBIDDEN)
         
@@ -122,27 +119,71 @@ class ReportViewSet(viewsets.ModelViewSet):
         serializer = AdminReportSerializer(report, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'], url_path='bulk-resolve')
+    def bulk_resolve(self, request):
+        """Resolver varios reportes por ids o por filtro en una sola transacción (solo admins)"""
+        if not get_capabilities(request).is_admin:
+            return Response({"error": "No tienes permisos para resolver reportes"}, 
+                          status=status.HTTP_403_FORBIDDEN)
+        
+        new_status = request.data.get('status')
+        if new_status not in RESOLUTION_STATUSES:
+            return Response({"error": "Estado inválido"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        publication_status = request.data.get('publication_status')
+        if publication_status and publication_status not in PUBLICATION_STATUSES:
+            return Response({"error": "Estado de publicación inválido"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = request.data.get('ids')
+        filters = request.data.get('filter')
+        if ids is not None:
+            if not isinstance(ids, list) or not ids or len(ids) > 1000 or not all(isinstance(i, int) for i in ids):
+                return Response({"error": "ids debe ser una lista de 1 a 1000 enteros"}, 
+                              status=status.HTTP_400_BAD_REQUEST)
+            filters = None
+        elif isinstance(filters, dict) and filters:
+            unknown = set(filters) - {'publication', 'reason', 'status'}
+            if unknown:
+                return Response({"error": f"Filtros no permitidos: {', '.join(sorted(unknown))}"}, 
+                              status=status.HTTP_400_BAD_REQUEST)
+            filters = {('publication_id' if key == 'publication' else key): value for key, value in filters.items()}
+        else:
+            return Response({"error": "Se requieren ids o un filtro"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = bulk_resolve(
+                request.user, new_status, request.data.get('admin_comment', ''),
+                ids=ids, filters=filters, publication_status=publication_status
+            )
+        except DjangoValidationError as exc:
+            return Response({"error": exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+    
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Obtener estadísticas de reportes (solo admins)"""
-        if not (request.user.is_staff or request.user.is_admin):
+        if not get_capabilities(request).is_admin:
             return Response({"error": "No tienes permisos para ver estadísticas"}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        stats = {
-            'total_reports': Report.objects.count(),
-            'pending_reports': Report.objects.filter(status='pending').count(),
-            'reviewed_reports': Report.objects.filter(status='reviewed').count(),
-            'resolved_reports': Report.objects.filter(status='resolved').count(),
-            'dismissed_reports': Report.objects.filter(status='dismissed').count(),
-            'reports_by_reason': {}
-        }
+        # Una sola consulta a los contadores mantenidos por analytics
+        statuses = ['pending', 'reviewed', 'resolved', 'dismissed']
+        counters = get_counters(
+            [REPORTS_TOTAL]
+            + [report_status_key(code) for code in statuses]
+            + [report_reason_key(code) for code, _ in Report.REASON_CHOICES]
+        )
+        stats = {'total_reports': counters[REPORTS_TOTAL]}
+        for code in statuses:
+            stats[f'{code}_reports'] = counters[report_status_key(code)]
         
         # Estadísticas por razón
-        for choice in Report.REASON_CHOICES:
-            reason_code = choice[0]
-            reason_name = choice[1]
-            count = Report.objects.filter(reason=reason_code).count()
-            stats['reports_by_reason'][reason_name] = count
+        stats['reports_by_reason'] = {
+            reason_name: counters[report_reason_key(reason_code)]
+            for reason_code, reason_name in Report.REASON_CHOICES
+        }
         
         return Response(stats)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import CustomUser, Role
+from django.db.models import Max
+from django.utils.timezone import now
+from .models import CustomUser, PasswordResetToken, Role
 
 
 @admin.register(CustomUser)
@@ -10,9 +12,16 @@ class CustomUserAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at', 'last_login', 'token_status']
     ordering = ['-created_at']
     
+    def get_queryset(self, request):
+        # Expiración del token de recuperación más reciente, sin una consulta por fila
+        return super().get_queryset(request).annotate(
+            reset_token_expires_at=Max('password_reset_tokens__expires_at')
+        )
+    
     def token_status(self, obj):
-        if obj.token and obj.token_expires_at:
-            if obj.is_token_valid():
+        expires_at = getattr(obj, 'reset_token_expires_at', None)
+        if expires_at:
+            if now() < expires_at:
                 return "Token válido"
             else:
                 return "Token expirado"
@@ -20,6 +29,14 @@ class CustomUserAdmin(admin.ModelAdmin):
     token_status.short_description = 'Estado del Token'
 
 
+@admin.register(PasswordResetToken)
+class PasswordResetTokenAdmin(admin.ModelAdmin):
+    list_display = ['user', 'expires_at', 'created_at']
+    list_select_related = ['user']
+    readonly_fields = ['user', 'token_hash', 'expires_at', 'created_at']
+    ordering = ['-created_at']
+
+
 @admin.register(Role)
 class RoleAdmin(admin.ModelAdmin):
     list_display = ['id', 'name']
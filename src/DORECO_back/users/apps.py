@@ -6,11 +6,15 @@ class UsersConfig(AppConfig):
     name = 'users'
 
     def ready(self):
+        from django.contrib.auth.signals import user_logged_in
         from django.db.models.signals import post_migrate
         from django.dispatch import receiver
         from django.utils.timezone import now
         from django.apps import apps
 
+        # django.contrib.auth guarda last_login en cada login; lo reemplaza el buffer de users.models
+        user_logged_in.disconnect(dispatch_uid='update_last_login')
+
         @receiver(post_migrate)
         def create_default_roles_and_users(sender, **kwargs):
             if sender.name not in ('users', 'DORECO_back.users'):
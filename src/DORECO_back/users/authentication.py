@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .last_login import last_login_buffer
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """Autenticación JWT con resolución async del usuario, para vistas ASGI nativas"""
+
+    def get_user_queryset(self):
+        return self.user_model.objects.select_related('role')
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token):
+        """Mismas validaciones que JWTAuthentication.get_user"""
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        try:
+            user = await self.get_user_queryset().aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+
+ROLES_VERSION_KEY = "auth-roles-version"
+
+
+def get_user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Descarta el usuario cacheado (guardado, cambio de contraseña, desactivación, logout)"""
+    cache.delete(get_user_cache_key(user_id))
+
+
+def invalidate_cached_roles():
+    """Invalida a todos los usuarios cacheados al cambiar un rol"""
+    if not cache.add(ROLES_VERSION_KEY, 1, timeout=None):
+        try:
+            cache.incr(ROLES_VERSION_KEY)
+        except ValueError:
+            cache.set(ROLES_VERSION_KEY, 1, timeout=None)
+
+
+class CachedJWTAuthentication(AsyncJWTAuthentication):
+    """
+    JWTAuthentication que resuelve el usuario (con role precargado) desde una
+    caché de TTL corto. La entrada guarda la versión de roles con la que se
+    generó, de modo que una sola lectura (get_many) basta para validarla.
+    También registra la última actividad del usuario en el buffer de accesos.
+    """
+
+    def get_timeout(self):
+        return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30)
+
+    def _from_cache(self, user_id, values):
+        entry = values.get(get_user_cache_key(user_id))
+        roles_version = values.get(ROLES_VERSION_KEY, 0)
+        if entry is not None and entry[0] == roles_version:
+            return entry[1], roles_version
+        return None, roles_version
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key = get_user_cache_key(user_id)
+        user, roles_version = self._from_cache(user_id, cache.get_many([key, ROLES_VERSION_KEY]))
+        if user is None:
+            try:
+                user = self.get_user_queryset().get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, (roles_version, user), self.get_timeout())
+        user = self.check_user(user, validated_token)
+        last_login_buffer.touch(user)
+        return user
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key = get_user_cache_key(user_id)
+        user, roles_version = self._from_cache(user_id, await cache.aget_many([key, ROLES_VERSION_KEY]))
+        if user is None:
+            user = await super().aget_user(validated_token)
+            await cache.aset(key, (roles_version, user), self.get_timeout())
+        else:
+            user = self.check_user(user, validated_token)
+        last_login_buffer.touch(user)
+        return user
+
+
+async def aget_request_user(request):
+    """
+    Usuario del header Authorization para vistas async; AnonymousUser si no hay
+    token. Lanza AuthenticationFailed/InvalidToken igual que DRF si es inválido.
+    """
+    result = await CachedJWTAuthentication().aauthenticate(request)
+    return result[0] if result is not None else AnonymousUser()
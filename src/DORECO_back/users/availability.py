@@ -0,0 +1,160 @@
+import datetime
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+def get_availability_config():
+    return getattr(settings, 'USER_AVAILABILITY', {})
+
+
+def _bloom_value(kind, value):
+    # En minúsculas: el filtro debe cubrir las colaciones que no distinguen mayúsculas
+    return f"{kind}:{value.lower()}"
+
+
+class IdentityFilter:
+    """
+    Filtro de Bloom de los emails y usernames registrados. Responde
+    "definitivamente disponible" sin consultar la base de datos; se actualiza
+    al guardar usuarios en este proceso y, cada REFRESH_INTERVAL segundos, con
+    los usuarios nuevos de otros procesos o altas masivas (id > último visto)
+    y los modificados en los últimos SYNC_MARGIN segundos (updated_at): así
+    entran los cambios de email/username de otros procesos y los ids
+    confirmados fuera de orden. Cada REBUILD_INTERVAL segundos se reconstruye
+    completo. Los valores anteriores quedan en el filtro: solo generan una consulta.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._synced_at = 0
+        self._synced_wall = None
+        self._rebuilt_at = 0
+
+    def rebuild(self):
+        from .models import CustomUser
+
+        config = get_availability_config()
+        rows = CustomUser.objects.values_list('id', 'email', 'username').order_by('id')
+        total = rows.count()
+        bloom = BloomFilter(
+            max(config.get('BLOOM_CAPACITY', 100000), total * 4),
+            config.get('BLOOM_ERROR_RATE', 0.01),
+        )
+        started = timezone.now()
+        last_id = 0
+        for row_id, email, username in rows.iterator(chunk_size=5000):
+            bloom.add(_bloom_value('email', email))
+            bloom.add(_bloom_value('username', username))
+            last_id = row_id
+        with self._lock:
+            self._bloom, self._last_id = bloom, last_id
+            self._synced_at = self._rebuilt_at = time.monotonic()
+            self._synced_wall = started
+        logger.info(f"User identity bloom filter rebuilt with {total} users")
+
+    def _sync(self):
+        from .models import CustomUser
+
+        config = get_availability_config()
+        if (
+            self._bloom is None or self._bloom.saturated
+            or time.monotonic() - self._rebuilt_at >= config.get('REBUILD_INTERVAL', 3600)
+        ):
+            self.rebuild()
+            return
+        if time.monotonic() - self._synced_at < config.get('REFRESH_INTERVAL', 5):
+            return
+        started = timezone.now()
+        window = self._synced_wall - datetime.timedelta(seconds=config.get('SYNC_MARGIN', 60))
+        rows = list(
+            CustomUser.objects.filter(Q(id__gt=self._last_id) | Q(updated_at__gte=window))
+            .values_list('id', 'email', 'username').order_by('id')
+        )
+        with self._lock:
+            for row_id, email, username in rows:
+                self._bloom.add(_bloom_value('email', email))
+                self._bloom.add(_bloom_value('username', username))
+                self._last_id = max(self._last_id, row_id)
+            self._synced_at = time.monotonic()
+            self._synced_wall = started
+
+    def add(self, kind, value):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(_bloom_value(kind, value))
+
+    def might_contain(self, kind, value):
+        if not get_availability_config().get('BLOOM_ENABLED', False):
+            return True
+        self._sync()
+        return _bloom_value(kind, value) in self._bloom
+
+
+identity_filter = IdentityFilter()
+
+
+def get_availability_cache_key(kind, value):
+    # En minúsculas, como el filtro: "foo" y "Foo" comparten respuesta (y se invalidan juntos)
+    return f"user-availability:{kind}:{hashlib.sha1(value.lower().encode()).hexdigest()}"
+
+
+def invalidate_availability(user):
+    """Descarta las respuestas cacheadas del email y username del usuario y los agrega al filtro"""
+    cache.delete_many([
+        get_availability_cache_key('email', user.email),
+        get_availability_cache_key('username', user.username),
+    ])
+    identity_filter.add('email', user.email)
+    identity_filter.add('username', user.username)
+
+
+def check_availability(email=None, username=None):
+    """
+    Disponibilidad de email y/o username: {'email': bool, 'username': bool}.
+    Primero el filtro de Bloom (negativos seguros), luego la caché y, para lo
+    que falte, una sola consulta por los índices únicos de ambos campos.
+    """
+    from .models import CustomUser
+
+    values = {kind: value for kind, value in (('email', email), ('username', username)) if value}
+    result = {}
+    pending = {}
+    for kind, value in values.items():
+        if not identity_filter.might_contain(kind, value):
+            result[kind] = True
+        else:
+            pending[get_availability_cache_key(kind, value)] = kind
+
+    if pending:
+        cached = cache.get_many(list(pending))
+        for key, taken in cached.items():
+            result[pending.pop(key)] = not taken
+
+    if pending:
+        lookup = Q()
+        for kind in pending.values():
+            # iexact: la respuesta cacheada es por valor en minúsculas en cualquier colación
+            lookup |= Q(**{f'{kind}__iexact': values[kind]})
+        taken = {'email': False, 'username': False}
+        for found_email, found_username in CustomUser.objects.filter(lookup).values_list('email', 'username'):
+            taken['email'] |= found_email.lower() == (email or '').lower()
+            taken['username'] |= found_username.lower() == (username or '').lower()
+        timeout = get_availability_config().get('CACHE_TIMEOUT', 60)
+        cache.set_many({key: taken[kind] for key, kind in pending.items()}, timeout)
+        for kind in pending.values():
+            result[kind] = not taken[kind]
+
+    return {kind: result[kind] for kind in values}
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHOTO = "default.png"
+SOURCE_KEY = "source"
+
+
+def get_avatar_sizes():
+    return tuple(sorted(getattr(settings, 'AVATAR_SIZES', (64, 128, 256))))
+
+
+def needs_render(user):
+    """La foto actual aún no tiene versiones redimensionadas"""
+    name = user.photo.name if user.photo else ''
+    if not name or name == DEFAULT_PHOTO:
+        return False
+    return (user.avatar_sizes or {}).get(SOURCE_KEY) != name
+
+
+def _rendition_name(user_id, source, size):
+    digest = hashlib.sha1(source.encode()).hexdigest()[:10]
+    return f"user/avatars/{user_id}_{digest}_{size}.webp"
+
+
+def render_avatars(user_id):
+    """
+    Recorta al centro y redimensiona la foto del usuario a los tamaños de
+    AVATAR_SIZES en WebP. Solo guarda el resultado si la foto no cambió
+    mientras se procesaba; devuelve el nuevo avatar_sizes o None.
+    """
+    from .authentication import invalidate_cached_user
+    from .models import CustomUser
+
+    user = CustomUser.objects.only('id', 'photo', 'avatar_sizes').get(pk=user_id)
+    if not needs_render(user):
+        return None
+    source = user.photo.name
+    quality = getattr(settings, 'AVATAR_QUALITY', 80)
+
+    with user.photo.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    sizes = {SOURCE_KEY: source}
+    for size in get_avatar_sizes():
+        rendition = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        rendition.save(buffer, format='WEBP', quality=quality, method=4)
+        name = _rendition_name(user.pk, source, size)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        sizes[str(size)] = default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    updated = CustomUser.objects.filter(pk=user.pk, photo=source).update(avatar_sizes=sizes)
+    if not updated:
+        return None
+    # update() no dispara post_save: descartar el usuario cacheado manualmente
+    invalidate_cached_user(user.pk)
+    for key, name in (user.avatar_sizes or {}).items():
+        if key != SOURCE_KEY and name not in sizes.values():
+            default_storage.delete(name)
+    return sizes
+
+
+def _render_in_worker(user_id):
+    try:
+        render_avatars(user_id)
+    except Exception:
+        logger.exception("No se pudo procesar el avatar del usuario %s", user_id)
+    finally:
+        close_old_connections()
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'AVATAR_WORKERS', 2),
+            thread_name_prefix='avatars',
+        )
+    return _executor
+
+
+def schedule_avatar_render(user):
+    """
+    Encola el procesamiento del avatar al confirmar la transacción, fuera del
+    ciclo de la petición. Con AVATAR_WORKERS = 0 se procesa en línea.
+    """
+    user_id = user.pk
+
+    def submit():
+        if getattr(settings, 'AVATAR_WORKERS', 2) <= 0:
+            render_avatars(user_id)
+        else:
+            _get_executor().submit(_render_in_worker, user_id)
+
+    transaction.on_commit(submit)
+
+
+def avatar_url(user, size, request=None):
+    """
+    URL de la versión más pequeña que cubra `size` px; la foto original si
+    aún no se procesó. Absoluta si se recibe la petición (como ImageField).
+    """
+    if user is None or not user.photo:
+        return None
+    sizes = user.avatar_sizes or {}
+    name = None
+    if sizes.get(SOURCE_KEY) == user.photo.name:
+        available = sorted(int(key) for key in sizes if key != SOURCE_KEY)
+        chosen = next((candidate for candidate in available if candidate >= size), available[-1] if available else None)
+        name = sizes.get(str(chosen)) if chosen is not None else None
+    url = default_storage.url(name) if name else user.photo.url
+    return request.build_absolute_uri(url) if request is not None else url
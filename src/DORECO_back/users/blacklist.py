@@ -0,0 +1,143 @@
+import datetime
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+def get_bloom_config():
+    return getattr(settings, 'TOKEN_BLACKLIST_BLOOM', {})
+
+
+class BlacklistFilter:
+    """
+    Filtro de Bloom de los jti en lista negra. Se construye desde la tabla,
+    se actualiza al hacer logout o rotar tokens en este proceso y, cada
+    REFRESH_INTERVAL segundos, con las filas nuevas de otros procesos.
+    Responde "definitivamente no está en la lista negra" sin consultar la
+    base de datos.
+
+    Los ids autoincrementales pueden confirmarse fuera de orden (dos logouts
+    concurrentes), así que cada sincronización relee además las filas de los
+    últimos SYNC_MARGIN segundos, y el filtro se reconstruye completo cada
+    REBUILD_INTERVAL segundos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._synced_at = 0
+        self._synced_wall = None
+        self._rebuilt_at = 0
+
+    def rebuild(self):
+        """Reconstruye el filtro completo desde la tabla de tokens en lista negra"""
+        config = get_bloom_config()
+        rows = BlacklistedToken.objects.values_list('id', 'token__jti').order_by('id')
+        total = rows.count()
+        bloom = BloomFilter(
+            max(config.get('CAPACITY', 100000), total * 2),
+            config.get('ERROR_RATE', 0.001),
+        )
+        started = timezone.now()
+        last_id = 0
+        for row_id, jti in rows.iterator(chunk_size=5000):
+            bloom.add(jti)
+            last_id = row_id
+        with self._lock:
+            self._bloom, self._last_id = bloom, last_id
+            self._synced_at = self._rebuilt_at = time.monotonic()
+            self._synced_wall = started
+        logger.info(f"Token blacklist bloom filter rebuilt with {total} entries")
+
+    def _sync(self):
+        config = get_bloom_config()
+        if (
+            self._bloom is None or self._bloom.saturated
+            or time.monotonic() - self._rebuilt_at >= config.get('REBUILD_INTERVAL', 3600)
+        ):
+            self.rebuild()
+            return
+        if time.monotonic() - self._synced_at < config.get('REFRESH_INTERVAL', 5):
+            return
+        started = timezone.now()
+        window = self._synced_wall - datetime.timedelta(seconds=config.get('SYNC_MARGIN', 60))
+        rows = list(
+            BlacklistedToken.objects.filter(Q(id__gt=self._last_id) | Q(blacklisted_at__gte=window))
+            .values_list('id', 'token__jti').order_by('id')
+        )
+        with self._lock:
+            for row_id, jti in rows:
+                self._bloom.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            self._synced_at = time.monotonic()
+            self._synced_wall = started
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def might_contain(self, jti):
+        if not get_bloom_config().get('ENABLED', True):
+            return True
+        self._sync()
+        return jti in self._bloom
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class BloomRefreshToken(RefreshToken):
+    """RefreshToken que consulta el filtro de Bloom antes de la tabla de lista negra"""
+
+    def check_blacklist(self):
+        if not blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            return
+        super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+class BloomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh de tokens (con rotación y lista negra) usando BloomRefreshToken"""
+    token_class = BloomRefreshToken
+
+
+def purge_expired_tokens(chunk_size=1000):
+    """
+    Elimina por bloques los tokens expirados (y su entrada en lista negra).
+    Punto de entrada para el programador de tareas (cron, ver purge_expired_tokens).
+    """
+    total = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=timezone.now())
+            .order_by('id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        total += len(ids)
+    logger.info(f"Purged {total} expired outstanding tokens")
+    if total:
+        blacklist_filter.rebuild()
+    return total
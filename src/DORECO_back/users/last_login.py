@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from DORECO_back.buffers import PeriodicFlushBuffer
+
+LAST_LOGIN = 'last_login'
+LAST_ACTIVITY = 'last_activity'
+
+
+def get_last_login_cache_key(user_id, field=LAST_LOGIN):
+    return f"{field.replace('_', '-')}:{user_id}"
+
+
+class LastLoginBuffer(PeriodicFlushBuffer):
+    """
+    Último acceso y última actividad pendientes de escribir; por usuario se
+    conserva el valor más reciente de cada campo y se persisten en lote con
+    bulk_update, sin tomar el lock de la fila del usuario en cada petición.
+    """
+
+    def __init__(self, interval, batch_size, cache_timeout, activity_resolution):
+        super().__init__(interval)
+        self.batch_size = batch_size
+        self.cache_timeout = cache_timeout
+        self.activity_resolution = activity_resolution
+
+    def merge(self, current, value):
+        merged = dict(current or {})
+        for field, timestamp in value.items():
+            if merged.get(field) is None or timestamp > merged[field]:
+                merged[field] = timestamp
+        return merged
+
+    def write(self, items):
+        from .models import CustomUser
+
+        # bulk_update escribe los mismos campos en todas las filas: agrupar por campos pendientes
+        groups = {}
+        for user_id, values in items.items():
+            groups.setdefault(tuple(sorted(values)), []).append(CustomUser(pk=user_id, **values))
+        for fields, users in groups.items():
+            CustomUser.objects.bulk_update(users, fields=list(fields), batch_size=self.batch_size)
+
+    def _record(self, user, values):
+        # Visible para otros procesos mientras no se vacíe el buffer
+        cache.set_many(
+            {get_last_login_cache_key(user.pk, field): timestamp for field, timestamp in values.items()},
+            self.cache_timeout,
+        )
+        self.add(user.pk, values)
+
+    def record(self, user, timestamp=None):
+        """Registra un login (también cuenta como actividad)"""
+        timestamp = timestamp or now()
+        self._record(user, {LAST_LOGIN: timestamp, LAST_ACTIVITY: timestamp})
+        return timestamp
+
+    def touch(self, user, timestamp=None):
+        """Registra actividad; a lo más una vez cada `activity_resolution` segundos por usuario"""
+        if not cache.add(f"activity-recorded:{user.pk}", 1, self.activity_resolution):
+            return None
+        timestamp = timestamp or now()
+        self._record(user, {LAST_ACTIVITY: timestamp})
+        return timestamp
+
+
+def _latest(user, field):
+    candidates = [
+        getattr(user, field),
+        (last_login_buffer.pending(user.pk) or {}).get(field),
+        cache.get(get_last_login_cache_key(user.pk, field)),
+    ]
+    candidates = [candidate for candidate in candidates if candidate is not None]
+    return max(candidates) if candidates else None
+
+
+def get_last_login(user):
+    """Último acceso del usuario, incluyendo el valor aún no escrito en la base de datos"""
+    return _latest(user, LAST_LOGIN)
+
+
+def get_last_activity(user):
+    """Última actividad del usuario, incluyendo el valor aún no escrito en la base de datos"""
+    return _latest(user, LAST_ACTIVITY)
+
+
+last_login_buffer = LastLoginBuffer(
+    interval=getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 30),
+    batch_size=getattr(settings, 'LAST_LOGIN_BATCH_SIZE', 500),
+    cache_timeout=getattr(settings, 'LAST_LOGIN_CACHE_TIMEOUT', 24 * 60 * 60),
+    activity_resolution=getattr(settings, 'LAST_ACTIVITY_RESOLUTION', 5 * 60),
+)
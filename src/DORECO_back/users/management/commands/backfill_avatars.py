@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.avatars import DEFAULT_PHOTO, needs_render, render_avatars
+from users.models import CustomUser
+
+
+def _render(user_id):
+    try:
+        return render_avatars(user_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Genera las versiones redimensionadas de las fotos de perfil existentes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        users = (
+            CustomUser.objects.exclude(photo__isnull=True).exclude(photo='').exclude(photo=DEFAULT_PHOTO)
+            .only('id', 'photo', 'avatar_sizes').order_by('id')
+        )
+        processed = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                chunk = list(users.filter(id__gt=last_id)[:options['chunk_size']])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+                futures = {
+                    executor.submit(_render, user.pk): user.pk
+                    for user in chunk if needs_render(user)
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                        processed += 1
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f"Usuario {futures[future]}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"{processed} avatares procesados, {failed} con errores"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.utils import cleanup_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina por lotes los tokens de recuperación de contraseña expirados. "
+        "Pensado para ejecutarse periódicamente (p. ej. cron cada hora)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = cleanup_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} tokens de recuperación expirados eliminados"))
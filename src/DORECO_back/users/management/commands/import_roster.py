@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.provisioning import import_roster, read_roster
+
+
+class Command(BaseCommand):
+    help = "Da de alta usuarios desde un padrón CSV (name, surnames, email[, username, phone_number, password])"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ruta del archivo CSV")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None, help="Procesos para hashear contraseñas")
+        parser.add_argument('--dry-run', action='store_true', help="Solo validar, sin crear usuarios")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as file:
+                rows = read_roster(file)
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+
+        result = import_roster(
+            rows,
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+        for error in result['errors']:
+            self.stderr.write(f"Fila {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} usuarios creados, {result['valid']} válidos, {len(result['errors'])} con errores"
+        ))
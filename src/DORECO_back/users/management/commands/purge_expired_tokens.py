@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.blacklist import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina por bloques los refresh tokens expirados de token_blacklist. "
+        "Pensado para ejecutarse periódicamente (p. ej. cron cada hora)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = purge_expired_tokens(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} tokens expirados eliminados"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.models import CustomUser
+from users.search import index_users
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de trigramas de la búsqueda de usuarios"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        users = CustomUser.objects.only('id', 'name', 'surnames', 'username', 'email').order_by('id')
+        last_id = 0
+        total = 0
+        while True:
+            chunk = list(users.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            index_users(chunk)
+            last_id = chunk[-1].id
+            total += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"{total} usuarios indexados"))
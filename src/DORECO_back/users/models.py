@@ -4,18 +4,20 @@ from django.contrib.auth.models import (
     PermissionsMixin
 )
 from django.contrib.auth.signals import user_logged_in
-from django.db import models
-from django.db.models.signals import post_migrate
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch.dispatcher import receiver
 from django.utils.timezone import now
 from django.core.validators import RegexValidator, MinLengthValidator, EmailValidator, FileExtensionValidator
+import hashlib
 import uuid
 from datetime import timedelta
 
 @receiver(user_logged_in)
 def update_last_login(sender, user, **kwargs):
-    user.last_login = now()
-    user.save()
+    # Se acumula en memoria y se escribe en lote (users.last_login)
+    from .last_login import last_login_buffer
+    last_login_buffer.record(user)
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -75,8 +77,6 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         error_messages={
             'unique': 'Este nombre de usuario ya está en uso'
         })
-    token = models.CharField(max_length=255, blank=True, null=True)
-    token_expires_at = models.DateTimeField(blank=True, null=True)
     photo = models.ImageField(
         upload_to="user", 
         default="default.png", 
@@ -89,10 +89,14 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
             )
         ]
     )
+    # Versiones WebP recortadas de la foto: {"source": <foto>, "64": <ruta>, ...} (ver users.avatars)
+    avatar_sizes = models.JSONField(default=dict, blank=True, editable=False)
     role = models.ForeignKey("Role", on_delete=models.SET_NULL, null=True, blank=True)
     status = models.BooleanField(default=True, blank=False, null=False)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Última petición autenticada (se escribe en lote desde users.last_login)
+    last_activity = models.DateTimeField(null=True, blank=True, editable=False)
     is_admin = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True, blank=False, null=False)
     is_staff = models.BooleanField(default=False, blank=False, null=False)
@@ -103,23 +107,19 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = ["name", "surnames"]
 
     def generate_password_reset_token(self):
-        """Genera un token de recuperación de contraseña para este usuario"""
-        self.token = str(uuid.uuid4())
-        self.token_expires_at = now() + timedelta(hours=1)
-        self.save()
-        return self.token
-
-    def is_token_valid(self):
-        """Verifica si el token de recuperación es válido"""
-        if not self.token or not self.token_expires_at:
-            return False
-        return now() < self.token_expires_at
+        """Genera un token de recuperación de contraseña para este usuario (solo se guarda su hash)"""
+        token = str(uuid.uuid4())
+        self.clear_reset_token()
+        PasswordResetToken.objects.create(
+            user=self,
+            token_hash=PasswordResetToken.hash_token(token),
+            expires_at=now() + timedelta(hours=1)
+        )
+        return token
 
     def clear_reset_token(self):
-        """Limpia el token de recuperación después de usarlo"""
-        self.token = None
-        self.token_expires_at = None
-        self.save()
+        """Elimina los tokens de recuperación del usuario después de usarlos"""
+        PasswordResetToken.objects.filter(user=self).delete()
 
     def __str__(self):
         return self.email
@@ -130,6 +130,47 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         verbose_name_plural = "Users"
 
 
+class PasswordResetTokenManager(models.Manager):
+    def find(self, token):
+        """Busca un token por su hash (índice único); None si no existe"""
+        return self.select_related('user').filter(token_hash=self.model.hash_token(token)).first()
+
+
+class PasswordResetToken(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='password_reset_tokens')
+    token_hash = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = PasswordResetTokenManager()
+
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def is_valid(self):
+        """Verifica si el token de recuperación sigue vigente"""
+        return now() < self.expires_at
+
+    def __str__(self):
+        return f"Reset token de {self.user.email}"
+
+    class Meta:
+        db_table = "password_reset_token"
+        verbose_name = "Password reset token"
+        verbose_name_plural = "Password reset tokens"
+
+
+class UserSearchTrigram(models.Model):
+    """Índice de trigramas de nombre, apellidos, username y correo (ver users.search)"""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = "user_search_trigram"
+        unique_together = ['trigram', 'user']
+
+
 class Role(models.Model):
     name = models.CharField(
         max_length=45, 
@@ -148,3 +189,39 @@ class Role(models.Model):
         verbose_name_plural = "Roles"
 
 
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    from .authentication import invalidate_cached_user
+    # Tras el commit: antes, otra petición podría volver a cachear la fila anterior
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_availability_on_change(sender, instance, **kwargs):
+    from .availability import invalidate_availability
+    invalidate_availability(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def process_avatar(sender, instance, **kwargs):
+    from .avatars import needs_render, schedule_avatar_render
+    if needs_render(instance):
+        schedule_avatar_render(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    from .search import SEARCH_FIELDS, index_users
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    index_users([instance])
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_cached_roles_on_change(sender, instance, **kwargs):
+    from .authentication import invalidate_cached_roles
+    transaction.on_commit(invalidate_cached_roles)
@@ -0,0 +1,58 @@
+from django.utils.functional import cached_property
+from rest_framework import permissions
+
+
+class Capabilities:
+    """
+    Capacidades del usuario de una petición. El usuario llega con su rol
+    precargado desde la caché de CachedJWTAuthentication, que se invalida al
+    cambiar CustomUser o Role, así que resolverlas no consulta la base de datos.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.is_authenticated = bool(user is not None and user.is_authenticated)
+        self.is_admin = self.is_authenticated and bool(user.is_staff or user.is_admin)
+
+    @cached_property
+    def role_name(self):
+        role = self.user.role if self.is_authenticated else None
+        return role.name if role is not None else None
+
+    def owns(self, obj, owner_field='owner_id'):
+        return self.is_authenticated and getattr(obj, owner_field) == self.user.pk
+
+    def can_manage(self, obj, owner_field='owner_id'):
+        """Propietario del objeto o administrador"""
+        return self.is_admin or self.owns(obj, owner_field)
+
+
+def get_capabilities(request):
+    """Capacidades memoizadas en la petición (se recalculan si cambia request.user)"""
+    capabilities = getattr(request, '_capabilities', None)
+    if capabilities is None or capabilities.user is not request.user:
+        capabilities = Capabilities(request.user)
+        request._capabilities = capabilities
+    return capabilities
+
+
+class IsAdmin(permissions.BasePermission):
+    """Solo administradores (is_staff o is_admin)"""
+    message = "Solo los administradores pueden realizar esta acción."
+
+    def has_permission(self, request, view):
+        return get_capabilities(request).is_admin
+
+
+class IsOwnerOrAdmin(permissions.BasePermission):
+    """
+    Propietario del objeto o administrador. El campo del propietario se toma
+    de `owner_field` en la vista (por defecto owner_id).
+    """
+    message = "Solo el propietario o un administrador pueden realizar esta acción."
+
+    def has_permission(self, request, view):
+        return get_capabilities(request).is_authenticated
+
+    def has_object_permission(self, request, view, obj):
+        return get_capabilities(request).can_manage(obj, getattr(view, 'owner_field', 'owner_id'))
@@ -0,0 +1,218 @@
+import csv
+import io
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from analytics.counters import USERS_TOTAL, adjust_counters
+from analytics.rollups import mark_dirty
+from .models import CustomUser, Role
+from .search import index_users
+
+ROSTER_FIELDS = ['name', 'surnames', 'email', 'username', 'phone_number', 'password']
+REQUIRED_FIELDS = ['name', 'surnames', 'email']
+DEFAULT_ROLE_ID = 2  # USER, igual que en el registro
+USERNAME_MAX_LENGTH = 45
+
+
+def _init_worker():
+    """Inicializador de los procesos del pool: cargar Django para usar los hashers configurados"""
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hashea contraseñas en un pool de procesos (el hash es CPU-bound y libera
+    poco el GIL). None produce una contraseña inutilizable; el usuario la
+    define con el flujo de recuperación.
+    """
+    workers = workers or getattr(settings, 'ROSTER_IMPORT_WORKERS', None) or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < workers * 4:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def read_roster(file):
+    """Lee un CSV (archivo de texto o binario, UTF-8 con o sin BOM) y devuelve las filas normalizadas"""
+    content = file.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    reader = csv.DictReader(io.StringIO(content))
+    missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(missing)}")
+    rows = []
+    for row in reader:
+        rows.append({field: (row.get(field) or '').strip() for field in ROSTER_FIELDS})
+    return rows
+
+
+def username_from_email(email):
+    """
+    Username válido derivado del correo: "juan.perez" -> "juan_perez",
+    "20213tn001" -> "u20213tn001" (debe empezar con letra). Deja espacio
+    para el sufijo numérico que agrega _assign_usernames.
+    """
+    local = unicodedata.normalize('NFKD', email.split('@')[0]).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '_', local).strip('_-')
+    if not slug[:1].isalpha():
+        slug = f"u{slug}"
+    if len(slug) < 3:
+        slug = f"user_{slug}"
+    return slug[:USERNAME_MAX_LENGTH - 5]
+
+
+def _build_user(row, role):
+    email = CustomUser.objects.normalize_email(row['email'])
+    user = CustomUser(
+        name=row['name'],
+        surnames=row['surnames'],
+        email=email,
+        username=row['username'] or username_from_email(email),
+        phone_number=row['phone_number'] or None,
+        role=role,
+    )
+    # Solo validadores de campo (formato, dominio @utez.edu.mx); la unicidad se verifica por lote
+    user.clean_fields(exclude=['password', 'photo', 'role', 'last_login'])
+    return user
+
+
+def _existing(field, values, chunk_size):
+    """Valores de `field` (en minúsculas) que ya existen en la base, en consultas IN por lote"""
+    values = list({value.lower() for value in values})
+    found = set()
+    for start in range(0, len(values), chunk_size):
+        found.update(
+            CustomUser.objects.annotate(lowered=Lower(field))
+            .filter(lowered__in=values[start:start + chunk_size])
+            .values_list('lowered', flat=True)
+        )
+    return found
+
+
+def _assign_usernames(users, reserved, chunk_size):
+    """
+    Usernames derivados del correo sin repetir los del archivo (`reserved`) ni
+    los de la base: si el base ya existe se prueba base2, base3...
+    """
+    bases = {id(user): user.username for user in users}
+    counters = {}
+    pending = users
+    while pending:
+        taken = _existing('username', (user.username for user in pending), chunk_size)
+        retry = []
+        for user in pending:
+            key = user.username.lower()
+            if key in taken or key in reserved:
+                base = bases[id(user)]
+                counters[base] = counters.get(base, 1) + 1
+                user.username = f"{base}{counters[base]}"
+                retry.append(user)
+            else:
+                reserved.add(key)
+        pending = retry
+
+
+def _insert_users(users):
+    """Inserta un bloque en una transacción, con contadores, rollups e índice de búsqueda"""
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(users, batch_size=len(users))
+        adjust_counters({USERS_TOTAL: len(users)})
+        mark_dirty('users', timezone.now())
+        # bulk_create no devuelve llaves primarias en MySQL ni dispara post_save:
+        # se recuperan por email para indexar la búsqueda
+        created = CustomUser.objects.filter(
+            email__in=[user.email for user in users]
+        ).only('id', 'name', 'surnames', 'username', 'email')
+        index_users(list(created))
+
+
+def _conflict_errors(user):
+    if CustomUser.objects.filter(email__iexact=user.email).exists():
+        return {'email': ["Ya existe un usuario con este correo electrónico"]}
+    return {'username': ["Este nombre de usuario ya está en uso"]}
+
+
+def import_roster(rows, chunk_size=1000, workers=None, dry_run=False):
+    """
+    Da de alta usuarios de un padrón institucional. Valida el formato por
+    fila, la unicidad en consultas por lote (archivo y base de datos), hashea
+    las contraseñas en paralelo e inserta con bulk_create por bloque.
+    Devuelve {"created": n, "valid": n, "errors": [{"row": n, "errors": {...}}]}.
+    """
+    role = Role.objects.get(id=DEFAULT_ROLE_ID)
+    errors = []
+    candidates = []
+    generated = []
+    seen_emails, seen_usernames = set(), set()
+
+    for number, row in enumerate(rows, start=2):  # La fila 1 es el encabezado
+        try:
+            user = _build_user(row, role)
+        except ValidationError as exc:
+            errors.append({'row': number, 'errors': exc.message_dict})
+            continue
+        email, username = user.email.lower(), user.username.lower()
+        if email in seen_emails or (row['username'] and username in seen_usernames):
+            errors.append({'row': number, 'errors': {'email': ["Registro duplicado en el archivo"]}})
+            continue
+        seen_emails.add(email)
+        if row['username']:
+            seen_usernames.add(username)
+        else:
+            generated.append(user)
+        candidates.append((number, user, row['password'] or None))
+
+    # Después de las filas con username explícito, que tienen prioridad sobre los derivados
+    _assign_usernames(generated, seen_usernames, chunk_size)
+    taken_emails = _existing('email', (user.email for _, user, _ in candidates), chunk_size)
+    taken_usernames = _existing('username', (user.username for _, user, _ in candidates), chunk_size)
+    users, numbers, passwords = [], [], []
+    for number, user, password in candidates:
+        row_errors = {}
+        if user.email.lower() in taken_emails:
+            row_errors['email'] = ["Ya existe un usuario con este correo electrónico"]
+        if user.username.lower() in taken_usernames:
+            row_errors['username'] = ["Este nombre de usuario ya está en uso"]
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+            continue
+        users.append(user)
+        numbers.append(number)
+        passwords.append(password)
+
+    if dry_run or not users:
+        return {'created': 0, 'valid': len(users), 'errors': errors}
+
+    for user, hashed in zip(users, hash_passwords(passwords, workers)):
+        user.password = hashed
+
+    created = 0
+    for start in range(0, len(users), chunk_size):
+        chunk = users[start:start + chunk_size]
+        try:
+            _insert_users(chunk)
+            created += len(chunk)
+            continue
+        except IntegrityError:
+            pass
+        # Un alta concurrente (p. ej. registro) entre la verificación y la inserción:
+        # se reintenta el bloque fila por fila y los conflictos se reportan como errores
+        for number, user in zip(numbers[start:start + chunk_size], chunk):
+            try:
+                _insert_users([user])
+                created += 1
+            except IntegrityError:
+                errors.append({'row': number, 'errors': _conflict_errors(user)})
+
+    return {'created': created, 'valid': len(users), 'errors': errors}
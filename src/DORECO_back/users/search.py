@@ -0,0 +1,103 @@
+import base64
+import math
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+SEARCH_FIELDS = ['name', 'surnames', 'username', 'email']
+
+# Relleno de palabra (al estilo pg_trgm); no se usa espacio porque las
+# colaciones PAD SPACE de MySQL ignoran los espacios finales al comparar
+PAD = '$'
+
+
+def normalize(text):
+    """Minúsculas y sin acentos: 'Núñez' -> 'nunez'"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def trigrams(text):
+    grams = set()
+    for word in re.findall(r'[a-z0-9]+', normalize(text)):
+        padded = f"{PAD}{PAD}{word}{PAD}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def user_trigrams(user):
+    # Del correo solo se indexa la parte local: el dominio es el mismo para todos
+    values = [user.name, user.surnames, user.username, (user.email or '').split('@')[0]]
+    grams = set()
+    for value in values:
+        grams |= trigrams(value)
+    return grams
+
+
+def index_users(users, batch_size=1000):
+    """(Re)indexa los trigramas de los usuarios dados en lote"""
+    from .models import UserSearchTrigram
+
+    users = [user for user in users if user.pk is not None]
+    if not users:
+        return 0
+    rows = [
+        UserSearchTrigram(user_id=user.pk, trigram=gram)
+        for user in users for gram in user_trigrams(user)
+    ]
+    with transaction.atomic():
+        UserSearchTrigram.objects.filter(user_id__in=[user.pk for user in users]).delete()
+        UserSearchTrigram.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(score, user_id):
+    return base64.urlsafe_b64encode(f"{score}:{user_id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        score, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(score), int(user_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Cursor inválido")
+
+
+def search_users(query, limit=20, cursor=None):
+    """
+    Busca usuarios por trigramas coincidentes, ordenados por relevancia
+    (trigramas en común) y paginados por keyset (score, user_id).
+    Devuelve (usuarios con role precargado, cursor siguiente o None).
+    """
+    from .models import CustomUser, UserSearchTrigram
+
+    grams = trigrams(query)
+    if not grams:
+        return [], None
+    min_score = max(1, math.ceil(len(grams) * getattr(settings, 'USER_SEARCH_MIN_SIMILARITY', 0.5)))
+
+    matches = (
+        UserSearchTrigram.objects.filter(trigram__in=grams)
+        .values('user_id')
+        .annotate(score=Count('id'))
+        .filter(score__gte=min_score)
+    )
+    if cursor:
+        last_score, last_user_id = decode_cursor(cursor)
+        matches = matches.filter(Q(score__lt=last_score) | Q(score=last_score, user_id__gt=last_user_id))
+    page = list(matches.order_by('-score', 'user_id')[:limit + 1])
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]['score'], page[-1]['user_id'])
+
+    users = CustomUser.objects.select_related('role').in_bulk([row['user_id'] for row in page])
+    return [users[row['user_id']] for row in page if row['user_id'] in users], next_cursor
@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
-from .models import CustomUser, Role
+from django.db import transaction
+from .models import CustomUser, PasswordResetToken, Role
+from .last_login import get_last_activity, get_last_login
+from .avatars import avatar_url, get_avatar_sizes
 
 
 class RoleSerializer(serializers.ModelSerializer):
@@ -31,7 +34,7 @@ class CustomUserSerializer(serializers.ModelSerializer):
             'photo', 'role', 'role_name', 'status', 'created_at', 'updated_at', 
             'is_admin', 'is_active', 'is_staff', 'password', 'password_confirm'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'role_name', 'token', 'token_expires_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'role_name']
         extra_kwargs = {
             'password': {'write_only': True},
             'password_confirm': {'write_only': True},
@@ -109,14 +112,32 @@ class UserLoginSerializer(serializers.Serializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer simplificado para el perfil del usuario"""
     role_name = serializers.CharField(source='role.name', read_only=True)
+    last_login = serializers.SerializerMethodField()
+    last_activity = serializers.SerializerMethodField()
+    avatar = serializers.SerializerMethodField()
     
     class Meta:
         model = CustomUser
         fields = [
             'id', 'name', 'surnames', 'email', 'phone_number', 'username', 
-            'photo', 'role_name', 'created_at'
+            'photo', 'avatar', 'role_name', 'created_at', 'last_login', 'last_activity'
         ]
-        read_only_fields = ['id', 'email', 'created_at', 'role_name', 'token', 'token_expires_at']
+        read_only_fields = ['id', 'email', 'created_at', 'role_name', 'last_login', 'last_activity', 'avatar']
+
+    def get_last_login(self, obj):
+        """Último acceso, incluyendo el aún no escrito en la base de datos"""
+        last_login = get_last_login(obj)
+        return serializers.DateTimeField().to_representation(last_login) if last_login else None
+
+    def get_last_activity(self, obj):
+        """Última actividad, incluyendo la aún no escrita en la base de datos"""
+        last_activity = get_last_activity(obj)
+        return serializers.DateTimeField().to_representation(last_activity) if last_activity else None
+
+    def get_avatar(self, obj):
+        """URLs del avatar por tamaño en px (la foto original mientras se procesa)"""
+        request = self.context.get('request')
+        return {str(size): avatar_url(obj, size, request) for size in get_avatar_sizes()}
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -161,24 +182,24 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         return attrs
 
     def validate_token(self, value):
-        try:
-            user = CustomUser.objects.get(token=value)
-            if not user.is_token_valid():
-                raise serializers.ValidationError("El token es inválido o ha expirado.")
-            return value
-        except CustomUser.DoesNotExist:
+        reset_token = PasswordResetToken.objects.find(value)
+        if reset_token is None:
             raise serializers.ValidationError("Token inválido.")
+        if not reset_token.is_valid():
+            raise serializers.ValidationError("El token es inválido o ha expirado.")
+        self.reset_token = reset_token
+        return value
 
     def save(self):
-        token = self.validated_data['token']
         new_password = self.validated_data['new_password']
+        user = self.reset_token.user
         
-        user = CustomUser.objects.get(token=token)
-        
-        # Cambiar la contraseña
-        user.set_password(new_password)
-        
-        # Limpiar el token de recuperación
-        user.clear_reset_token()
+        with transaction.atomic():
+            # Cambiar la contraseña
+            user.set_password(new_password)
+            user.save()
+            
+            # Limpiar el token de recuperación
+            user.clear_reset_token()
         
         return user 
\ No newline at end of file
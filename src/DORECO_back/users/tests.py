@@ -1,3 +1,145 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 
-# Create your tests here.
+from .authentication import get_user_cache_key
+from .availability import check_availability, identity_filter
+from .blacklist import BloomRefreshToken, blacklist_filter
+from .last_login import LastLoginBuffer, get_last_activity, get_last_login
+from .models import CustomUser
+
+
+class BlacklistFilterTests(TestCase):
+    """Filtro de Bloom de la lista negra frente a ids confirmados fuera de orden"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(email='user@example.com')
+        self.tokens = [BloomRefreshToken.for_user(self.user) for _ in range(3)]
+        self.outstanding = [OutstandingToken.objects.get(jti=token['jti']) for token in self.tokens]
+
+    @override_settings(TOKEN_BLACKLIST_BLOOM={'ENABLED': True, 'REFRESH_INTERVAL': 0})
+    def test_lower_id_committed_after_sync_is_seen(self):
+        BlacklistedToken.objects.create(id=100, token=self.outstanding[0])
+        blacklist_filter.rebuild()
+        self.assertTrue(blacklist_filter.might_contain(self.tokens[0]['jti']))
+
+        # Otro proceso confirma después una fila con id menor al último visto
+        BlacklistedToken.objects.create(id=50, token=self.outstanding[1])
+
+        self.assertTrue(blacklist_filter.might_contain(self.tokens[1]['jti']))
+        with self.assertRaises(TokenError):
+            BloomRefreshToken(str(self.tokens[1])).check_blacklist()
+        BloomRefreshToken(str(self.tokens[2])).check_blacklist()
+
+    @override_settings(TOKEN_BLACKLIST_BLOOM={'ENABLED': True, 'REFRESH_INTERVAL': 0, 'SYNC_MARGIN': 0})
+    def test_periodic_rebuild_catches_rows_outside_the_margin(self):
+        BlacklistedToken.objects.create(id=100, token=self.outstanding[0])
+        blacklist_filter.rebuild()
+        BlacklistedToken.objects.create(id=50, token=self.outstanding[1])
+        BlacklistedToken.objects.filter(id=50).update(blacklisted_at=self.outstanding[1].created_at.replace(year=2000))
+
+        with override_settings(TOKEN_BLACKLIST_BLOOM={'ENABLED': True, 'REFRESH_INTERVAL': 0, 'REBUILD_INTERVAL': 0}):
+            self.assertTrue(blacklist_filter.might_contain(self.tokens[1]['jti']))
+
+
+@override_settings(USER_AVAILABILITY={'BLOOM_ENABLED': True, 'REFRESH_INTERVAL': 0})
+class IdentityFilterTests(TestCase):
+    """Filtro de Bloom de disponibilidad frente a cambios hechos por otros procesos"""
+
+    def setUp(self):
+        identity_filter.rebuild()
+
+    def test_rename_in_another_process_is_seen(self):
+        # update() no dispara post_save: simula el cambio hecho por otro proceso
+        CustomUser.objects.filter(email='user@example.com').update(
+            username='renombrado', updated_at=timezone.now()
+        )
+        self.assertTrue(identity_filter.might_contain('username', 'renombrado'))
+        self.assertEqual(check_availability(username='renombrado'), {'username': False})
+
+    def test_lower_id_committed_after_sync_is_seen(self):
+        last_id = CustomUser.objects.order_by('-id').values_list('id', flat=True).first()
+        CustomUser.objects.bulk_create([CustomUser(
+            id=last_id + 100, email='alto@utez.edu.mx', username='alto', name='Alto', surnames='Id', role_id=2,
+        )])
+        self.assertTrue(identity_filter.might_contain('username', 'alto'))
+        CustomUser.objects.bulk_create([CustomUser(
+            id=last_id + 50, email='bajo@utez.edu.mx', username='bajo', name='Bajo', surnames='Id', role_id=2,
+        )])
+        self.assertEqual(check_availability(username='bajo'), {'username': False})
+
+
+@override_settings(ROSTER_IMPORT_MAX_ROWS=3, ROSTER_IMPORT_MAX_PASSWORDS=1)
+class ImportRosterEndpointTests(TestCase):
+    """El endpoint de padrones rechaza archivos grandes y remite al comando"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.get(email='admin@example.com'))
+
+    def upload(self, *rows):
+        content = "name,surnames,email,password\n" + "".join(f"{row}\n" for row in rows)
+        file = SimpleUploadedFile('padron.csv', content.encode(), content_type='text/csv')
+        return self.client.post('/api/users/import-roster/', {'file': file}, format='multipart')
+
+    def test_small_roster_is_imported(self):
+        response = self.upload('Ana,López,ana@utez.edu.mx,', 'Luis,Pérez,luis@utez.edu.mx,Secreta123')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 2)
+
+    def test_large_roster_is_rejected(self):
+        rows = [f'Alumno,Uno,alumno{i}@utez.edu.mx,' for i in range(4)]
+        self.assertEqual(self.upload(*rows).status_code, 413)
+        response = self.upload('Ana,López,ana@utez.edu.mx,Secreta123', 'Luis,Pérez,luis@utez.edu.mx,Secreta123')
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('import_roster', response.data['error'])
+        self.assertFalse(CustomUser.objects.filter(email__in=['ana@utez.edu.mx', 'luis@utez.edu.mx']).exists())
+
+
+class CachedUserInvalidationTests(TestCase):
+    """El usuario cacheado se descarta al confirmar la transacción, no antes"""
+
+    def test_invalidated_on_commit(self):
+        user = CustomUser.objects.get(email='user@example.com')
+        key = get_user_cache_key(user.pk)
+        cache.set(key, (0, user))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.name = 'Renombrado'
+            user.save()
+            # Hasta el commit otra petición aún lee la fila anterior de la base
+            self.assertIsNotNone(cache.get(key))
+
+        self.assertIsNone(cache.get(key))
+
+
+class LastLoginBufferTests(TestCase):
+    """Último acceso y actividad: visibles antes del vaciado y escritos en lote"""
+
+    def setUp(self):
+        cache.clear()
+        self.buffer = LastLoginBuffer(interval=3600, batch_size=100, cache_timeout=60, activity_resolution=300)
+        self.user = CustomUser.objects.get(email='user@example.com')
+        self.admin = CustomUser.objects.get(email='admin@example.com')
+
+    def test_login_and_activity_are_flushed_together(self):
+        login = self.buffer.record(self.user)
+        self.assertEqual(get_last_login(self.user), login)
+        self.assertEqual(get_last_activity(self.user), login)
+
+        activity = self.buffer.touch(self.admin)
+        self.assertIsNotNone(activity)
+        # Dentro de la resolución no se vuelve a registrar
+        self.assertIsNone(self.buffer.touch(self.admin))
+        self.assertEqual(CustomUser.objects.get(pk=self.admin.pk).last_activity, None)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.user.refresh_from_db()
+        self.admin.refresh_from_db()
+        self.assertEqual((self.user.last_login, self.user.last_activity), (login, login))
+        self.assertEqual(self.admin.last_activity, activity)
+        self.assertNotEqual(self.admin.last_login, activity)
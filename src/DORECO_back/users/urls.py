@@ -19,6 +19,7 @@ urlpatterns = [
     path('auth/change-password/', CustomUserViewSet.as_view({'post': 'change_password'}), name='user-change-password'),
     path('auth/search/', CustomUserViewSet.as_view({'get': 'search'}), name='user-search'),
     path('auth/register/', CustomUserViewSet.as_view({'post': 'register'}), name='user-register'),
+    path('auth/availability/', CustomUserViewSet.as_view({'get': 'availability'}), name='user-availability'),
     
     # URLs para recuperación de contraseña
     path('auth/password-reset-request/', CustomUserViewSet.as_view({'post': 'password_reset_request'}), name='password-reset-request'),
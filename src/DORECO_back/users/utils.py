@@ -89,25 +89,29 @@ def create_and_send_password_reset(user, request=None):
         return False, f"Error en el proceso de recuperación: {str(e)}"
 
 
-def cleanup_expired_tokens():
+def cleanup_expired_tokens(batch_size=1000):
     """
-    Limpia tokens expirados de la base de datos
-    Esta función puede ser llamada periódicamente
+    Elimina por lotes los tokens de recuperación expirados
+    Punto de entrada para el programador de tareas (ver comando cleanup_reset_tokens)
     """
     try:
-        from .models import CustomUser
+        from .models import PasswordResetToken
         
-        expired_users = CustomUser.objects.filter(
-            token__isnull=False,
-            token_expires_at__lt=timezone.now()
-        )
-        
-        count = expired_users.count()
-        expired_users.update(token=None, token_expires_at=None)
+        count = 0
+        while True:
+            # Usa el índice de expires_at y borra por llave primaria en bloques pequeños
+            ids = list(
+                PasswordResetToken.objects.filter(expires_at__lt=timezone.now())
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            PasswordResetToken.objects.filter(id__in=ids).delete()
+            count += len(ids)
         
         logger.info(f"Cleaned up {count} expired password reset tokens")
         return count
         
     except Exception as e:
         logger.error(f"Error cleaning up expired tokens: {str(e)}")
-        return 0 
\ No newline at end of file
+        return 0
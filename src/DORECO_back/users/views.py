@@ -1,18 +1,26 @@
 from django.shortcuts import render
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth import authenticate
-from django.db.models import Q
-from .models import CustomUser, Role
+from django.contrib.auth.signals import user_logged_in
+from .models import CustomUser, PasswordResetToken, Role
 from .serializers import (
     CustomUserSerializer, RoleSerializer, UserLoginSerializer,
     UserProfileSerializer, ChangePasswordSerializer,
     PasswordResetRequestSerializer, PasswordResetConfirmSerializer
 )
 from .utils import create_and_send_password_reset
+from .authentication import invalidate_cached_user
+from .availability import check_availability
+from .permissions import IsAdmin, IsOwnerOrAdmin, get_capabilities
+from .blacklist import BloomRefreshToken
+from .provisioning import import_roster, read_roster
+from .search import search_users
 
 
 class RoleViewSet(viewsets.ModelViewSet):
@@ -24,57 +32,47 @@ class RoleViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         """Solo admins pueden crear, actualizar y eliminar roles"""
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
-            self.permission_classes = [IsAuthenticated]
-            # Validación adicional en el método
+            self.permission_classes = [IsAuthenticated, IsAdmin]
         return super().get_permissions()
-    
-    def perform_create(self, serializer):
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden crear roles.")
-        serializer.save()
-    
-    def perform_update(self, serializer):
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden actualizar roles.")
-        serializer.save()
-    
-    def perform_destroy(self, instance):
-        if not (self.request.user.is_staff or self.request.user.is_admin):
-            raise PermissionError("Solo los administradores pueden eliminar roles.")
-        instance.delete()
 
 
 class CustomUserViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar usuarios"""
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
+    owner_field = 'pk'
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Estadísticas generales para dashboard"""
-        from publications.models import Publication
-        from reports.models import Report
-        from .models import CustomUser
-        total_users = CustomUser.objects.count()
-        total_active_publications = Publication.objects.filter(is_active=True).count()
-        total_sold = Publication.objects.filter(publication_type='sale').count()
-        total_loaned = Publication.objects.filter(publication_type='loan').count()
-        total_donated = Publication.objects.filter(publication_type='donation').count()
-        pending_reports = Report.objects.filter(status='pending').count()
+        """Estadísticas generales para dashboard (desde los contadores de analytics)"""
+        from analytics.counters import (
+            PUBLICATIONS_ACTIVE, USERS_TOTAL, get_counters, publication_type_key, report_status_key
+        )
+        counters = get_counters([
+            USERS_TOTAL,
+            PUBLICATIONS_ACTIVE,
+            publication_type_key('sale'),
+            publication_type_key('loan'),
+            publication_type_key('donation'),
+            report_status_key('pending'),
+        ])
         return Response({
-            "total_users": total_users,
-            "total_active_publications": total_active_publications,
-            "total_sold": total_sold,
-            "total_loaned": total_loaned,
-            "total_donated": total_donated,
-            "pending_reports": pending_reports,
+            "total_users": counters[USERS_TOTAL],
+            "total_active_publications": counters[PUBLICATIONS_ACTIVE],
+            "total_sold": counters[publication_type_key('sale')],
+            "total_loaned": counters[publication_type_key('loan')],
+            "total_donated": counters[publication_type_key('donation')],
+            "pending_reports": counters[report_status_key('pending')],
         })
     
     def get_permissions(self):
         """Permisos específicos por acción"""
-        if self.action in ['create', 'register', 'login', 'password_reset_request', 'password_reset_confirm', 'verify_reset_token']:
+        if self.action in ['create', 'register', 'login', 'availability', 'password_reset_request', 'password_reset_confirm', 'verify_reset_token']:
             self.permission_classes = [AllowAny]
-        elif self.action in ['list', 'destroy']:
+        elif self.action == 'destroy':
+            # Admins o el propio usuario
+            self.permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+        elif self.action == 'list':
             self.permission_classes = [IsAuthenticated]
         else:
             self.permission_classes = [IsAuthenticated]
@@ -82,10 +80,11 @@ class CustomUserViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filtrar queryset según el usuario"""
-        if self.request.user.is_staff or self.request.user.is_admin:
-            return CustomUser.objects.all()
+        queryset = CustomUser.objects.select_related('role')
+        if get_capabilities(self.request).is_admin:
+            return queryset
         # Usuarios normales solo ven su propio perfil
-        return CustomUser.objects.filter(id=self.request.user.id)
+        return queryset.filter(id=self.request.user.id)
     
     def get_serializer_class(self):
         """Usar diferentes serializers según la acción"""
@@ -95,19 +94,14 @@ class CustomUserViewSet(viewsets.ModelViewSet):
             return ChangePasswordSerializer
         return CustomUserSerializer
     
-    def perform_destroy(self, instance):
-        """Solo admins pueden eliminar usuarios o usuarios pueden eliminarse a sí mismos"""
-        if not (self.request.user.is_staff or self.request.user.is_admin or self.request.user == instance):
-            raise PermissionError("No tienes permisos para eliminar este usuario.")
-        instance.delete()
-    
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def login(self, request):
         """Endpoint para login de usuarios"""
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            user_logged_in.send(sender=user.__class__, request=request._request, user=user)
+            refresh = BloomRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -124,13 +118,28 @@ class CustomUserViewSet(viewsets.ModelViewSet):
             return Response(UserProfileSerializer(user).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
      
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def availability(self, request):
+        """Verificar si un email y/o username están disponibles para el registro"""
+        email = request.query_params.get('email', '').strip()
+        username = request.query_params.get('username', '').strip()
+        if not (email or username):
+            return Response({"error": "Se requiere email o username"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        if email:
+            email = CustomUser.objects.normalize_email(email)
+        result = check_availability(email=email, username=username)
+        return Response({f"{kind}_available": available for kind, available in result.items()})
+    
     @action(detail=False, methods=['post'])
     def logout(self, request):
         """Endpoint para logout"""
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = BloomRefreshToken(refresh_token)
             token.blacklist()
+            invalidate_cached_user(request.user.pk)
             return Response({"message": "Logout exitoso"}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": "Token inválido"}, status=status.HTTP_400_BAD_REQUEST)
@@ -162,24 +171,54 @@ class CustomUserViewSet(viewsets.ModelViewSet):
             return Response({"message": "Contraseña cambiada exitosamente"})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'], url_path='import-roster', parser_classes=[MultiPartParser])
+    def import_roster(self, request):
+        """Alta masiva de usuarios desde un padrón CSV (solo para admins)"""
+        if not get_capabilities(request).is_admin:
+            return Response({"error": "No tienes permisos para importar usuarios"}, 
+                          status=status.HTTP_403_FORBIDDEN)
+        
+        roster = request.FILES.get('file')
+        if roster is None:
+            return Response({"error": "El archivo es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = read_roster(roster)
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        max_rows = getattr(settings, 'ROSTER_IMPORT_MAX_ROWS', 500)
+        max_passwords = getattr(settings, 'ROSTER_IMPORT_MAX_PASSWORDS', 20)
+        if len(rows) > max_rows or sum(1 for row in rows if row['password']) > max_passwords:
+            return Response({
+                "error": f"El padrón excede el límite del endpoint ({max_rows} filas, {max_passwords} con contraseña); "
+                         "impórtalo con el comando `manage.py import_roster`"
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        
+        dry_run = request.data.get('dry_run') in ('1', 'true', 'True')
+        # Sin pool de procesos: hacer fork desde un worker web con hilos puede bloquearse
+        result = import_roster(rows, workers=1, dry_run=dry_run)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Buscar usuarios (solo para admins)"""
-        if not (request.user.is_staff or request.user.is_admin):
+        """Buscar usuarios por relevancia con paginación por cursor (solo para admins)"""
+        if not get_capabilities(request).is_admin:
             return Response({"error": "No tienes permisos para realizar búsquedas"}, 
                           status=status.HTTP_403_FORBIDDEN)
         
         query = request.query_params.get('q', '')
-        if query:
-            users = CustomUser.objects.filter(
-                Q(name__icontains=query) | 
-                Q(surnames__icontains=query) | 
-                Q(username__icontains=query) |
-                Q(email__icontains=query)
-            )
-            serializer = UserProfileSerializer(users, many=True)
-            return Response(serializer.data)
-        return Response([])
+        if not query:
+            return Response({"results": [], "next_cursor": None})
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            users, next_cursor = search_users(query, limit, request.query_params.get('cursor'))
+        except ValueError:
+            return Response({"error": "Parámetros de paginación inválidos"},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = UserProfileSerializer(users, many=True)
+        return Response({"results": serializer.data, "next_cursor": next_cursor})
     
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def password_reset_request(self, request):
@@ -224,22 +263,25 @@ class CustomUserViewSet(viewsets.ModelViewSet):
                 "error": "Token es requerido"
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            user = CustomUser.objects.get(token=token)
-            if user.is_token_valid():
-                return Response({
-                    "valid": True,
-                    "user_email": user.email,
-                    "expires_at": user.token_expires_at
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    "valid": False,
-                    "error": "El token ha expirado o ya fue utilizado"
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
-        except CustomUser.DoesNotExist:
+        reset_token = PasswordResetToken.objects.find(token)
+        if reset_token is None:
             return Response({
                 "valid": False,
                 "error": "Token inválido"
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if reset_token.is_valid():
+            return Response({
+                "valid": True,
+                "user_email": reset_token.user.email,
+                "expires_at": reset_token.expires_at
+            }, status=status.HTTP_200_OK)
+        return Response({
+            "valid": False,
+            "error": "El token ha expirado o ya fue utilizado"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """Obtención de tokens JWT con el mismo límite que el login"""
+    throttle_scope = 'login'